@@ -0,0 +1,107 @@
+from typing import Literal, Optional
+from fastapi import APIRouter, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from app.core.concurrency import run_service
+from app.core.pagination import decode_cursor
+from app.services.counter_reconciliation import CounterReconciler
+from app.services.export_service import ForumExporter
+from app.services.post_purger import post_purger
+from app.services.tenant_purge import tenant_purger
+
+router = APIRouter(prefix="/admin", tags=["Admin"])
+
+reconciler = CounterReconciler()
+exporter = ForumExporter()
+
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+@router.post("/counters/reconcile")
+async def reconcile_counters(
+    org_id: Optional[str] = Query(None, description="Organización a reconciliar (todas si se omite)"),
+    dry_run: bool = Query(False, description="Solo informar de los desvíos, sin corregirlos"),
+):
+    """
+    Recalcula likes_count, dislikes_count y comments_count a partir de las
+    reacciones y comentarios guardados, corrige los desvíos e informa de
+    cuántos posts estaban mal y por cuánto.
+    """
+    try:
+        return await run_service(reconciler.reconcile, org_id=org_id, dry_run=dry_run)
+    except Exception as e:
+        print(f"Error en reconcile_counters route: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/deletions")
+async def deletion_progress():
+    """
+    Progreso de la purga de posts borrados: el backlog pendiente (posts y los
+    comentarios/reacciones que les quedan) y las métricas del purgador.
+    """
+    try:
+        backlog = await run_service(post_purger.backlog)
+    except Exception as e:
+        print(f"Error en deletion_progress route: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+    return {"backlog": backlog, "purger": post_purger.stats()}
+
+
+@router.get("/orgs/{org_id}/export")
+def export_org(
+    org_id: str,
+    format: Literal["ndjson", "csv"] = Query("ndjson", description="Formato de la exportación"),
+    after: Optional[str] = Query(None, description="Cursor del último checkpoint recibido, para reanudar"),
+):
+    """
+    Exporta todos los posts, comentarios y reacciones de la organización en
+    streaming. Cada grupo de posts termina con un registro `checkpoint`; para
+    reanudar una descarga cortada se pasa su `cursor` en `after` y se
+    descartan las filas recibidas después de ese checkpoint.
+    """
+    if after:
+        try:
+            decode_cursor(after)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    stream = exporter.csv(org_id, after) if format == "csv" else exporter.ndjson(org_id, after)
+    return StreamingResponse(
+        stream,
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="forum-{org_id}.{format}"'},
+    )
+
+
+@router.post("/orgs/{org_id}/purge")
+async def purge_org(
+    org_id: str,
+    response: Response,
+    dry_run: bool = Query(True, description="Solo contar lo que se borraría"),
+    confirm: Optional[str] = Query(None, description="Debe repetir org_id para borrar de verdad"),
+):
+    """
+    Borra todos los posts, comentarios y reacciones de una organización dada
+    de baja, en lotes por rangos de _id y con pausas entre lotes
+    (TENANT_PURGE_*). Con dry_run (por defecto) devuelve los conteos; si no,
+    lanza la purga en segundo plano y responde 202 con el progreso inicial.
+    """
+    if dry_run:
+        try:
+            return await run_service(tenant_purger.purge, org_id, dry_run=True)
+        except Exception as e:
+            print(f"Error en purge_org route: {str(e)}")
+            raise HTTPException(status_code=500, detail=str(e))
+
+    if confirm != org_id:
+        raise HTTPException(status_code=400, detail="confirm must match org_id to purge the organization")
+    response.status_code = 202
+    return tenant_purger.start(org_id)
+
+
+@router.get("/orgs/{org_id}/purge")
+async def purge_org_status(org_id: str):
+    """Progreso de la última purga lanzada para la organización"""
+    job = tenant_purger.status(org_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="No purge has been started for this organization")
+    return job
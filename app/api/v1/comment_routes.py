@@ -1,24 +1,38 @@
-from fastapi import APIRouter, HTTPException
+from typing import Literal, Optional
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import APIRouter, Header, HTTPException, Query, Request
 from app.schemas.comment_schema import CommentCreate, CommentOut
-from app.services.comment_service import CommentService
+from app.core.concurrency import run_service
+from app.core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.core.etag import etag_matches, make_etag, not_modified
+from app.core.serialization import json_response, loads_items
+from app.services.comment_service import MAX_BULK_COMMENTS, CommentService
+from app.services.read_service import create_read_service
 
 router = APIRouter(prefix="/orgs/{org_id}/forum/posts/{post_id}/comments", tags=["Comments"])
 
+# Endpoints que abarcan varios posts de la organización
+batch_router = APIRouter(prefix="/orgs/{org_id}/forum/comments", tags=["Comments"])
+
 comment_service = CommentService()
+read_service = create_read_service()
 
 @router.post("/", status_code=201)
-def create_comment(org_id: str, post_id: str, comment_data: CommentCreate):
+async def create_comment(org_id: str, post_id: str, comment_data: CommentCreate):
     try:
-        comment = comment_service.create_comment(
+        comment = await run_service(
+            comment_service.create_comment,
             post_id=post_id,
             user_name=comment_data.user_name,
             content=comment_data.content
         )
         
-        # Serializar manualmente para evitar problemas con ReferenceField
+        # Serializar manualmente para evitar problemas con ReferenceField;
+        # el post_id ya validado es el de la referencia, sin tocar comment.post
         return {
             "id": str(comment.id),
-            "post_id": str(comment.post.id),
+            "post_id": str(ObjectId(post_id)),
             "user_name": comment.user_name,
             "content": comment.content,
             "created_at": comment.created_at.isoformat()
@@ -29,32 +43,94 @@ def create_comment(org_id: str, post_id: str, comment_data: CommentCreate):
         print(f"Error en create_comment route: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/bulk")
+async def bulk_create_comments(org_id: str, post_id: str, request: Request):
+    """
+    Importa muchos comentarios de un post en una sola petición.
+    El cuerpo es un array JSON o NDJSON (Content-Type: application/x-ndjson)
+    de objetos {user_name, content}. Responde con los creados y los errores por índice.
+    """
+    try:
+        ObjectId(post_id)
+    except (InvalidId, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid post ID format")
+    return await _bulk_create(org_id, request, post_id=post_id)
+
+
+@batch_router.post("/bulk")
+async def bulk_create_comments_many_posts(org_id: str, request: Request):
+    """
+    Igual que /posts/{post_id}/comments/bulk, pero cada elemento indica su
+    `post_id`, así que un lote puede abarcar varios posts de la organización.
+    """
+    return await _bulk_create(org_id, request)
+
+
+async def _bulk_create(org_id: str, request: Request, post_id: Optional[str] = None):
+    try:
+        items, errors = loads_items(await request.body(), request.headers.get("content-type"))
+    except (ValueError, UnicodeDecodeError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if not items and not errors:
+        raise HTTPException(status_code=400, detail="Empty batch")
+    if len(items) + len(errors) > MAX_BULK_COMMENTS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BULK_COMMENTS} comments per request")
+
+    try:
+        report = await run_service(comment_service.bulk_create_comments, org_id, items, post_id=post_id)
+    except Exception as e:
+        print(f"Error en bulk_create_comments route: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    # Los elementos que ni siquiera se pudieron leer también son fallos del lote
+    if errors:
+        report["errors"] = sorted(report["errors"] + errors, key=lambda e: e["index"])
+        report["failed"] = len(report["errors"])
+    return report
+
 @router.get("/")
-def get_comments(org_id: str, post_id: str):
+async def get_comments(
+    org_id: str,
+    post_id: str,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = Query(None, description="Cursor devuelto en el header X-Next-Cursor"),
+    order: Literal["asc", "desc"] = Query("asc", description="'asc': más antiguos primero; 'desc': más recientes primero"),
+    if_none_match: Optional[str] = Header(None),
+):
+    """
+    Obtiene una página de comentarios de un post.
+
+    Si hay más resultados, el header X-Next-Cursor contiene el cursor que se
+    debe enviar en `after` (con el mismo `order`) para pedir la página siguiente.
+    """
     try:
-        comments = comment_service.get_comments_for_post(post_id)
-        
-        # Serializar la lista de comentarios
-        return [
-            {
-                "id": str(comment.id),
-                "post_id": str(comment.post.id),
-                "user_name": comment.user_name,
-                "content": comment.content,
-                "created_at": comment.created_at.isoformat()
-            }
-            for comment in comments
-        ]
+        # La versión del post decide el ETag sin leer los comentarios
+        version = await run_service(read_service.comments_version, post_id)
+        etag = make_etag("comments", post_id, limit, after, order, *version)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
+        # Lectura como diccionarios planos, serializados directamente a JSON
+        comments, next_cursor = await run_service(
+            read_service.list_comments, post_id, ensure_post=False, limit=limit, after=after, order=order
+        )
+        headers = {"ETag": etag}
+        if next_cursor:
+            headers["X-Next-Cursor"] = next_cursor
+        return json_response(comments, headers=headers)
     except HTTPException:
         raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         print(f"Error en get_comments route: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.delete("/{comment_id}")
-def delete_comment(org_id: str, post_id: str, comment_id: str):
+async def delete_comment(org_id: str, post_id: str, comment_id: str):
     try:
-        return comment_service.delete_comment(comment_id)
+        return await run_service(comment_service.delete_comment, comment_id)
     except HTTPException:
         raise
     except Exception as e:
@@ -1,17 +1,29 @@
-from fastapi import APIRouter, HTTPException
+import json
+from typing import Literal, Optional
+from bson import ObjectId
+from fastapi import APIRouter, Header, HTTPException, Query, Response
+from app.core.concurrency import run_service
+from app.core.etag import etag_matches, make_post_etag, not_modified, parse_post_etag
+from app.core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.core.serialization import dumps, json_bytes_response, json_response
 from app.schemas.post_schema import PostCreate, PostOut, PostUpdate
-from app.services.post_service import PostService
+from app.services.post_list_cache import post_list_cache
+from app.services.post_service import PostService, PreconditionFailed
+from app.services.read_service import create_read_service
+from app.services.search_service import DEFAULT_SEARCH_LIMIT, MAX_SEARCH_LIMIT, SearchService
 import uuid
 
 router = APIRouter(prefix="/orgs/{org_id}/forum", tags=["Forum"])
 
 service = PostService()
+read_service = create_read_service(service)
+search_service = SearchService()
 
 
 
 # Método para crear un post
 @router.post("/", response_model=PostOut)
-def create_post(
+async def create_post(
     org_id: str,
     post_data: PostCreate,
 ):
@@ -25,7 +37,7 @@ def create_post(
     """
     try:
         # 1) Creamos el post asociado a la organización
-        new_post = service.create_post(org_id, post_data)
+        new_post = await run_service(service.create_post, org_id, post_data)
 
         # 3) Devolvemos el post
         return PostOut.from_orm(new_post)
@@ -35,25 +47,111 @@ def create_post(
         raise HTTPException(status_code=400, detail=str(e))
 
 
-# Método para obtener todos los posts
+# Método para obtener los posts paginados
 @router.get("/", response_model=list[PostOut])
-def get_posts(org_id: str):
+async def get_posts(
+    org_id: str,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = Query(None, description="Cursor devuelto en el header X-Next-Cursor"),
+    view: Literal["full", "summary"] = Query("full", description="'summary' devuelve un extracto del contenido"),
+    fields: Optional[str] = Query(None, description="Campos separados por coma, p. ej. title,created_at"),
+    viewer_id: Optional[str] = Query(None, description="Usuario que ve el feed: añade contadores y su reacción"),
+):
+    """
+    Obtiene una página de posts de una organización, del más reciente al más antiguo.
+
+    Si hay más resultados, el header X-Next-Cursor contiene el cursor que se
+    debe enviar en `after` para pedir la página siguiente.
+
+    Con `view=summary` cada post trae `excerpt` y `truncated` en lugar de `content`;
+    con `fields` solo se devuelven los campos pedidos (más `id` y `created_at`).
+    Con `viewer_id` cada post incluye `likes_count`, `dislikes_count`,
+    `comments_count` y `viewer_reaction` ('like', 'dislike' o null).
     """
-    Obtiene todos los posts de una organización.
+    if view == "summary" and fields:
+        raise HTTPException(status_code=400, detail="Use either view=summary or fields, not both")
+
+    field_list = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+    counters = viewer_id is not None
+
+    # La primera página se sirve desde caché mientras no haya escrituras en la organización.
+    # La caché no depende del usuario: la reacción del viewer se añade después
+    items, body = None, None
+    if after is None:
+        variant = post_list_cache.variant(view, field_list, limit, counters=counters)
+        cached = post_list_cache.get_page(org_id, variant)
+        if cached is not None:
+            body, next_cursor = cached
+        else:
+            generation = post_list_cache.generation(org_id)
+
+    if body is None:
+        try:
+            items, next_cursor = await run_service(
+                read_service.list_posts, org_id, limit=limit, after=after, view=view, fields=field_list,
+                counters=counters,
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        body = dumps(items)
+        if after is None:
+            post_list_cache.set_page(org_id, variant, body, next_cursor, generation)
+
+    if viewer_id is not None:
+        body = await _with_viewer_reactions(items if items is not None else json.loads(body), viewer_id)
+    return json_bytes_response(body, headers=_cursor_headers(next_cursor))
+
+
+async def _with_viewer_reactions(items: list, viewer_id: str) -> bytes:
+    """Añade viewer_reaction a cada post con una sola consulta sobre (post, user_id)"""
+    post_ids = [ObjectId(str(item["id"])) for item in items]
+    reactions = await run_service(read_service.viewer_reactions, post_ids, viewer_id) if post_ids else {}
+    for item, post_id in zip(items, post_ids):
+        item["viewer_reaction"] = reactions.get(post_id)
+    return dumps(items)
+
+
+def _cursor_headers(next_cursor: Optional[str]):
+    return {"X-Next-Cursor": next_cursor} if next_cursor else None
+
+
+# Búsqueda de texto (declarada antes de /{post_id} para que "search" no se tome como un id)
+@router.get("/search")
+async def search_posts(
+    org_id: str,
+    q: str = Query(..., min_length=1, max_length=200, description="Texto a buscar"),
+    limit: int = Query(DEFAULT_SEARCH_LIMIT, ge=1, le=MAX_SEARCH_LIMIT),
+):
+    """
+    Busca en el título, el contenido y los comentarios de los posts de la
+    organización. Devuelve los posts en formato resumen, del más relevante al
+    menos, con `score` y `matched` (campos en los que aparece la búsqueda).
     """
-    posts = service.get_all_posts(org_id)
-    return [PostOut.from_orm(p) for p in posts]
+    try:
+        results = await run_service(search_service.search, org_id, q, limit)
+    except Exception as e:
+        print(f"Error en search_posts route: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+    return json_response(results)
 
 
 # Método para obtener un post por ID
 @router.get("/{post_id}", response_model=PostOut)
-def get_post_by_id(org_id: str, post_id: str):
+async def get_post_by_id(org_id: str, post_id: str, if_none_match: Optional[str] = Header(None)):
     """
     Obtiene un post por id dentro de una organización.
+
+    Devuelve un ETag; si el cliente lo envía en If-None-Match y el post no
+    cambió, responde 304 sin leer ni serializar el post completo.
     """
     try:
-        post = service.get_post_by_id(org_id, post_id)
-        return PostOut.from_orm(post)
+        version = await run_service(read_service.post_version, org_id, post_id)
+        etag = make_post_etag(*version)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        post = await run_service(read_service.get_post, org_id, post_id)
+        return json_response(post, headers={"ETag": etag})
     except Exception as e:
         print(f"Error getting post: {e}")
         raise HTTPException(status_code=404, detail=str(e))
@@ -61,25 +159,66 @@ def get_post_by_id(org_id: str, post_id: str):
 
 # Método para actualizar un post
 @router.put("/{post_id}", response_model=PostOut)
-def update_post(org_id: str, post_id: str, post: PostUpdate):
+async def update_post(
+    org_id: str,
+    post_id: str,
+    post: PostUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+):
     """
     Actualiza un post perteneciente a una organización.
+
+    Para no pisar la edición de otra persona se puede enviar el ETag del post
+    en If-Match y/o `expected_updated_at` en el cuerpo: si el post cambió
+    desde entonces se responde 412 y no se aplica nada.
     """
+    expected = _expected_versions(if_match, post.expected_updated_at)
     try:
-        updated_post = service.update_post(org_id, post_id, post)
-        return PostOut.from_orm(updated_post)
+        updated_post = await run_service(service.update_post, org_id, post_id, post, expected=expected)
+    except PreconditionFailed as e:
+        raise HTTPException(status_code=412, detail=str(e))
     except Exception as e:
         print(f"Error updating post: {e}")
         raise HTTPException(status_code=404, detail=str(e))
 
+    response.headers["ETag"] = make_post_etag(
+        updated_post.updated_at,
+        updated_post.likes_count,
+        updated_post.dislikes_count,
+        updated_post.comments_count,
+    )
+    return PostOut.from_orm(updated_post)
+
+
+def _expected_versions(if_match: Optional[str], expected_updated_at):
+    """
+    Traduce If-Match / expected_updated_at a las versiones aceptables del post
+    (None = sin condición). Lanza 412 si ninguna versión puede coincidir.
+    """
+    versions = None
+    if if_match and if_match.strip() != "*":
+        versions = [v for v in (parse_post_etag(tag) for tag in if_match.split(",")) if v]
+        if not versions:
+            raise HTTPException(status_code=412, detail="If-Match does not match the current post")
+
+    if expected_updated_at:
+        if versions is None:
+            versions = [{"updated_at": expected_updated_at}]
+        else:
+            versions = [v for v in versions if v["updated_at"] == expected_updated_at]
+            if not versions:
+                raise HTTPException(status_code=412, detail="If-Match and expected_updated_at disagree")
+    return versions
+
 
 # Método para eliminar un post
 @router.delete("/{post_id}", response_model=dict)
-def delete_post(org_id: str, post_id: str):
+async def delete_post(org_id: str, post_id: str):
     """
     Elimina un post perteneciente a una organización.
     """
-    return service.delete_post(org_id, post_id)
+    return await run_service(service.delete_post, org_id, post_id)
 
 
 
@@ -1,13 +1,23 @@
-from fastapi import APIRouter, HTTPException, Query
+from typing import Dict, Optional
+from fastapi import APIRouter, Header, HTTPException, Query
 from app.schemas.reaction_schema import ReactionCreate, ReactionStats
+from app.core.concurrency import run_service
+from app.core.etag import etag_matches, make_etag, not_modified
+from app.core.serialization import json_response
+from app.services.counter_buffer import counter_buffer
 from app.services.reaction_service import ReactionService
+from app.services.read_service import MAX_STATS_BATCH, create_read_service
 
 router = APIRouter(prefix="/orgs/{org_id}/forum/posts/{post_id}/reactions", tags=["Reactions"])
 
+# Endpoints que abarcan varios posts de la organización
+batch_router = APIRouter(prefix="/orgs/{org_id}/forum/reactions", tags=["Reactions"])
+
 reaction_service = ReactionService()
+read_service = create_read_service()
 
 @router.post("/", status_code=200)
-def add_reaction(org_id: str, post_id: str, reaction_data: ReactionCreate):
+async def add_reaction(org_id: str, post_id: str, reaction_data: ReactionCreate):
     """
     Agregar o actualizar una reacción (like/dislike) a un post.
     - Si el usuario no ha reaccionado, crea la reacción
@@ -15,7 +25,8 @@ def add_reaction(org_id: str, post_id: str, reaction_data: ReactionCreate):
     - Si el usuario reaccionó con otro tipo, la cambia
     """
     try:
-        result = reaction_service.add_or_update_reaction(
+        result = await run_service(
+            reaction_service.add_or_update_reaction,
             post_id=post_id,
             user_id=reaction_data.user_id,
             reaction_type=reaction_data.reaction_type
@@ -28,17 +39,25 @@ def add_reaction(org_id: str, post_id: str, reaction_data: ReactionCreate):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/stats", response_model=ReactionStats)
-def get_reaction_stats(
+async def get_reaction_stats(
     org_id: str, 
     post_id: str,
-    user_id: str = Query(None, description="ID del usuario para saber su reacción")
+    user_id: str = Query(None, description="ID del usuario para saber su reacción"),
+    if_none_match: Optional[str] = Header(None)
 ):
     """
     Obtener estadísticas de reacciones de un post.
     Opcionalmente, incluye la reacción del usuario si se proporciona user_id.
+    Responde 304 si el ETag enviado en If-None-Match sigue vigente.
     """
     try:
-        return reaction_service.get_reaction_stats(post_id=post_id, user_id=user_id)
+        version = await run_service(read_service.reaction_stats_version, post_id)
+        etag = make_etag("reactions", post_id, user_id, *version)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag, _staleness_headers())
+
+        stats = await run_service(read_service.get_reaction_stats, post_id=post_id, user_id=user_id)
+        return json_response(stats, headers={"ETag": etag, **_staleness_headers()})
     except HTTPException:
         raise
     except Exception as e:
@@ -46,14 +65,46 @@ def get_reaction_stats(
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.delete("/")
-def remove_reaction(org_id: str, post_id: str, user_id: str = Query(...)):
+async def remove_reaction(org_id: str, post_id: str, user_id: str = Query(...)):
     """
     Eliminar la reacción de un usuario a un post.
     """
     try:
-        return reaction_service.remove_reaction(post_id=post_id, user_id=user_id)
+        return await run_service(reaction_service.remove_reaction, post_id=post_id, user_id=user_id)
     except HTTPException:
         raise
     except Exception as e:
         print(f"Error en remove_reaction route: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+@batch_router.get("/stats", response_model=Dict[str, ReactionStats])
+async def get_reaction_stats_batch(
+    org_id: str,
+    post_ids: str = Query(..., description="IDs de posts separados por coma"),
+    user_id: Optional[str] = Query(None, description="ID del usuario para saber su reacción"),
+):
+    """
+    Estadísticas de reacciones de varios posts a la vez (p. ej. una página del feed).
+    Devuelve un objeto {post_id: stats}; los posts inexistentes se omiten.
+    """
+    ids = [p.strip() for p in post_ids.split(",") if p.strip()]
+    if not ids:
+        raise HTTPException(status_code=400, detail="post_ids is required")
+    if len(ids) > MAX_STATS_BATCH:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_STATS_BATCH} post_ids per request")
+
+    try:
+        stats = await run_service(read_service.get_reaction_stats_batch, org_id, ids, user_id=user_id)
+        return json_response(stats, headers=_staleness_headers())
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error en get_reaction_stats_batch route: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def _staleness_headers():
+    """Con contadores write-behind, cuánto pueden ir por detrás los valores leídos"""
+    if not counter_buffer.enabled:
+        return {}
+    return {"X-Counters-Max-Staleness": str(counter_buffer.flush_interval)}
\ No newline at end of file
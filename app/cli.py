@@ -0,0 +1,143 @@
+"""
+Comandos de mantenimiento del microservicio.
+
+Uso:
+    python -m app.cli reconcile-counters [--org ORG_ID] [--dry-run] [--batch-size 500]
+    python -m app.cli import-forum DUMP.ndjson [--batch-size 1000] [--resume] [--drop-indexes] [--rebuild-indexes]
+    python -m app.cli sync-indexes [--check | --dry-run] [--drop-stale] [--explain]
+    python -m app.cli purge-org ORG_ID [--dry-run | --yes] [--batch-size 500] [--pause 0.1] [--max-docs-per-second 0]
+    python -m app.cli backfill-comment-orgs [--org ORG_ID] [--batch-size 500]
+"""
+import argparse
+import json
+import sys
+
+from app.db.mongodb import init_db
+
+
+def reconcile_counters(args):
+    from app.services.counter_reconciliation import CounterReconciler
+
+    report = CounterReconciler(batch_size=args.batch_size).reconcile(org_id=args.org, dry_run=args.dry_run)
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    return 0
+
+
+def import_forum(args):
+    from app.services.forum_importer import ForumImporter
+
+    def progress(stats):
+        print(f"  {stats['rows']} filas, {stats['rows_per_second']} filas/s", file=sys.stderr)
+
+    importer = ForumImporter(batch_size=args.batch_size, progress=progress)
+    if args.drop_indexes:
+        print(f"Índices quitados: {', '.join(importer.drop_indexes()) or 'ninguno'}", file=sys.stderr)
+
+    report = importer.import_file(args.path, state_path=args.state_file, resume=args.resume,
+                                  rebuild_counters=not args.skip_counters)
+
+    if args.rebuild_indexes:
+        print("Reconstruyendo índices...", file=sys.stderr)
+        report["indexes"] = importer.rebuild_indexes()
+    print(json.dumps(report, indent=2, ensure_ascii=False, default=str))
+    return 0 if not report["failed"] else 2
+
+
+def sync_indexes(args):
+    from mongoengine import get_db
+    from app.db.indexes import explain_hot_queries, in_sync, sync_indexes as sync
+
+    db = get_db()
+    reports = sync(db, drop_stale=args.drop_stale, dry_run=args.check or args.dry_run)
+    result = {"collections": reports}
+    status = 0
+    if args.check and not in_sync(reports):
+        status = 1
+    if args.explain:
+        result["explain"] = explain_hot_queries(db)
+        if any(r["collscan"] for r in result["explain"]):
+            status = 1
+    print(json.dumps(result, indent=2, ensure_ascii=False, default=str))
+    return status
+
+
+def purge_org(args):
+    from app.services.tenant_purge import TenantPurger
+
+    if not args.dry_run and not args.yes:
+        print("Se borrarán todos los datos de la organización: usa --dry-run para contar o --yes para confirmar",
+              file=sys.stderr)
+        return 1
+    purger = TenantPurger(batch_size=args.batch_size, pause=args.pause, max_docs_per_second=args.max_docs_per_second)
+    report = purger.purge(args.org_id, dry_run=args.dry_run)
+    print(json.dumps(report, indent=2, ensure_ascii=False, default=str))
+    return 0
+
+
+def backfill_comment_orgs(args):
+    from app.services.comment_org_backfill import backfill_comment_orgs as backfill
+
+    report = backfill(org_id=args.org, batch_size=args.batch_size)
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    reconcile = commands.add_parser("reconcile-counters", help="Recalcula y corrige los contadores de los posts")
+    reconcile.add_argument("--org", default=None, help="Organización a reconciliar (todas si se omite)")
+    reconcile.add_argument("--dry-run", action="store_true", help="Solo informar, sin corregir")
+    reconcile.add_argument("--batch-size", type=int, default=500)
+    reconcile.set_defaults(handler=reconcile_counters)
+
+    load = commands.add_parser("import-forum", help="Importa un volcado NDJSON de posts, comentarios y reacciones")
+    load.add_argument("path", help="Fichero NDJSON (mismo formato que /admin/orgs/{org_id}/export)")
+    load.add_argument("--batch-size", type=int, default=1000, help="Filas por ronda de insert_many")
+    load.add_argument("--state-file", default=None, help="Fichero de progreso (por defecto <path>.import-state)")
+    load.add_argument("--resume", action="store_true", help="Continuar una importación interrumpida")
+    load.add_argument("--skip-counters", action="store_true", help="No recalcular los contadores al terminar")
+    load.add_argument("--drop-indexes", action="store_true",
+                      help="Quitar los índices secundarios no únicos antes de cargar")
+    load.add_argument("--rebuild-indexes", action="store_true", help="Crear los índices declarados al terminar (como sync-indexes)")
+    load.set_defaults(handler=import_forum)
+
+    indexes = commands.add_parser("sync-indexes", help="Compara los índices declarados con los reales y crea los que faltan")
+    indexes.add_argument("--check", action="store_true",
+                         help="No cambiar nada; salir con 1 si falta o cambió algún índice declarado")
+    indexes.add_argument("--dry-run", action="store_true", help="Solo informar de lo que se haría")
+    indexes.add_argument("--drop-stale", action="store_true",
+                         help="Borrar también los índices que ya no se declaran y recrear los que cambiaron")
+    indexes.add_argument("--explain", action="store_true",
+                         help="Pasar las consultas calientes por explain; salir con 1 si alguna hace COLLSCAN")
+    indexes.set_defaults(handler=sync_indexes)
+
+    purge = commands.add_parser("purge-org", help="Borra todos los posts, comentarios y reacciones de una organización")
+    purge.add_argument("org_id", help="Organización dada de baja")
+    purge.add_argument("--dry-run", action="store_true", help="Solo contar lo que se borraría")
+    purge.add_argument("--yes", action="store_true", help="Confirmar el borrado")
+    purge.add_argument("--batch-size", type=int, default=500, help="Posts (y documentos por tramo) por lote")
+    purge.add_argument("--pause", type=float, default=0.1, help="Segundos de pausa entre tramos")
+    purge.add_argument("--max-docs-per-second", type=float, default=0, help="Tope de documentos borrados por segundo")
+    purge.set_defaults(handler=purge_org)
+
+    backfill = commands.add_parser("backfill-comment-orgs",
+                                   help="Copia a los comentarios la organización de su post (búsqueda por organización)")
+    backfill.add_argument("--org", default=None, help="Solo esta organización (todas si se omite)")
+    backfill.add_argument("--batch-size", type=int, default=500, help="Posts por lote")
+    backfill.set_defaults(handler=backfill_comment_orgs)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    if not init_db():
+        return 1
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, Optional
+
+
+class CacheBackend(ABC):
+    """
+    Interfaz de los backends de caché.
+
+    Cada clave agrupa varios campos (como un hash de Redis) y caduca entera,
+    así se puede invalidar todo lo de una organización con un solo delete.
+    Un backend tipo Redis la implementa con HGET / HSET + EXPIRE / DEL.
+    """
+
+    @abstractmethod
+    def get(self, key: str, field: str) -> Optional[bytes]:
+        """Devuelve el valor guardado o None si no existe o caducó"""
+
+    @abstractmethod
+    def set(self, key: str, field: str, value: bytes, ttl: Optional[float] = None):
+        """Guarda un valor; ttl en segundos se aplica a la clave completa"""
+
+    @abstractmethod
+    def delete(self, *keys: str):
+        """Elimina las claves indicadas con todos sus campos"""
+
+    @abstractmethod
+    def stats(self) -> Dict[str, int]:
+        """Métricas del backend: hits, misses, evictions, invalidations, size"""
+
+
+class LRUCache(CacheBackend):
+    """Caché en memoria del proceso con expulsión LRU por número de claves"""
+
+    def __init__(self, max_keys: int = 1000):
+        self.max_keys = max_keys
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires_at, {field: value})
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    def get(self, key: str, field: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] is not None and entry[0] <= time.monotonic():
+                # Caducada: se trata como un fallo
+                del self._entries[key]
+                entry = None
+            value = entry[1].get(field) if entry is not None else None
+            if value is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def set(self, key: str, field: str, value: bytes, ttl: Optional[float] = None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or (entry[0] is not None and entry[0] <= time.monotonic()):
+                expires_at = time.monotonic() + ttl if ttl else None
+                entry = (expires_at, {})
+                self._entries[key] = entry
+            entry[1][field] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_keys:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def delete(self, *keys: str):
+        with self._lock:
+            for key in keys:
+                if self._entries.pop(key, None) is not None:
+                    self._invalidations += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "invalidations": self._invalidations,
+                "size": len(self._entries),
+            }
@@ -0,0 +1,17 @@
+import inspect
+from typing import Any, Callable
+
+from starlette.concurrency import run_in_threadpool
+
+
+async def run_service(fn: Callable, *args, **kwargs) -> Any:
+    """
+    Ejecuta un método de servicio desde una ruta async.
+
+    Las corrutinas (backend Motor) se esperan directamente en el event loop;
+    los métodos síncronos (MongoEngine) se envían al thread pool para no
+    bloquear el loop mientras esperan a Mongo.
+    """
+    if inspect.iscoroutinefunction(fn):
+        return await fn(*args, **kwargs)
+    return await run_in_threadpool(fn, *args, **kwargs)
@@ -1,13 +1,47 @@
-from pydantic import BaseSettings
+import os
+from pathlib import Path
+from typing import Optional
 
-class Settings(BaseSettings):
-    JWT_SECRET_KEY: str
+from pydantic import BaseModel
+
+# Cargar variables de entorno desde la raíz del proyecto (en el contenedor no
+# hay .env y se evita importar dotenv en el arranque)
+env_path = Path(__file__).parent.parent.parent / '.env'
+if env_path.is_file():
+    from dotenv import load_dotenv
+    load_dotenv(dotenv_path=env_path)
+
+
+class Settings(BaseModel):
+    """
+    Configuración del microservicio. Cada campo se lee de la variable de
+    entorno con el mismo nombre (o del .env); pydantic convierte los tipos.
+    """
+
+    JWT_SECRET_KEY: Optional[str] = None
     JWT_ALGORITHM: str = "HS256"
-    MONGO_URI: str
     HOST: str = "0.0.0.0"  # Default host
     PORT: int = 4000  # Default port
 
-    class ConfigDict:
-        env_file = ".env"  # Cargar las variables de entorno desde el archivo .env
+    # Conexión a MongoDB (MongoEngine; Motor usa los mismos tiempos de espera)
+    MONGO_URI: Optional[str] = None
+    MONGO_DB_NAME: str = "forum_db"
+    MONGO_MAX_POOL_SIZE: int = 10
+    MONGO_MIN_POOL_SIZE: int = 2
+    MONGO_SERVER_SELECTION_TIMEOUT_MS: int = 5000
+    MONGO_CONNECT_TIMEOUT_MS: int = 10000
+    MONGO_SOCKET_TIMEOUT_MS: int = 10000
+    MONGO_MAX_IDLE_TIME_MS: Optional[int] = None
+    # Tiempo máximo del ping de /health/ready
+    MONGO_PING_TIMEOUT_MS: int = 2000
+
+    # Arranque rápido (escalado a cero): aceptar peticiones sin esperar a
+    # Mongo y precalentar el pool en segundo plano
+    FAST_START: bool = False
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        return cls(**{name: os.environ[name] for name in cls.model_fields if os.environ.get(name)})
+
 
-settings = Settings()
+settings = Settings.from_env()
@@ -0,0 +1,71 @@
+import hashlib
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from fastapi import Response
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def make_etag(*parts) -> str:
+    """
+    ETag fuerte a partir de los valores que determinan una representación
+    (id, updated_at, contadores, versiones...). Mismo estado -> mismo ETag.
+    """
+    digest = hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()
+    return f'"{digest}"'
+
+
+def make_post_etag(updated_at: Optional[datetime], likes_count: int, dislikes_count: int,
+                   comments_count: int) -> str:
+    """
+    ETag fuerte de un post. En lugar de un hash contiene los propios valores
+    de versión (updated_at en ms + contadores), así un If-Match se puede
+    traducir a un filtro de Mongo sin releer el post.
+    """
+    millis = (updated_at - EPOCH) // timedelta(milliseconds=1) if updated_at else 0
+    return f'"{millis}.{likes_count}.{dislikes_count}.{comments_count}"'
+
+
+def parse_post_etag(etag: str) -> Optional[dict]:
+    """
+    Inversa de make_post_etag: devuelve los valores de versión como filtro
+    ({'updated_at': ..., 'likes_count': ...}) o None si el ETag no es de un post.
+    """
+    etag = etag.strip()
+    if not (len(etag) >= 2 and etag[0] == etag[-1] == '"'):
+        return None
+    try:
+        millis, likes, dislikes, comments = (int(p) for p in etag[1:-1].split("."))
+    except ValueError:
+        return None
+    return {
+        "updated_at": EPOCH + timedelta(milliseconds=millis) if millis else None,
+        "likes_count": likes,
+        "dislikes_count": dislikes,
+        "comments_count": comments,
+    }
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Comprueba el header If-None-Match contra el ETag actual.
+    Acepta '*' y listas separadas por comas; como indica la RFC 9110 para
+    If-None-Match, la comparación es débil (se ignora el prefijo W/).
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def not_modified(etag: str, headers: Optional[Dict[str, str]] = None) -> Response:
+    """Respuesta 304 sin cuerpo (con las mismas cabeceras que tendría el 200)"""
+    return Response(status_code=304, headers={"ETag": etag, **(headers or {})})
@@ -0,0 +1,295 @@
+import bisect
+import contextvars
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Buckets de latencia (segundos) de las peticiones HTTP
+HTTP_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Buckets de latencia (segundos) de los comandos de Mongo y de la espera por conexión
+MONGO_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class _Metric:
+    """Base de las métricas: nombre, ayuda, etiquetas y un lock por métrica"""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Tuple[str, ...]) -> Tuple[str, ...]:
+        if len(labels) != len(self.labels):
+            raise ValueError(f"{self.name} espera las etiquetas {self.labels}")
+        return tuple(str(v) for v in labels)
+
+    def samples(self) -> Iterable[Tuple[str, Dict[str, str], float]]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for name, labels, value in self.samples():
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        super().__init__(name, help, labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield self.name, dict(zip(self.labels, key)), value
+
+
+class Gauge(_Metric):
+    """Gauge con inc/dec/set, o calculado al exportar si se pasa `collect`"""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (),
+                 collect: Optional[Callable[[], Dict[Tuple[str, ...], float]]] = None):
+        super().__init__(name, help, labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._collect = collect
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, *labels: str, amount: float = 1.0):
+        self.inc(*labels, amount=-amount)
+
+    def total(self) -> float:
+        """Suma de todas las series (p. ej. peticiones en curso de cualquier método)"""
+        with self._lock:
+            return sum(self._values.values())
+
+    def set(self, value: float, *labels: str):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def value(self, *labels: str) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def samples(self):
+        if self._collect is not None:
+            try:
+                for key, value in self._collect().items():
+                    self.set(value, *key)
+            except Exception as e:
+                print(f"⚠️ Error calculando la métrica {self.name}: {e}")
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield self.name, dict(zip(self.labels, key)), value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = HTTP_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+        # Por etiquetas: [cuentas por bucket (no acumuladas) + la de +Inf, suma]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labels: str):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    def count(self, *labels: str) -> int:
+        with self._lock:
+            entry = self._values.get(self._key(labels))
+            return sum(entry[0]) if entry else 0
+
+    def samples(self):
+        with self._lock:
+            items = sorted((key, (list(counts), total)) for key, (counts, total) in self._values.items())
+        for key, (counts, total) in items:
+            labels = dict(zip(self.labels, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                yield f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, cumulative
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, cumulative
+
+
+class Registry:
+    """Conjunto de métricas del proceso, exportadas en el formato de texto de Prometheus"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"La métrica {metric.name} ya está registrada")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, help, labels))
+
+    def gauge(self, name: str, help: str, labels: Sequence[str] = (), collect=None) -> Gauge:
+        return self.register(Gauge(name, help, labels, collect))
+
+    def histogram(self, name: str, help: str, labels: Sequence[str] = (), buckets=HTTP_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help, labels, buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+registry = Registry()
+
+# Peticiones HTTP, por plantilla de ruta (no por URL, para acotar las series)
+http_requests = registry.counter(
+    "forum_http_requests_total", "Peticiones HTTP atendidas", ("method", "route", "status"))
+http_latency = registry.histogram(
+    "forum_http_request_duration_seconds", "Latencia de las peticiones HTTP", ("method", "route"))
+# En curso solo por método: la ruta no se conoce hasta que el router la resuelve
+http_in_flight = registry.gauge(
+    "forum_http_requests_in_flight", "Peticiones HTTP en curso", ("method",))
+
+# Comandos de Mongo (pymongo CommandListener) y pool de conexiones (ConnectionPoolListener)
+mongo_latency = registry.histogram(
+    "forum_mongo_command_duration_seconds", "Latencia de los comandos de Mongo",
+    ("collection", "command"), buckets=MONGO_BUCKETS)
+mongo_failures = registry.counter(
+    "forum_mongo_command_failures_total", "Comandos de Mongo que fallaron", ("collection", "command"))
+mongo_checkout_wait = registry.histogram(
+    "forum_mongo_pool_checkout_wait_seconds", "Espera hasta obtener una conexión del pool",
+    ("address",), buckets=MONGO_BUCKETS)
+mongo_checkout_failures = registry.counter(
+    "forum_mongo_pool_checkout_failures_total", "Esperas por conexión que fallaron", ("address", "reason"))
+mongo_connections_in_use = registry.gauge(
+    "forum_mongo_pool_connections_in_use", "Conexiones del pool prestadas ahora mismo", ("address",))
+mongo_slow_commands = registry.counter(
+    "forum_mongo_slow_commands_total", "Comandos de Mongo por encima de MONGO_SLOW_COMMAND_MS", ("collection", "command"))
+mongo_collscans = registry.counter(
+    "forum_mongo_collscans_total", "Comandos lentos cuyo plan ganador recorre la colección entera", ("collection",))
+
+
+# Scope ASGI de la petición en curso; run_in_threadpool lo copia a los hilos de las rutas síncronas
+current_scope: contextvars.ContextVar = contextvars.ContextVar("current_scope", default=None)
+
+
+def current_route() -> Optional[str]:
+    """Método y plantilla de la ruta que se está atendiendo (None fuera de una petición)"""
+    scope = current_scope.get()
+    if scope is None:
+        return None
+    route = scope.get("route")
+    return f"{scope['method']} {route.path if route is not None else scope['path']}"
+
+
+class RequestMetricsMiddleware:
+    """
+    Middleware ASGI que mide latencia, estado y peticiones en curso de cada
+    ruta. La etiqueta `route` es la plantilla de la ruta que atendió la
+    petición (p. ej. /orgs/{org_id}/forum/{post_id}), que el router deja en
+    el scope; lo que no coincide con ninguna ruta se agrupa en `unmatched`.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = {"code": 500}
+        start = time.perf_counter()
+        http_in_flight.inc(method)
+        token = current_scope.set(scope)
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            current_scope.reset(token)
+            http_in_flight.dec(method)
+            route = scope["route"].path if "route" in scope else "unmatched"
+            http_latency.observe(time.perf_counter() - start, method, route)
+            http_requests.inc(method, route, str(status["code"]))
+
+
+def _threadpool_stats() -> Dict[str, float]:
+    """Estado del limitador de anyio que usan run_in_threadpool y las rutas síncronas"""
+    from anyio.to_thread import current_default_thread_limiter
+
+    stats = current_default_thread_limiter().statistics()
+    return {"busy": stats.borrowed_tokens, "waiting": stats.tasks_waiting, "capacity": stats.total_tokens}
+
+
+# Solo se pueden leer desde el event loop (la ruta /metrics es async)
+threadpool_busy = registry.gauge(
+    "forum_threadpool_threads_busy", "Hilos del thread pool ocupados con rutas o servicios síncronos",
+    collect=lambda: {(): _threadpool_stats()["busy"]})
+threadpool_queue = registry.gauge(
+    "forum_threadpool_queue_depth", "Llamadas esperando un hilo libre del thread pool",
+    collect=lambda: {(): _threadpool_stats()["waiting"]})
+threadpool_capacity = registry.gauge(
+    "forum_threadpool_capacity", "Tamaño del thread pool",
+    collect=lambda: {(): _threadpool_stats()["capacity"]})
@@ -0,0 +1,66 @@
+import base64
+import json
+from datetime import datetime
+from typing import Callable, Optional, Tuple
+
+from bson import ObjectId
+from bson.errors import InvalidId
+
+# Tamaño de página por defecto y máximo permitido para los listados
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(created_at: datetime, object_id) -> str:
+    """
+    Codifica la posición (created_at, _id) del último elemento de una página
+    en un cursor opaco y seguro para URLs.
+    """
+    payload = json.dumps(
+        {"t": created_at.isoformat(), "id": str(object_id)},
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, ObjectId]:
+    """
+    Decodifica un cursor generado por encode_cursor.
+    Lanza ValueError si el cursor no es válido.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(payload["t"]), ObjectId(payload["id"])
+    except (ValueError, KeyError, TypeError, InvalidId) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def keyset_filter(created_at: datetime, last_id: ObjectId, ascending: bool = False) -> dict:
+    """
+    Filtro crudo de Mongo para los elementos posteriores al cursor en orden
+    (-created_at, -_id), o (created_at, _id) con ascending=True. El rango sobre
+    created_at acota el recorrido del índice y el _id desempata elementos
+    creados en el mismo instante.
+    """
+    if ascending:
+        return {
+            "created_at": {"$gte": created_at},
+            "$or": [{"created_at": {"$gt": created_at}}, {"_id": {"$gt": last_id}}],
+        }
+    return {
+        "created_at": {"$lte": created_at},
+        "$or": [{"created_at": {"$lt": created_at}}, {"_id": {"$lt": last_id}}],
+    }
+
+
+def cut_page(rows: list, limit: int, position_of: Callable) -> Tuple[list, Optional[str]]:
+    """
+    Recibe limit + 1 filas, recorta la sobrante y genera el cursor de la
+    página siguiente a partir de position_of(última fila) -> (created_at, _id).
+    """
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(*position_of(rows[-1]))
+    return rows, next_cursor
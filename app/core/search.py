@@ -0,0 +1,273 @@
+import math
+import re
+import threading
+import unicodedata
+from abc import ABC, abstractmethod
+from collections import Counter, OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+# Peso de cada campo en la relevancia de un post
+FIELD_WEIGHTS = {"title": 3.0, "content": 1.0, "comments": 0.5}
+
+# Parámetros de BM25
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Palabras vacías (español e inglés) que no se indexan
+STOPWORDS = frozenset("""
+a al algo como con de del el en es esta este la las lo los mas me mi no o para pero por que se si sin
+su sus te tu un una uno y ya an and are as at be but by for from has have in is it its of on or that
+the this to was with
+""".split())
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Términos de un texto: minúsculas, sin tildes y sin palabras vacías"""
+    if not text:
+        return []
+    normalized = unicodedata.normalize("NFKD", text.lower())
+    normalized = "".join(c for c in normalized if not unicodedata.combining(c))
+    return [t for t in _TOKEN_RE.findall(normalized) if len(t) > 1 and t not in STOPWORDS]
+
+
+class SearchBackend(ABC):
+    """
+    Interfaz de los backends de búsqueda de texto.
+
+    Los servicios avisan al backend de cada escritura (index_* / remove_*);
+    un backend que se apoye en índices de la base de datos puede ignorarlas.
+    search devuelve los posts más relevantes de la organización como
+    [{"post_id", "score", "matched"}], con `matched` los campos que coinciden
+    (title, content, comments; "post" si el backend no distingue título y contenido).
+    """
+
+    @abstractmethod
+    def index_post(self, org_id: str, post_id, title: str, content: str):
+        """Añade o reemplaza el título y contenido de un post"""
+
+    @abstractmethod
+    def remove_post(self, org_id: str, post_id):
+        """Quita un post y sus comentarios"""
+
+    @abstractmethod
+    def index_comment(self, org_id: str, post_id, comment_id, content: str):
+        """Añade un comentario al texto de su post"""
+
+    @abstractmethod
+    def remove_comment(self, org_id: str, post_id, comment_id):
+        """Quita un comentario del texto de su post"""
+
+    @abstractmethod
+    def search(self, org_id: str, query: str, limit: int) -> List[dict]:
+        """Posts de la organización ordenados por relevancia"""
+
+    @abstractmethod
+    def stats(self) -> Dict[str, int]:
+        """Métricas del backend"""
+
+
+class _PostTerms:
+    """Frecuencia de términos de un post por campo (los comentarios se suman en uno)"""
+
+    __slots__ = ("title", "content", "comments", "comment_totals", "length")
+
+    def __init__(self):
+        self.title: Counter = Counter()
+        self.content: Counter = Counter()
+        self.comments: Dict[object, Counter] = {}
+        self.comment_totals: Counter = Counter()
+        self.length = 0.0
+
+    def set_text(self, title: str, content: str):
+        self.title = Counter(tokenize(title))
+        self.content = Counter(tokenize(content))
+
+    def set_comment(self, comment_id, content: str):
+        self.drop_comment(comment_id)
+        terms = self.comments[comment_id] = Counter(tokenize(content))
+        self.comment_totals += terms
+
+    def drop_comment(self, comment_id):
+        terms = self.comments.pop(comment_id, None)
+        if terms:
+            self.comment_totals -= terms
+
+    def terms(self) -> Set[str]:
+        return set(self.title) | set(self.content) | set(self.comment_totals)
+
+    def field_frequencies(self, term: str) -> Dict[str, int]:
+        return {"title": self.title[term], "content": self.content[term], "comments": self.comment_totals[term]}
+
+    def weighted_length(self) -> float:
+        return (FIELD_WEIGHTS["title"] * sum(self.title.values())
+                + FIELD_WEIGHTS["content"] * sum(self.content.values())
+                + FIELD_WEIGHTS["comments"] * sum(self.comment_totals.values()))
+
+
+class _OrgIndex:
+    """Índice invertido de una organización: término -> posts que lo contienen"""
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.loaded = False
+        self.posts: Dict[object, _PostTerms] = {}
+        self.postings: Dict[str, Set[object]] = {}
+        self.total_length = 0.0
+
+    def update(self, post_id, change: Callable[[_PostTerms], None], create: bool = True):
+        """Aplica un cambio al post y actualiza postings y longitudes con la diferencia"""
+        doc = self.posts.get(post_id)
+        if doc is None:
+            if not create:
+                return
+            doc = self.posts[post_id] = _PostTerms()
+        before_terms, before_length = doc.terms(), doc.length
+
+        change(doc)
+
+        after_terms = doc.terms()
+        for term in before_terms - after_terms:
+            self._unpost(term, post_id)
+        for term in after_terms - before_terms:
+            self.postings.setdefault(term, set()).add(post_id)
+        doc.length = doc.weighted_length()
+        self.total_length += doc.length - before_length
+
+    def remove(self, post_id):
+        doc = self.posts.pop(post_id, None)
+        if doc is None:
+            return
+        for term in doc.terms():
+            self._unpost(term, post_id)
+        self.total_length -= doc.length
+
+    def _unpost(self, term: str, post_id):
+        postings = self.postings[term]
+        postings.discard(post_id)
+        if not postings:
+            del self.postings[term]
+
+
+class InvertedIndex(SearchBackend):
+    """
+    Índice invertido en memoria del proceso, mantenido de forma incremental
+    con las escrituras de los servicios. No necesita índices de texto de
+    Mongo, así que sirve en desarrollo y en los tests.
+
+    Cada organización se carga entera con `loader(org_id)` la primera vez que
+    se busca en ella; hasta entonces sus escrituras se ignoran (la carga ya
+    las verá). Mientras se carga, las escrituras de esa organización esperan
+    al lock y se aplican después, así nunca se pisan con datos más viejos.
+    Se mantienen como mucho `max_orgs` organizaciones (LRU); una expulsada se
+    vuelve a cargar al buscar en ella.
+
+    `loader` devuelve pares ("post", (post_id, title, content)) y
+    ("comment", (post_id, comment_id, content)).
+
+    Cada proceso tiene su propio índice: con varias réplicas, una no ve lo
+    que escriben las demás hasta recargar. En producción se usa el backend
+    de índices de texto de Mongo.
+    """
+
+    def __init__(self, loader: Optional[Callable[[str], Iterable[Tuple[str, tuple]]]] = None,
+                 max_orgs: int = 100):
+        self.loader = loader
+        self.max_orgs = max_orgs
+        self._orgs: "OrderedDict[str, _OrgIndex]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._loads = 0
+        self._evictions = 0
+
+    def index_post(self, org_id: str, post_id, title: str, content: str):
+        self._write(org_id, lambda index: index.update(post_id, lambda doc: doc.set_text(title, content)))
+
+    def remove_post(self, org_id: str, post_id):
+        self._write(org_id, lambda index: index.remove(post_id))
+
+    def index_comment(self, org_id: str, post_id, comment_id, content: str):
+        # Un comentario de un post que no está en el índice no crea el post
+        self._write(org_id, lambda index: index.update(
+            post_id, lambda doc: doc.set_comment(comment_id, content), create=False))
+
+    def remove_comment(self, org_id: str, post_id, comment_id):
+        self._write(org_id, lambda index: index.update(
+            post_id, lambda doc: doc.drop_comment(comment_id), create=False))
+
+    def search(self, org_id: str, query: str, limit: int) -> List[dict]:
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+        index = self._org(org_id, create=True)
+        with index.lock:
+            if not index.loaded:
+                self._load(org_id, index)
+            total_posts = len(index.posts)
+            if not total_posts:
+                return []
+            average_length = index.total_length / total_posts or 1.0
+
+            scores: Dict[object, float] = {}
+            matched: Dict[object, Set[str]] = {}
+            for term in terms:
+                postings = index.postings.get(term, ())
+                idf = math.log(1 + (total_posts - len(postings) + 0.5) / (len(postings) + 0.5))
+                for post_id in postings:
+                    doc = index.posts[post_id]
+                    frequencies = doc.field_frequencies(term)
+                    tf = sum(FIELD_WEIGHTS[f] * n for f, n in frequencies.items())
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * doc.length / average_length)
+                    scores[post_id] = scores.get(post_id, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+                    matched.setdefault(post_id, set()).update(f for f, n in frequencies.items() if n)
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], str(item[0])))[:limit]
+        return [
+            {"post_id": post_id, "score": round(score, 4),
+             "matched": [f for f in FIELD_WEIGHTS if f in matched[post_id]]}
+            for post_id, score in ranked
+        ]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            orgs = list(self._orgs.values())
+            loads, evictions = self._loads, self._evictions
+        return {
+            "orgs": len(orgs),
+            "posts": sum(len(index.posts) for index in orgs),
+            "terms": sum(len(index.postings) for index in orgs),
+            "loads": loads,
+            "evictions": evictions,
+        }
+
+    def _write(self, org_id: str, apply: Callable[[_OrgIndex], None]):
+        index = self._org(org_id, create=False)
+        if index is None:
+            return
+        with index.lock:
+            apply(index)
+
+    def _org(self, org_id: str, create: bool) -> Optional[_OrgIndex]:
+        with self._lock:
+            index = self._orgs.get(org_id)
+            if index is None and create:
+                index = self._orgs[org_id] = _OrgIndex()
+                while len(self._orgs) > self.max_orgs:
+                    self._orgs.popitem(last=False)
+                    self._evictions += 1
+            if index is not None:
+                self._orgs.move_to_end(org_id)
+            return index
+
+    def _load(self, org_id: str, index: _OrgIndex):
+        if self.loader is not None:
+            for kind, values in self.loader(org_id):
+                if kind == "post":
+                    post_id, title, content = values
+                    index.update(post_id, lambda doc: doc.set_text(title, content))
+                else:
+                    post_id, comment_id, content = values
+                    index.update(post_id, lambda doc: doc.set_comment(comment_id, content), create=False)
+        index.loaded = True
+        with self._lock:
+            self._loads += 1
@@ -0,0 +1,80 @@
+import json
+from datetime import datetime
+from typing import Any, List, Mapping, Optional, Tuple
+
+from bson import ObjectId
+from fastapi import Response
+
+
+def _default(value: Any):
+    """Tipos de Mongo que json no sabe serializar"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def reference_id(value: Any):
+    """
+    Id de un ReferenceField tal como está guardado (ObjectId, DBRef o el
+    Document ya cargado) sin desreferenciarlo, es decir, sin consultar Mongo.
+    """
+    return getattr(value, "id", value)
+
+
+def dumps(data: Any) -> bytes:
+    """
+    Serializa directamente a bytes JSON estructuras planas (dicts/listas)
+    leídas de Mongo, sin pasar por modelos de Pydantic.
+    """
+    return json.dumps(
+        data,
+        default=_default,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def json_response(data: Any, status_code: int = 200,
+                  headers: Optional[Mapping[str, str]] = None) -> Response:
+    """Respuesta JSON ya serializada (FastAPI no vuelve a validar el response_model)"""
+    return json_bytes_response(dumps(data), status_code=status_code, headers=headers)
+
+
+def json_bytes_response(body: bytes, status_code: int = 200,
+                        headers: Optional[Mapping[str, str]] = None) -> Response:
+    """Respuesta con un cuerpo JSON que ya está en bytes (p. ej. leído de caché)"""
+    return Response(
+        content=body,
+        status_code=status_code,
+        headers=headers,
+        media_type="application/json",
+    )
+
+
+def loads_items(body: bytes, content_type: Optional[str] = None) -> Tuple[List[Tuple[int, Any]], List[dict]]:
+    """
+    Lee un lote de elementos enviado como array JSON o como NDJSON (un objeto
+    por línea). Devuelve ([(índice, elemento)], [errores]); en NDJSON una línea
+    mal formada es un error de ese elemento y no invalida el resto.
+    Lanza ValueError si un array JSON no se puede leer.
+    """
+    text = body.decode("utf-8")
+    is_ndjson = "ndjson" in (content_type or "") or not text.lstrip().startswith("[")
+
+    if not is_ndjson:
+        try:
+            items = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON array: {e}") from e
+        return list(enumerate(items)), []
+
+    items, errors = [], []
+    for index, line in enumerate(line for line in text.splitlines() if line.strip()):
+        try:
+            items.append((index, json.loads(line)))
+        except json.JSONDecodeError as e:
+            errors.append({"index": index, "error": f"Invalid JSON: {e.msg}"})
+    return items, errors
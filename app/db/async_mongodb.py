@@ -0,0 +1,72 @@
+import asyncio
+import os
+import time
+
+from app.core.config import settings
+from app.db.mongodb import DB_BACKEND, DB_NAME, client_options, uri
+
+# Con Motor un solo worker atiende muchas peticiones concurrentes,
+# así que el pool es más grande que el de MongoEngine
+ASYNC_MAX_POOL_SIZE = int(os.getenv("ASYNC_MONGO_MAX_POOL_SIZE", "100"))
+
+_client = None
+
+
+def get_async_db():
+    """
+    Devuelve la base de datos del foro sobre un cliente Motor.
+    El cliente se crea de forma perezosa en la primera llamada, dentro del
+    event loop que atiende las peticiones.
+    """
+    global _client
+    if _client is None:
+        from motor.motor_asyncio import AsyncIOMotorClient
+
+        _client = AsyncIOMotorClient(
+            uri,
+            maxPoolSize=ASYNC_MAX_POOL_SIZE,
+            minPoolSize=min(settings.MONGO_MIN_POOL_SIZE, ASYNC_MAX_POOL_SIZE),
+            **client_options()
+        )
+    return _client[DB_NAME]
+
+
+def async_backend_enabled() -> bool:
+    """True si la capa de lectura usa Motor (FORUM_DB_BACKEND=async y Motor disponible)"""
+    if DB_BACKEND != "async":
+        return False
+    try:
+        import motor.motor_asyncio  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+async def ping_async_db() -> float:
+    """Ping con el cliente Motor; devuelve la latencia en ms o lanza la excepción"""
+    db = get_async_db()
+    start = time.perf_counter()
+    await db.client.admin.command("ping")
+    return (time.perf_counter() - start) * 1000
+
+
+async def warm_up_async_db() -> int:
+    """
+    Abre las conexiones mínimas del pool de Motor antes de la primera
+    lectura, como MongoConnectionManager.warm_up con MongoEngine: un ping que
+    falla si Mongo no responde y luego tantos pings simultáneos como
+    conexiones mínimas. Devuelve cuántos pings se hicieron.
+    """
+    await ping_async_db()
+    connections = min(settings.MONGO_MIN_POOL_SIZE, ASYNC_MAX_POOL_SIZE)
+    if connections > 1:
+        await asyncio.gather(*(ping_async_db() for _ in range(connections)))
+    return 1 + (connections if connections > 1 else 0)
+
+
+def close_async_db():
+    """Cierra el cliente Motor si se llegó a crear"""
+    global _client
+    if _client is not None:
+        _client.close()
+        _client = None
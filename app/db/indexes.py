@@ -0,0 +1,248 @@
+"""
+Sincronización y verificación de los índices de MongoDB.
+
+Los modelos declaran sus índices (POST_INDEXES, COMMENT_INDEXES,
+REACTION_INDEXES) con la sintaxis de MongoEngine, pero tienen
+auto_create_index desactivado. Este módulo compara esas declaraciones con
+los índices reales de cada colección, crea los que faltan, borra los que ya
+no se declaran (solo si se pide) y comprueba con explain que las consultas
+de HOT_QUERIES no recorren colecciones enteras.
+"""
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from bson import ObjectId
+
+from app.db.monitoring import plan_stages, winning_plan
+from app.models.comment__model import COMMENT_INDEXES
+from app.models.post_model import DELETED_POSTS, LIVE_POSTS, POST_INDEXES
+from app.models.reaction_model import REACTION_INDEXES
+
+DECLARED_INDEXES = {
+    "posts": POST_INDEXES,
+    "comments": COMMENT_INDEXES,
+    "reactions": REACTION_INDEXES,
+}
+
+# Opciones de la declaración que se pasan tal cual a create_index
+_INDEX_OPTIONS = ("unique", "sparse", "partialFilterExpression", "weights", "default_language",
+                  "expireAfterSeconds", "name")
+
+# Opciones que, si cambian, obligan a recrear el índice
+_COMPARED_OPTIONS = ("unique", "sparse", "partialFilterExpression", "expireAfterSeconds")
+
+_DIRECTIONS = {"-": -1, "+": 1, "$": "text", "#": "hashed"}
+
+_SAMPLE_ID = ObjectId()
+_SAMPLE_DATE = datetime(2024, 1, 1)
+
+# Consultas calientes de los servicios, con valores de ejemplo para poder
+# pasarlas por explain. Cada una debe poder usar un índice declarado.
+HOT_QUERIES = [
+    {"name": "PostService.get_posts", "collection": "posts",
+     "filter": {"organization_id": "org", **LIVE_POSTS}, "sort": [("created_at", -1), ("_id", -1)]},
+    {"name": "PostService.get_posts (cursor)", "collection": "posts",
+     "filter": {"organization_id": "org", **LIVE_POSTS, "created_at": {"$lte": _SAMPLE_DATE},
+                "$or": [{"created_at": {"$lt": _SAMPLE_DATE}}, {"_id": {"$lt": _SAMPLE_ID}}]},
+     "sort": [("created_at", -1), ("_id", -1)]},
+    {"name": "PostService.get_post_by_id", "collection": "posts",
+     "filter": {"_id": _SAMPLE_ID, "organization_id": "org", **LIVE_POSTS}},
+    {"name": "ReadService.reaction_stats_batch", "collection": "posts",
+     "filter": {"_id": {"$in": [_SAMPLE_ID]}, "organization_id": "org", **LIVE_POSTS}},
+    {"name": "ForumExporter.records", "collection": "posts",
+     "filter": {"organization_id": "org", **LIVE_POSTS}, "sort": [("created_at", 1), ("_id", 1)]},
+    {"name": "SearchService.search", "collection": "posts",
+     "filter": {"organization_id": "org", "$text": {"$search": "wifi"}, **LIVE_POSTS}},
+    {"name": "CounterReconciler._post_batches (org)", "collection": "posts",
+     "filter": {"organization_id": "org", **LIVE_POSTS, "_id": {"$gt": _SAMPLE_ID}}, "sort": [("_id", 1)]},
+    {"name": "CounterReconciler._post_batches", "collection": "posts",
+     "filter": {**LIVE_POSTS, "_id": {"$gt": _SAMPLE_ID}}, "sort": [("_id", 1)]},
+    {"name": "TenantPurger._post_batches", "collection": "posts",
+     "filter": {"organization_id": "org", "_id": {"$gt": _SAMPLE_ID}}, "sort": [("_id", 1)]},
+    {"name": "PostPurger.run_once", "collection": "posts",
+     "filter": dict(DELETED_POSTS), "sort": [("deleted_at", 1)]},
+    {"name": "CommentService.get_comments", "collection": "comments",
+     "filter": {"post": _SAMPLE_ID}, "sort": [("created_at", 1), ("_id", 1)]},
+    {"name": "CommentService.get_comments (desc)", "collection": "comments",
+     "filter": {"post": _SAMPLE_ID}, "sort": [("created_at", -1), ("_id", -1)]},
+    {"name": "ForumExporter._children (comments)", "collection": "comments",
+     "filter": {"post": {"$in": [_SAMPLE_ID]}}, "sort": [("post", 1), ("created_at", 1), ("_id", 1)]},
+    {"name": "MongoTextSearch.search (comments)", "collection": "comments",
+     "filter": {"organization_id": "org", "$text": {"$search": "wifi"}}},
+    {"name": "ReactionService.toggle_reaction", "collection": "reactions",
+     "filter": {"post": _SAMPLE_ID, "user_id": "user"}},
+    {"name": "ReadService.viewer_reactions", "collection": "reactions",
+     "filter": {"post": {"$in": [_SAMPLE_ID]}, "user_id": "user"}},
+    {"name": "TenantPurger._delete_children (comments)", "collection": "comments",
+     "filter": {"post": {"$in": [_SAMPLE_ID]}}, "sort": [("post", 1), ("created_at", 1), ("_id", 1)]},
+    {"name": "TenantPurger._delete_children (reactions)", "collection": "reactions",
+     "filter": {"post": {"$in": [_SAMPLE_ID]}}, "sort": [("post", 1), ("user_id", 1)]},
+    {"name": "ForumExporter._children (reactions)", "collection": "reactions",
+     "filter": {"post": {"$in": [_SAMPLE_ID]}}, "sort": [("post", 1), ("user_id", 1)]},
+    {"name": "PostPurger._purge_batch", "collection": "reactions", "filter": {"post": _SAMPLE_ID}},
+]
+
+
+def index_spec(declaration) -> Tuple[List[Tuple[str, object]], dict]:
+    """
+    Traduce una declaración de MongoEngine ('-created_at', ('post', 'id'),
+    {'fields': ..., 'unique': True}) a la clave y opciones de create_index
+    """
+    if isinstance(declaration, dict):
+        fields = declaration["fields"]
+        options = {k: declaration[k] for k in _INDEX_OPTIONS if k in declaration}
+    else:
+        fields = declaration
+        options = {}
+    if isinstance(fields, str):
+        fields = (fields,)
+
+    key = []
+    for field in fields:
+        direction = _DIRECTIONS.get(field[0], 1)
+        name = field[1:] if field[0] in _DIRECTIONS else field
+        key.append(("_id" if name == "id" else name, direction))
+    return key, options
+
+
+def key_signature(key: List[Tuple[str, object]], weights: Optional[dict] = None) -> tuple:
+    """
+    Clave comparable entre lo declarado y lo que devuelve index_information:
+    Mongo guarda los campos de texto como _fts/_ftsx y los nombra en weights.
+    """
+    text_fields = sorted(weights) if any(f == "_fts" for f, _ in key) and weights else []
+    signature = []
+    for field, direction in key:
+        if field in ("_fts", "_ftsx"):
+            continue
+        if direction == "text":
+            text_fields.append(field)
+        else:
+            signature.append((field, direction))
+    if text_fields:
+        signature.append(("$text", tuple(sorted(set(text_fields)))))
+    return tuple(signature)
+
+
+def plan_collection(collection, declarations: List) -> dict:
+    """
+    Diferencias entre los índices declarados y los reales de una colección:
+    missing (declarados que no existen), stale (existen y no se declaran),
+    changed (misma clave con otras opciones) y ok.
+    """
+    actual = {
+        key_signature(info["key"], info.get("weights")): (name, info)
+        for name, info in collection.index_information().items() if name != "_id_"
+    }
+    report = {"collection": collection.name, "missing": [], "changed": [], "stale": [], "ok": []}
+    declared = set()
+    for declaration in declarations:
+        key, options = index_spec(declaration)
+        signature = key_signature(key)
+        declared.add(signature)
+        if signature not in actual:
+            report["missing"].append({"key": key, "options": options})
+            continue
+        name, info = actual[signature]
+        differences = {
+            option: {"declared": options.get(option), "actual": info.get(option)}
+            for option in _COMPARED_OPTIONS if (options.get(option) or None) != (info.get(option) or None)
+        }
+        if differences:
+            report["changed"].append({"name": name, "key": key, "options": options, "differences": differences})
+        else:
+            report["ok"].append(name)
+    report["stale"] = sorted(name for signature, (name, _) in actual.items() if signature not in declared)
+    return report
+
+
+def sync_indexes(db, drop_stale: bool = False, dry_run: bool = False) -> List[dict]:
+    """
+    Crea los índices declarados que faltan en cada colección. Con drop_stale
+    también borra los que sobran y recrea los que cambiaron de opciones (un
+    índice distinto con la misma clave no se puede crear sin borrar el
+    anterior). Con dry_run solo informa. Devuelve un informe por colección.
+    """
+    reports = []
+    for collection_name, declarations in DECLARED_INDEXES.items():
+        collection = db[collection_name]
+        report = plan_collection(collection, declarations)
+        report["created"], report["dropped"] = [], []
+        if not dry_run:
+            if drop_stale:
+                for name in report["stale"] + [c["name"] for c in report["changed"]]:
+                    collection.drop_index(name)
+                    report["dropped"].append(name)
+            to_create = report["missing"] + (report["changed"] if drop_stale else [])
+            for spec in to_create:
+                report["created"].append(collection.create_index(spec["key"], **spec["options"]))
+        reports.append(report)
+    return reports
+
+
+def in_sync(reports: List[dict]) -> bool:
+    """True si no falta ni ha cambiado ningún índice declarado (los sobrantes no cuentan)"""
+    return all(not r["missing"] and not r["changed"] for r in reports)
+
+
+def index_candidates(query: dict, declarations: List) -> List[tuple]:
+    """
+    Índices declarados (y el de _id) que el planificador puede usar para la
+    consulta: los que empiezan por un campo del filtro o cuyo prefijo es el
+    orden pedido, y los de texto para $text. Los parciales solo si el filtro
+    incluye su condición.
+    """
+    filter_ = query["filter"]
+    sort = query.get("sort", [])
+    candidates = []
+    for declaration in [("id",)] + list(declarations):
+        key, options = index_spec(declaration)
+        partial = options.get("partialFilterExpression")
+        if partial and any(filter_.get(k) != v for k, v in partial.items()):
+            continue
+        if any(direction == "text" for _, direction in key):
+            if "$text" in filter_:
+                candidates.append(tuple(key))
+            continue
+        if "$text" in filter_:
+            continue
+        leading = key[0][0]
+        if leading in filter_ or _serves_sort(key, [], sort):
+            candidates.append(tuple(key))
+    return candidates
+
+
+def sort_served(query: dict, key: List[Tuple[str, object]]) -> bool:
+    """True si el índice devuelve ya ordenado (prefijo de igualdades y luego el orden)"""
+    sort = query.get("sort", [])
+    if not sort:
+        return True
+    equalities = [f for f, v in query["filter"].items() if not isinstance(v, dict)]
+    return _serves_sort(list(key), equalities, sort)
+
+
+def _serves_sort(key: List, equalities: List[str], sort: List) -> bool:
+    fields = list(key)
+    while fields and fields[0][0] in equalities and fields[0][0] not in dict(sort):
+        fields.pop(0)
+    if len(fields) < len(sort) or not sort:
+        return False
+    prefix = fields[:len(sort)]
+    if [f for f, _ in prefix] != [f for f, _ in sort]:
+        return False
+    same = all(d == s for (_, d), (_, s) in zip(prefix, sort))
+    reversed_ = all(d == -s for (_, d), (_, s) in zip(prefix, sort))
+    return same or reversed_
+
+
+def explain_hot_queries(db) -> List[dict]:
+    """Pasa cada consulta de HOT_QUERIES por explain y devuelve sus etapas y si hay COLLSCAN"""
+    results = []
+    for query in HOT_QUERIES:
+        command = {"find": query["collection"], "filter": query["filter"], "limit": 10}
+        if query.get("sort"):
+            command["sort"] = dict(query["sort"])
+        explain = db.command({"explain": command, "verbosity": "queryPlanner"})
+        stages = plan_stages(winning_plan(explain))
+        results.append({"name": query["name"], "stages": stages, "collscan": "COLLSCAN" in stages})
+    return results
@@ -1,45 +1,201 @@
 from mongoengine import connect, disconnect
 import os
-from dotenv import load_dotenv
 import sys
-from pathlib import Path
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
 
-# Cargar variables de entorno desde la raíz del proyecto
-env_path = Path(__file__).parent.parent.parent / '.env'
-load_dotenv(dotenv_path=env_path)
+from app.core.config import Settings, settings
+from app.db.monitoring import MONGO_SLOW_COMMAND_MS, CommandMetrics, PoolMetrics, SlowCommandLog
 
 # URI de conexión a MongoDB Atlas
-uri = os.getenv("MONGO_URI")  
+uri = settings.MONGO_URI
+
+# Nombre de la base de datos del foro
+DB_NAME = settings.MONGO_DB_NAME
+
+# Backend de la capa de lectura: 'async' (Motor) o 'sync' (MongoEngine, para comparar)
+DB_BACKEND = os.getenv("FORUM_DB_BACKEND", "async").lower()
+
+# Listeners de pymongo que alimentan /metrics y el registro de comandos lentos;
+# los comparten MongoEngine y Motor
+EVENT_LISTENERS = [CommandMetrics(), PoolMetrics()]
+if MONGO_SLOW_COMMAND_MS > 0:
+    EVENT_LISTENERS.append(SlowCommandLog())
+
+
+def client_options(config: Settings = settings) -> dict:
+    """Opciones de MongoClient comunes a MongoEngine y Motor (sin el tamaño del pool)"""
+    options = dict(
+        uuidRepresentation='standard',
+        serverSelectionTimeoutMS=config.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        connectTimeoutMS=config.MONGO_CONNECT_TIMEOUT_MS,
+        socketTimeoutMS=config.MONGO_SOCKET_TIMEOUT_MS,
+        retryWrites=False,
+        event_listeners=EVENT_LISTENERS,
+    )
+    if config.MONGO_MAX_IDLE_TIME_MS:
+        options["maxIdleTimeMS"] = config.MONGO_MAX_IDLE_TIME_MS
+    return options
+
+
+class MongoConnectionManager:
+    """
+    Ciclo de vida de la conexión de MongoEngine, dirigido por el lifespan de
+    la app: conectar y precalentar el pool antes de aceptar tráfico, comprobar
+    la conexión para /health/ready y cerrarla al apagar.
+
+    Estados: starting -> ready -> draining -> stopped.
+    """
+
+    # Primera espera entre reintentos del precalentamiento en segundo plano
+    # (se dobla en cada fallo hasta WARM_UP_MAX_RETRY_SECONDS)
+    WARM_UP_RETRY_SECONDS = 0.5
+    WARM_UP_MAX_RETRY_SECONDS = 30
+
+    def __init__(self, config: Settings = settings):
+        self.config = config
+        self.client = None
+        self.state = "starting"
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._warm_up_thread: Optional[threading.Thread] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+
+    def connect(self):
+        """Crea el cliente de MongoEngine con el pool y los tiempos de espera de Settings"""
+        if not self.config.MONGO_URI:
+            raise RuntimeError("MONGO_URI no está definida en el archivo .env")
+        with self._lock:
+            # Desconectar cualquier conexión previa
+            disconnect()
+            self.client = connect(
+                db=self.config.MONGO_DB_NAME,
+                host=self.config.MONGO_URI,
+                maxPoolSize=self.config.MONGO_MAX_POOL_SIZE,
+                minPoolSize=self.config.MONGO_MIN_POOL_SIZE,
+                **client_options(self.config),
+            )
+        return self.client
+
+    def warm_up(self) -> int:
+        """
+        Abre las conexiones de minPoolSize antes de la primera petición: un
+        ping que falla si Mongo no responde y luego tantos pings simultáneos
+        como conexiones mínimas, para que cada uno tome una conexión nueva.
+        Devuelve cuántos pings se hicieron.
+        """
+        self.ping()
+        connections = min(self.config.MONGO_MIN_POOL_SIZE, self.config.MONGO_MAX_POOL_SIZE)
+        if connections > 1:
+            start = threading.Barrier(connections)
+
+            def ping_together(_):
+                start.wait()
+                self.ping()
+
+            with ThreadPoolExecutor(max_workers=connections, thread_name_prefix="mongo-warm-up") as pool:
+                list(pool.map(ping_together, range(connections)))
+        return 1 + (connections if connections > 1 else 0)
+
+    def start(self):
+        """Conecta y precalienta; lanza la excepción si Mongo no está disponible"""
+        started = time.perf_counter()
+        try:
+            self.connect()
+            pings = self.warm_up()
+        except Exception as e:
+            print(f"❌ Error de conexión a MongoDB: {str(e)}")
+            if self.config.MONGO_URI:
+                print(f"   URI utilizada: {self.config.MONGO_URI[:30]}...")
+            raise
+        self.state = "ready"
+        print(f"✅ MongoDB listo: {pings} pings de calentamiento en {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    def start_in_background(self):
+        """
+        Arranque rápido (FAST_START): crea el cliente sin esperar a Mongo
+        (pymongo abre las conexiones en la primera operación) y precalienta el
+        pool en un hilo. /health/ready da 503 hasta que termina; si Mongo no
+        responde se reintenta con espera creciente hasta lograrlo o hasta close().
+        """
+        self.connect()
+        self._stopping.clear()
+        self._warm_up_thread = threading.Thread(
+            target=self._warm_up_until_ready, name="mongo-warm-up", daemon=True
+        )
+        self._warm_up_thread.start()
+
+    def _warm_up_until_ready(self):
+        started = time.perf_counter()
+        delay = self.WARM_UP_RETRY_SECONDS
+        while not self._stopping.is_set():
+            try:
+                pings = self.warm_up()
+            except Exception as e:
+                if self._stopping.is_set():
+                    return
+                print(f"⚠️ MongoDB aún no responde ({e}); reintento en {delay:.1f} s")
+                self._stopping.wait(delay)
+                delay = min(delay * 2, self.WARM_UP_MAX_RETRY_SECONDS)
+                continue
+            with self._lock:
+                # Si ya empezó el apagado no se vuelve a marcar como listo
+                if self.state == "starting":
+                    self.state = "ready"
+            print(f"✅ MongoDB listo en segundo plano: {pings} pings de calentamiento "
+                  f"en {(time.perf_counter() - started) * 1000:.0f} ms")
+            return
+
+    def ping(self) -> float:
+        """Ping a Mongo; devuelve la latencia en ms o lanza la excepción"""
+        if self.client is None:
+            raise RuntimeError("MongoDB no está conectado")
+        start = time.perf_counter()
+        self.client.admin.command("ping")
+        return (time.perf_counter() - start) * 1000
+
+    def begin_drain(self):
+        """Deja de estar listo (readiness 503) mientras terminan las peticiones en curso"""
+        with self._lock:
+            if self.state != "stopped":
+                self.state = "draining"
+
+    def close(self):
+        # Corta los reintentos del precalentamiento en segundo plano
+        self._stopping.set()
+        with self._lock:
+            if self.client is not None:
+                disconnect()
+                self.client = None
+            self.state = "stopped"
+
+
+# Conexión compartida por la app; el lifespan de app.main la abre y la cierra
+mongo_manager = MongoConnectionManager()
+
 
 def init_db():
     """
-    Inicializa la conexión con MongoDB Atlas usando MongoEngine
+    Inicializa la conexión con MongoDB Atlas usando MongoEngine (para los
+    comandos de app.cli; la app usa mongo_manager desde su lifespan)
     """
     if not uri:
         print("❌ ERROR: MONGO_URI no está definida en el archivo .env")
         sys.exit(1)
-    
+
     try:
-        # Desconectar cualquier conexión previa
-        disconnect()
-        
-        # Conectar usando MongoEngine con configuración mejorada
-        connect(
-            db='forum_db',  
-            host=uri,
-            uuidRepresentation='standard',
-            serverSelectionTimeoutMS=5000,  
-            connectTimeoutMS=10000,          
-            socketTimeoutMS=10000,           
-            maxPoolSize=10,                  
-            retryWrites=False
-        )
+        mongo_manager.connect()
         print("✅ Successfully connected to MongoDB Atlas with MongoEngine!")
         return True
-        
+
     except Exception as e:
         print(f"❌ Error de conexión a MongoDB: {str(e)}")
-        print(f"   URI utilizada: {uri[:30]}...")  
+        print(f"   URI utilizada: {uri[:30]}...")
         print("\n🔍 Posibles soluciones:")
         print("   1. Verifica que tu IP esté en la whitelist de MongoDB Atlas")
         print("   2. Asegúrate que el cluster esté activo (no pausado)")
@@ -55,7 +211,7 @@ def test_connection():
     try:
         from mongoengine import connect
         client = connect(
-            db='forum_db',
+            db=DB_NAME,
             host=uri,
             serverSelectionTimeoutMS=3000
         )
@@ -0,0 +1,312 @@
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from pymongo import monitoring
+
+from app.core.metrics import (
+    current_route,
+    mongo_checkout_failures,
+    mongo_checkout_wait,
+    mongo_collscans,
+    mongo_connections_in_use,
+    mongo_failures,
+    mongo_latency,
+    mongo_slow_commands,
+)
+
+# Comandos que tardan más de esto (ms) se registran como lentos (0 = desactivado)
+MONGO_SLOW_COMMAND_MS = float(os.getenv("MONGO_SLOW_COMMAND_MS", "200"))
+# Pedir a Mongo el plan (explain) de los comandos lentos para detectar COLLSCAN
+MONGO_SLOW_EXPLAIN = os.getenv("MONGO_SLOW_EXPLAIN", "false").lower() in ("1", "true", "yes")
+# Cada forma de consulta se explica como mucho una vez en este intervalo
+MONGO_SLOW_EXPLAIN_INTERVAL_SECONDS = float(os.getenv("MONGO_SLOW_EXPLAIN_INTERVAL_SECONDS", "300"))
+
+# Comandos que admiten explain y el campo donde va su filtro
+EXPLAINABLE = {"find": "filter", "aggregate": "pipeline", "count": "query", "distinct": "query",
+               "update": "updates", "delete": "deletes", "findAndModify": "query"}
+
+# Campos de sesión y de protocolo que no pueden ir dentro de un explain
+_SESSION_FIELDS = {"lsid", "$db", "$clusterTime", "txnNumber", "$readPreference", "writeConcern",
+                   "autocommit", "startTransaction"}
+
+slow_log = logging.getLogger("app.db.slow_commands")
+
+# Comandos cuyo primer campo no es el nombre de la colección
+_COLLECTION_FIELDS = {"getMore": "collection"}
+
+
+def command_collection(command_name: str, command: dict) -> str:
+    """Colección a la que va dirigido un comando (o '-' si no va a ninguna)"""
+    value = command.get(_COLLECTION_FIELDS.get(command_name, command_name))
+    return value if isinstance(value, str) else "-"
+
+
+class CommandMetrics(monitoring.CommandListener):
+    """
+    Latencia por colección y comando de todo lo que el proceso manda a Mongo
+    (MongoEngine y Motor). El evento de inicio solo guarda la colección; la
+    duración la da pymongo en el de fin.
+    """
+
+    def __init__(self):
+        self._pending: Dict[Tuple, str] = {}
+        self._lock = threading.Lock()
+
+    def started(self, event):
+        collection = command_collection(event.command_name, event.command)
+        with self._lock:
+            self._pending[(event.connection_id, event.request_id)] = collection
+
+    def succeeded(self, event):
+        collection = self._pop(event)
+        mongo_latency.observe(event.duration_micros / 1_000_000, collection, event.command_name)
+
+    def failed(self, event):
+        collection = self._pop(event)
+        mongo_latency.observe(event.duration_micros / 1_000_000, collection, event.command_name)
+        mongo_failures.inc(collection, event.command_name)
+
+    def _pop(self, event) -> str:
+        with self._lock:
+            return self._pending.pop((event.connection_id, event.request_id), "-")
+
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """
+    Espera hasta obtener una conexión del pool y conexiones prestadas. pymongo
+    no da la duración de la espera, así que se mide entre el inicio del
+    checkout y el checkout, que ocurren en el mismo hilo.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def connection_check_out_started(self, event):
+        self._starts()[event.address] = time.perf_counter()
+
+    def connection_checked_out(self, event):
+        address = _address(event.address)
+        start = self._starts().pop(event.address, None)
+        if start is not None:
+            mongo_checkout_wait.observe(time.perf_counter() - start, address)
+        mongo_connections_in_use.inc(address)
+
+    def connection_check_out_failed(self, event):
+        self._starts().pop(event.address, None)
+        mongo_checkout_failures.inc(_address(event.address), str(event.reason))
+
+    def connection_checked_in(self, event):
+        mongo_connections_in_use.dec(_address(event.address))
+
+    def _starts(self) -> dict:
+        starts = getattr(self._local, "starts", None)
+        if starts is None:
+            starts = self._local.starts = {}
+        return starts
+
+    # El resto de eventos del pool no se miden
+    def pool_created(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        pass
+
+
+class SlowCommandLog(monitoring.CommandListener):
+    """
+    Registro de comandos lentos. Cada comando que supera `threshold_ms` se
+    escribe como una línea JSON en el logger `app.db.slow_commands` con la
+    colección, la forma de la consulta (sin valores), la ruta que lo originó
+    y el método de servicio desde el que se lanzó.
+
+    Con `explain` activado, los find/aggregate/count/... lentos se explican en
+    un hilo aparte (sin retrasar la petición, una vez por forma de consulta
+    y `explain_interval`) y se registra el plan ganador; si recorre la
+    colección entera (COLLSCAN) la línea sale como error.
+    """
+
+    def __init__(self, threshold_ms: float = MONGO_SLOW_COMMAND_MS, explain: bool = MONGO_SLOW_EXPLAIN,
+                 explain_interval: float = MONGO_SLOW_EXPLAIN_INTERVAL_SECONDS,
+                 run_explain: Optional[Callable[[dict], dict]] = None):
+        self.threshold_ms = threshold_ms
+        self.explain = explain
+        self.explain_interval = explain_interval
+        self._run_explain = run_explain or _run_explain
+        self._pending: Dict[Tuple, Tuple[str, Optional[dict]]] = {}
+        self._explained: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue" = queue.Queue(maxsize=100)
+        self._worker: Optional[threading.Thread] = None
+
+    def started(self, event):
+        collection = command_collection(event.command_name, event.command)
+        # Solo se guarda el comando si luego se puede mostrar su forma o explicarlo
+        command = event.command if event.command_name in EXPLAINABLE else None
+        with self._lock:
+            self._pending[(event.connection_id, event.request_id)] = (collection, command)
+
+    def succeeded(self, event):
+        self._finished(event)
+
+    def failed(self, event):
+        self._finished(event, failed=True)
+
+    def _finished(self, event, failed: bool = False):
+        with self._lock:
+            collection, command = self._pending.pop((event.connection_id, event.request_id), ("-", None))
+        duration_ms = event.duration_micros / 1000
+        if duration_ms < self.threshold_ms:
+            return
+
+        mongo_slow_commands.inc(collection, event.command_name)
+        record = {
+            "event": "slow_mongo_command",
+            "collection": collection,
+            "command": event.command_name,
+            "duration_ms": round(duration_ms, 3),
+            "failed": failed,
+            "route": current_route(),
+            "service": calling_service(),
+        }
+        if command is not None:
+            record["shape"] = query_shape(command.get(EXPLAINABLE[event.command_name]))
+            if self.explain and not failed and self._should_explain(collection, event.command_name, record["shape"]):
+                self._enqueue(record, command)
+                return
+        slow_log.warning(json.dumps(record, ensure_ascii=False, default=str))
+
+    def _should_explain(self, collection: str, command_name: str, shape) -> bool:
+        key = json.dumps([collection, command_name, shape], sort_keys=True, default=str)
+        now = time.monotonic()
+        with self._lock:
+            last = self._explained.get(key)
+            if last is not None and now - last < self.explain_interval:
+                return False
+            self._explained[key] = now
+        return True
+
+    def _enqueue(self, record: dict, command: dict):
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._explain_loop, name="slow-command-explain", daemon=True)
+                self._worker.start()
+        try:
+            self._queue.put_nowait((record, command))
+        except queue.Full:
+            slow_log.warning(json.dumps(record, ensure_ascii=False, default=str))
+
+    def _explain_loop(self):
+        while True:
+            record, command = self._queue.get()
+            self.explain_now(record, command)
+
+    def explain_now(self, record: dict, command: dict):
+        """Añade el plan ganador al registro y lo escribe (ERROR si hay COLLSCAN)"""
+        try:
+            plan = winning_plan(self._run_explain(explain_command(command)))
+            record["winning_plan"] = plan
+            record["stages"] = plan_stages(plan)
+            record["collscan"] = "COLLSCAN" in record["stages"]
+        except Exception as e:
+            record["explain_error"] = str(e)
+
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        if record.get("collscan"):
+            mongo_collscans.inc(record["collection"])
+            slow_log.error(line)
+        else:
+            slow_log.warning(line)
+
+
+def explain_command(command: dict) -> dict:
+    """Comando explain (queryPlanner) equivalente, sin los campos de sesión"""
+    inner = {k: v for k, v in command.items() if k not in _SESSION_FIELDS}
+    return {"explain": inner, "verbosity": "queryPlanner"}
+
+
+def winning_plan(explain: dict) -> Optional[dict]:
+    """Plan ganador de la salida de explain (también dentro de los stages de un aggregate)"""
+    if isinstance(explain, dict):
+        planner = explain.get("queryPlanner")
+        if isinstance(planner, dict) and "winningPlan" in planner:
+            return planner["winningPlan"]
+        children = explain.values()
+    elif isinstance(explain, list):
+        children = explain
+    else:
+        return None
+    for child in children:
+        plan = winning_plan(child)
+        if plan is not None:
+            return plan
+    return None
+
+
+def plan_stages(plan) -> List[str]:
+    """Etapas del plan en orden de lectura (la de fuera primero)"""
+    stages = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        for key in ("inputStage", "queryPlan"):
+            stages.extend(plan_stages(plan.get(key)))
+        for child in plan.get("inputStages", ()):
+            stages.extend(plan_stages(child))
+    return stages
+
+
+def query_shape(value):
+    """La consulta con los valores sustituidos por '?', para agrupar y no registrar datos"""
+    if isinstance(value, dict):
+        return {k: query_shape(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        shapes = [query_shape(v) for v in value]
+        # Un $in con mil valores tiene la misma forma que uno con dos
+        return shapes[:1] if all(s == "?" for s in shapes) else shapes
+    return "?"
+
+
+def calling_service() -> Optional[str]:
+    """
+    Primer método de app.services en la pila del hilo que lanzó el comando.
+    Los eventos de pymongo se emiten en ese mismo hilo, y este recorrido solo
+    se hace con los comandos lentos.
+    """
+    frame = sys._getframe(1)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if module.startswith("app.services."):
+            owner = frame.f_locals.get("self")
+            name = frame.f_code.co_name
+            return f"{module}.{type(owner).__name__}.{name}" if owner is not None else f"{module}.{name}"
+        frame = frame.f_back
+    return None
+
+
+def _run_explain(command: dict) -> dict:
+    from mongoengine import get_db
+
+    return get_db().command(command)
+
+
+def _address(address) -> str:
+    host, port = address
+    return f"{host}:{port}"
@@ -1,15 +1,84 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse, Response
+from starlette.concurrency import run_in_threadpool
 
 from fastapi.middleware.cors import CORSMiddleware
-from app.db.mongodb import init_db
+from app.core import metrics
+from app.core.config import settings
+from app.db.mongodb import mongo_manager
+from app.db.async_mongodb import async_backend_enabled, close_async_db, ping_async_db, warm_up_async_db
+from app.services.counter_buffer import counter_buffer
+from app.services.post_purger import post_purger
+from app.services.tenant_purge import tenant_purger
+from app.services.post_list_cache import post_list_cache
 from app.api.v1 import forum_routes
 from app.api.v1 import comment_routes
 from app.api.v1 import reaction_routes
+from app.api.v1 import admin_routes
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Arranque: conectar a Mongo y precalentar los pools de MongoEngine y de
+    Motor (capa de lectura con FORUM_DB_BACKEND=async) antes de aceptar
+    tráfico (si Mongo no responde la app no arranca) y lanzar los hilos de
+    fondo. Con FAST_START la app acepta tráfico en cuanto crea el cliente y
+    los pools se precalientan en segundo plano.
+
+    Apagado: uvicorn ya dejó de aceptar conexiones y esperó a las peticiones
+    en curso (--timeout-graceful-shutdown) antes de llegar aquí; solo queda
+    parar los hilos y cerrar las conexiones.
+    """
+    async_warm_up = None
+    if settings.FAST_START:
+        # Crear el cliente puede resolver el registro SRV de mongodb+srv://
+        await run_in_threadpool(mongo_manager.start_in_background)
+        if async_backend_enabled():
+            async_warm_up = asyncio.create_task(_warm_up_async_in_background())
+    else:
+        await run_in_threadpool(mongo_manager.start)
+        if async_backend_enabled():
+            pings = await warm_up_async_db()
+            print(f"✅ Motor listo ({pings} pings de precalentamiento)")
+
+    # Contadores write-behind (COUNTER_WRITE_BEHIND): flush periódico y uno final al apagar
+    counter_buffer.start()
+    # Purga en segundo plano de los posts borrados (comentarios, reacciones y el propio post)
+    post_purger.start()
+    try:
+        yield
+    finally:
+        mongo_manager.begin_drain()
+        if async_warm_up is not None:
+            async_warm_up.cancel()
+        # Las purgas de organizaciones en curso se cortan tras su tramo actual; se reanudan relanzándolas
+        tenant_purger.stop()
+        post_purger.stop()
+        counter_buffer.stop()
+        # Cerrar el cliente Motor de la capa de lectura y después el de MongoEngine
+        close_async_db()
+        mongo_manager.close()
+
+
+async def _warm_up_async_in_background():
+    """Precalentamiento de Motor con FAST_START; si falla, las lecturas abren las conexiones al llegar"""
+    try:
+        pings = await warm_up_async_db()
+    except Exception as e:
+        print(f"⚠️ No se pudo precalentar Motor: {e}")
+    else:
+        print(f"✅ Motor listo ({pings} pings de precalentamiento)")
+
 
 app = FastAPI(
     title="Forum Microservice",
     description="API para gestionar un foro con posts, comentarios y reacciones",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
 # Configurar CORS (importante para el frontend)
@@ -19,24 +88,30 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "X-Counters-Max-Staleness"],  # Cursor de paginación, ETag y margen de los contadores
 )
 
-# Inicializar base de datos
-init_db()
+# Latencia, estado y peticiones en curso por ruta para /metrics
+app.add_middleware(metrics.RequestMetricsMiddleware)
 
 # Rutas del foro (posts)
 app.include_router(forum_routes.router)
 
 # Rutas de comentarios
 app.include_router(comment_routes.router)
+app.include_router(comment_routes.batch_router)
 
 # Rutas de reacciones (likes/dislikes)
 app.include_router(reaction_routes.router)
+app.include_router(reaction_routes.batch_router)
+
+# Tareas de mantenimiento (reconciliación de contadores)
+app.include_router(admin_routes.router)
 
 
 
 @app.get("/")
-def root():
+async def root():
     return {
         "message": "Forum API is running",
         "version": "1.0.0",
@@ -44,10 +119,50 @@ def root():
             "posts": "/orgs/{org_id}/forum/",
             "comments": "/orgs/{org_id}/forum/posts/{post_id}/comments/",
             "reactions": "/orgs/{org_id}/forum/posts/{post_id}/reactions/",
+            "reaction_stats_batch": "/orgs/{org_id}/forum/reactions/stats?post_ids=",
             "docs": "/docs"
         }
     }
 
 @app.get("/health")
-def health_check():
-    return {"status": "healthy"}
\ No newline at end of file
+@app.get("/health/live")
+async def health_check():
+    """Liveness: el proceso responde (no consulta Mongo)"""
+    return {"status": "healthy"}
+
+@app.get("/health/ready")
+async def readiness_check():
+    """
+    Readiness: la app terminó de arrancar, no se está apagando y Mongo
+    responde al ping con MongoEngine y, si la capa de lectura usa Motor,
+    también con el cliente Motor
+    """
+    if not mongo_manager.ready:
+        return JSONResponse(status_code=503, content={"status": mongo_manager.state})
+    pings = [run_in_threadpool(mongo_manager.ping)]
+    if async_backend_enabled():
+        pings.append(ping_async_db())
+    try:
+        ping_ms = await asyncio.wait_for(asyncio.gather(*pings), timeout=settings.MONGO_PING_TIMEOUT_MS / 1000)
+    except Exception as e:
+        return JSONResponse(status_code=503, content={"status": "unavailable", "mongo": str(e) or type(e).__name__})
+    body = {"status": "ready", "mongo": "ok", "ping_ms": round(ping_ms[0], 3)}
+    if len(ping_ms) > 1:
+        body["async_ping_ms"] = round(ping_ms[1], 3)
+    return body
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """Métricas de la caché del listado de posts (hits, misses, evictions...)"""
+    return {"post_list": post_list_cache.stats()}
+
+@app.get("/counters/stats")
+async def counter_stats():
+    """Métricas del modo write-behind de contadores (deltas pendientes, latencia de flush...)"""
+    return counter_buffer.stats()
+
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """Métricas del proceso en el formato de texto de Prometheus"""
+    return Response(content=metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
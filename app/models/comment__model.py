@@ -1,19 +1,29 @@
 from mongoengine import Document, StringField, DateTimeField, ReferenceField
 from datetime import datetime
+from app.core.serialization import reference_id
 from .post_model import Post
 
+# Índices de la colección comments (ver POST_INDEXES)
+COMMENT_INDEXES = [
+    # Comentarios de un post en orden cronológico (keyset sobre created_at, _id).
+    # Sirve en ambos sentidos y su prefijo cubre las búsquedas solo por post
+    ('post', 'created_at', 'id'),
+    # Búsqueda de texto en los comentarios de una organización (SEARCH_BACKEND=mongo).
+    # Como en posts, el prefijo de igualdad acota el índice de texto al tenant
+    {'fields': ('organization_id', '$content'), 'default_language': 'spanish'},
+]
+
 class Comment(Document):
     post = ReferenceField(Post, required=True, reverse_delete_rule=2)  # CASCADE delete
+    # Copia de post.organization_id para buscar por organización sin pasar por posts
+    organization_id = StringField()
     user_name = StringField(required=True, max_length=100)
     content = StringField(required=True, max_length=1000)
     created_at = DateTimeField(default=datetime.utcnow)
     
     meta = {
         'collection': 'comments',
-        'indexes': [
-            'post',  # Índice para buscar comentarios por post rápidamente
-            '-created_at'  # Índice para ordenar por fecha
-        ],
+        'indexes': COMMENT_INDEXES,
         'auto_create_index': False
     }
     
@@ -21,7 +31,8 @@ class Comment(Document):
         """Método helper para serializar el comentario"""
         return {
             "id": str(self.id),
-            "post_id": str(self.post.id),
+            # _data guarda la referencia sin cargar; self.post consultaría el Post
+            "post_id": str(reference_id(self._data.get("post"))),
             "user_name": self.user_name,
             "content": self.content,
             "created_at": self.created_at.isoformat()
@@ -1,6 +1,32 @@
-from mongoengine import Document, StringField, DateTimeField, ListField, ReferenceField, IntField
+from mongoengine import Document, StringField, DateTimeField, ListField, ReferenceField, IntField, queryset_manager
 from datetime import datetime
 
+# Filtro de las consultas crudas (pymongo / Motor) que excluye los posts borrados
+LIVE_POSTS = {"deleted_at": None}
+
+# Filtro de los posts borrados pendientes de purgar (usa el índice parcial de deleted_at)
+DELETED_POSTS = {"deleted_at": {"$type": "date"}}
+
+# Índices de la colección posts. Se crean con `python -m app.cli sync-indexes`
+# (auto_create_index está desactivado); app.db.indexes los compara con los reales
+POST_INDEXES = [
+    # Listado paginado de una organización: (-created_at, -_id) con el _id desempatando.
+    # Leído al revés sirve también a la exportación en orden ascendente
+    ('organization_id', '-created_at', '-id'),
+    # Recorridos de una organización por _id (purga de organización, reconciliación por organización)
+    # y búsquedas de posts por _id dentro de una organización
+    ('organization_id', 'id'),
+    '-created_at',  # Para ordenar posts por fecha descendente
+    # Búsqueda de texto (SEARCH_BACKEND=mongo); la igualdad sobre organization_id acota el índice
+    {
+        'fields': ('organization_id', '$title', '$content'),
+        'weights': {'title': 3, 'content': 1},
+        'default_language': 'spanish',
+    },
+    # Solo los posts borrados, para que el purgador los encuentre sin recorrer la colección
+    {'fields': ('deleted_at',), 'partialFilterExpression': {'deleted_at': {'$type': 'date'}}},
+]
+
 class Post(Document):
     organization_id = StringField(required=True, max_length=100)
     user_id = StringField(required=True, max_length=100)
@@ -15,16 +41,29 @@ class Post(Document):
     dislikes_count = IntField(default=0)
     comments_count = IntField(default=0)
     
+    # Versiones que cambian con cada comentario / reacción (para los ETags)
+    comments_version = IntField(default=0)
+    reactions_version = IntField(default=0)
+
+    # Tombstone: el post está borrado y sus comentarios/reacciones se purgan en segundo plano
+    deleted_at = DateTimeField(null=True)
+    
     meta = {
         'collection': 'posts',
-        'indexes': [
-            'organization_id',
-            '-created_at',  # Para ordenar posts por fecha descendente
-            ('organization_id', '-created_at')  # Índice compuesto
-        ],
+        'indexes': POST_INDEXES,
         'auto_create_index': False
     }
     
+    @queryset_manager
+    def objects(doc_cls, queryset):
+        # Los posts borrados quedan ocultos para toda la aplicación hasta que se purgan
+        return queryset.filter(deleted_at=None)
+
+    @queryset_manager
+    def all_objects(doc_cls, queryset):
+        """Todos los posts, incluidos los borrados pendientes de purgar"""
+        return queryset
+
     def to_dict(self):
         """Método helper para serializar el post"""
         return {
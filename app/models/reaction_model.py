@@ -1,7 +1,16 @@
 from mongoengine import Document, StringField, ReferenceField, DateTimeField
 from datetime import datetime
+from app.core.serialization import reference_id
 from .post_model import Post
 
+# Índices de la colección reactions (ver POST_INDEXES)
+REACTION_INDEXES = [
+    # Una sola reacción por usuario y post; el upsert del toggle se apoya en él, y su
+    # prefijo sirve a las consultas por post ($in de la purga, la exportación y las estadísticas)
+    {'fields': ('post', 'user_id'), 'unique': True},
+    'user_id',
+]
+
 class Reaction(Document):
     """
     Modelo para manejar likes/dislikes en posts
@@ -14,19 +23,15 @@ class Reaction(Document):
     
     meta = {
         'collection': 'reactions',
-        'indexes': [
-            'post',
-            'user_id',
-            ('post', 'user_id'),  # Índice compuesto para búsquedas rápidas
-            'reaction_type'
-        ],
+        'indexes': REACTION_INDEXES,
         'auto_create_index': False
     }
     
     def to_dict(self):
         return {
             "id": str(self.id),
-            "post_id": str(self.post.id),
+            # _data guarda la referencia sin cargar; self.post consultaría el Post
+            "post_id": str(reference_id(self._data.get("post"))),
             "user_id": self.user_id,
             "reaction_type": self.reaction_type,
             "created_at": self.created_at.isoformat()
@@ -1,10 +1,15 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
 from typing import Optional
 
 class CommentCreate(BaseModel):
-    user_name: str
-    content: str
+    # Mismos límites que el modelo Comment
+    user_name: str = Field(..., min_length=1, max_length=100)
+    content: str = Field(..., min_length=1, max_length=1000)
+
+class CommentBulkItem(CommentCreate):
+    """Comentario de una importación en lote; post_id si el lote abarca varios posts"""
+    post_id: Optional[str] = None
 
 class CommentOut(BaseModel):
     id: str
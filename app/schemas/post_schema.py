@@ -11,6 +11,7 @@ class PostCreate(BaseModel):
 class PostOut(PostCreate):
     id: str  
     created_at: datetime
+    updated_at: Optional[datetime] = None
     organization_id: str           
 
     class ConfigDict:
@@ -18,21 +19,21 @@ class PostOut(PostCreate):
 
     @staticmethod
     def from_orm(post):
-        post_dict = post.to_mongo()
-        post_dict['id'] = str(post_dict['_id'])
-
         return PostOut(
-            id=post_dict['id'],
+            id=str(post.id),
             title=post.title,
             content=post.content,
             user_id=post.user_id,
             created_at=post.created_at,
+            updated_at=post.updated_at,
             organization_id=post.organization_id,   
         )
 
 class PostUpdate(BaseModel):
     title: Optional[str] = None  
     content: Optional[str] = None  
+    # Concurrencia optimista: solo se actualiza si el post no se editó desde entonces
+    expected_updated_at: Optional[datetime] = None
 
     class ConfigDict:
         from_attributes = True
@@ -0,0 +1,185 @@
+from typing import List, Optional
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import HTTPException
+
+from app.core.pagination import DEFAULT_PAGE_SIZE, cut_page, decode_cursor, keyset_filter
+from app.db.async_mongodb import get_async_db
+from app.models.post_model import LIVE_POSTS
+from app.services.post_service import check_projectable_fields, summary_projection
+from app.services.read_service import (
+    COMMENTS_VERSION_FIELDS,
+    POST_OUT_FIELDS,
+    POST_VERSION_FIELDS,
+    REACTIONS_VERSION_FIELDS,
+    comment_row_to_out,
+    post_row_to_out,
+    reaction_stats_by_post,
+    version_of,
+    with_counters,
+)
+
+# Orden de los listados de posts; coincide con el índice ('organization_id', '-created_at', '-id')
+POSTS_SORT = [("created_at", -1), ("_id", -1)]
+
+
+class AsyncForumReadService:
+    """
+    Versión asíncrona de ForumReadService sobre Motor.
+
+    Expone la misma interfaz, pero cada método es una corrutina: mientras
+    espera a Mongo no ocupa un hilo del thread pool, así que un worker puede
+    mantener miles de peticiones de lectura en vuelo.
+    """
+
+    def __init__(self, db=None):
+        self._db = db
+
+    @property
+    def db(self):
+        return self._db if self._db is not None else get_async_db()
+
+    async def list_posts(self, org_id: str, limit: int = DEFAULT_PAGE_SIZE, after: Optional[str] = None,
+                         view: str = "full", fields: Optional[List[str]] = None, counters: bool = False):
+        """Página de posts de una organización; devuelve (items, next_cursor)"""
+        if fields:
+            check_projectable_fields(fields)
+
+        # Validamos el cursor antes de consultar la base de datos
+        query = {"organization_id": org_id, **LIVE_POSTS}
+        if after:
+            query.update(keyset_filter(*decode_cursor(after)))
+
+        if view == "summary" and not fields:
+            pipeline = [
+                {"$match": query},
+                {"$sort": dict(POSTS_SORT)},
+                {"$limit": limit + 1},
+                {"$project": summary_projection(counters)},
+            ]
+            rows = await self.db.posts.aggregate(pipeline).to_list(length=None)
+        else:
+            projected = set(fields) | {"created_at"} if fields else set(POST_OUT_FIELDS)
+            projected = with_counters(projected, counters)
+            cursor = self.db.posts.find(query, dict.fromkeys(projected, 1))
+            rows = await cursor.sort(POSTS_SORT).limit(limit + 1).to_list(length=None)
+
+        rows, next_cursor = cut_page(rows, limit, lambda r: (r["created_at"], r["_id"]))
+        return [post_row_to_out(r, counters) for r in rows], next_cursor
+
+    async def get_post(self, org_id: str, post_id: str) -> dict:
+        try:
+            obj_id = ObjectId(post_id)
+        except (InvalidId, TypeError):
+            raise Exception("Invalid post ID format")
+
+        row = await self.db.posts.find_one(
+            {"_id": obj_id, "organization_id": org_id, **LIVE_POSTS}, dict.fromkeys(POST_OUT_FIELDS, 1)
+        )
+        if not row:
+            raise Exception("Post not found")
+        return post_row_to_out(row)
+
+    async def post_version(self, org_id: str, post_id: str) -> tuple:
+        try:
+            obj_id = ObjectId(post_id)
+        except (InvalidId, TypeError):
+            raise Exception("Invalid post ID format")
+
+        row = await self.db.posts.find_one(
+            {"_id": obj_id, "organization_id": org_id, **LIVE_POSTS}, dict.fromkeys(POST_VERSION_FIELDS, 1)
+        )
+        if not row:
+            raise Exception("Post not found")
+        return version_of(row, POST_VERSION_FIELDS)
+
+    async def comments_version(self, post_id: str) -> tuple:
+        return await self._post_version_row(self._post_object_id(post_id), COMMENTS_VERSION_FIELDS)
+
+    async def reaction_stats_version(self, post_id: str) -> tuple:
+        return await self._post_version_row(self._post_object_id(post_id), REACTIONS_VERSION_FIELDS)
+
+    async def list_comments(self, post_id: str, ensure_post: bool = True, limit: int = DEFAULT_PAGE_SIZE,
+                            after: Optional[str] = None, order: str = "asc"):
+        """Página de comentarios de un post; devuelve (items, next_cursor)"""
+        post_object_id = self._post_object_id(post_id)
+
+        # Validamos el cursor antes de consultar la base de datos
+        ascending = order != "desc"
+        query = {"post": post_object_id}
+        if after:
+            query.update(keyset_filter(*decode_cursor(after), ascending=ascending))
+
+        if ensure_post:
+            await self._ensure_post_exists(post_object_id)
+
+        direction = 1 if ascending else -1
+        cursor = self.db.comments.find(
+            query, {"post": 1, "user_name": 1, "content": 1, "created_at": 1}
+        )
+        rows = await cursor.sort([("created_at", direction), ("_id", direction)]).limit(limit + 1).to_list(length=None)
+
+        rows, next_cursor = cut_page(rows, limit, lambda r: (r["created_at"], r["_id"]))
+        return [comment_row_to_out(r) for r in rows], next_cursor
+
+    async def get_reaction_stats(self, post_id: str, user_id: Optional[str] = None) -> dict:
+        post_object_id = self._post_object_id(post_id)
+
+        post = await self.db.posts.find_one(
+            {"_id": post_object_id, **LIVE_POSTS}, {"likes_count": 1, "dislikes_count": 1}
+        )
+        if not post:
+            raise HTTPException(status_code=404, detail="Post not found")
+
+        user_reaction = None
+        if user_id:
+            reaction = await self.db.reactions.find_one(
+                {"post": post_object_id, "user_id": user_id}, {"reaction_type": 1}
+            )
+            if reaction:
+                user_reaction = reaction["reaction_type"]
+
+        return {
+            "likes_count": post.get("likes_count", 0),
+            "dislikes_count": post.get("dislikes_count", 0),
+            "user_reaction": user_reaction,
+        }
+
+    async def get_reaction_stats_batch(self, org_id: str, post_ids: List[str], user_id: Optional[str] = None) -> dict:
+        """Estadísticas de varios posts con una consulta $in por colección"""
+        object_ids = list(dict.fromkeys(self._post_object_id(p) for p in post_ids))
+
+        rows = await self.db.posts.find(
+            {"_id": {"$in": object_ids}, "organization_id": org_id, **LIVE_POSTS},
+            {"likes_count": 1, "dislikes_count": 1},
+        ).to_list(length=None)
+
+        user_reactions = {}
+        if user_id and rows:
+            user_reactions = await self.viewer_reactions([r["_id"] for r in rows], user_id)
+        return reaction_stats_by_post(rows, user_reactions)
+
+    async def viewer_reactions(self, post_object_ids: List[ObjectId], user_id: str) -> dict:
+        rows = await self.db.reactions.find(
+            {"post": {"$in": post_object_ids}, "user_id": user_id},
+            {"post": 1, "reaction_type": 1},
+        ).to_list(length=None)
+        return {r["post"]: r["reaction_type"] for r in rows}
+
+    @staticmethod
+    def _post_object_id(post_id: str) -> ObjectId:
+        try:
+            return ObjectId(post_id)
+        except (InvalidId, TypeError):
+            raise HTTPException(status_code=400, detail="Invalid post ID format")
+
+    async def _post_version_row(self, post_object_id: ObjectId, fields: tuple) -> tuple:
+        row = await self.db.posts.find_one({"_id": post_object_id, **LIVE_POSTS}, dict.fromkeys(fields, 1))
+        if not row:
+            raise HTTPException(status_code=404, detail="Post not found")
+        return version_of(row, fields)
+
+    async def _ensure_post_exists(self, post_object_id: ObjectId):
+        if not await self.db.posts.find_one({"_id": post_object_id, **LIVE_POSTS}, {"_id": 1}):
+            raise HTTPException(status_code=404, detail="Post not found")
@@ -0,0 +1,41 @@
+from typing import Optional
+
+from app.models.comment__model import Comment
+from app.models.post_model import Post
+
+# Posts por lote al copiar la organización a sus comentarios
+BACKFILL_BATCH_SIZE = 500
+
+
+def backfill_comment_orgs(org_id: Optional[str] = None, batch_size: int = BACKFILL_BATCH_SIZE) -> dict:
+    """
+    Copia el organization_id de cada post a los comentarios que aún no lo
+    tienen (los anteriores a que Comment lo guardara y los importados de
+    volcados antiguos). Recorre los posts por _id en lotes y hace un
+    update_many por organización y lote; se puede relanzar sin riesgo.
+    """
+    query = {"organization_id": org_id} if org_id else {}
+    report = {"org_id": org_id, "scanned_posts": 0, "updated_comments": 0}
+    last_id = None
+
+    while True:
+        page_query = dict(query, _id={"$gt": last_id}) if last_id else query
+        posts = list(
+            Post._get_collection().find(page_query, {"organization_id": 1}).sort("_id", 1).limit(batch_size)
+        )
+        if not posts:
+            return report
+        report["scanned_posts"] += len(posts)
+
+        by_org = {}
+        for post in posts:
+            by_org.setdefault(post.get("organization_id"), []).append(post["_id"])
+        for org, post_ids in by_org.items():
+            result = Comment._get_collection().update_many(
+                {"post": {"$in": post_ids}, "organization_id": None}, {"$set": {"organization_id": org}}
+            )
+            report["updated_comments"] += result.modified_count
+
+        if len(posts) < batch_size:
+            return report
+        last_id = posts[-1]["_id"]
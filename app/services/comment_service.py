@@ -1,9 +1,33 @@
+from collections import Counter
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
 from fastapi import HTTPException
+from mongoengine import Q
+from pydantic import ValidationError
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from app.core.pagination import DEFAULT_PAGE_SIZE, cut_page, decode_cursor
 from app.models.comment__model import Comment
-from app.models.post_model import Post
+from app.models.post_model import LIVE_POSTS, Post
+from app.schemas.comment_schema import CommentBulkItem
+from app.services.post_list_cache import post_list_cache
+from app.services.search_index import search_index
 from bson import ObjectId
 from bson.errors import InvalidId
 
+# Máximo de comentarios por petición de importación en lote
+MAX_BULK_COMMENTS = 1000
+
+
+def _item_error(error: Exception) -> str:
+    """Mensaje legible del error de validación de un elemento del lote"""
+    if isinstance(error, ValidationError):
+        return "; ".join(
+            f"{'.'.join(str(part) for part in e['loc'])}: {e['msg']}" for e in error.errors()
+        )
+    return str(error)
+
+
 class CommentService:
     def create_comment(self, post_id: str, user_name: str, content: str) -> Comment:
         try:
@@ -21,13 +45,16 @@ class CommentService:
             # Crear el comentario con la REFERENCIA al post
             comment = Comment(
                 post=post,  
+                organization_id=post.organization_id,
                 user_name=user_name,
                 content=content
             )
             comment.save()
             
             # Incrementar el contador de comentarios en el post
-            post.update(inc__comments_count=1)
+            post.update(inc__comments_count=1, inc__comments_version=1)
+            post_list_cache.invalidate_counters(post.organization_id)
+            search_index.comment_saved(post.organization_id, post.id, comment.id, content)
             
             return comment
             
@@ -37,7 +64,12 @@ class CommentService:
             print(f"Error en create_comment: {str(e)}")  # Para debug
             raise HTTPException(status_code=500, detail=f"Error creando el comentario: {str(e)}")
 
-    def get_comments_for_post(self, post_id: str):
+    def get_comments_for_post(self, post_id: str, limit: int = DEFAULT_PAGE_SIZE,
+                              after: Optional[str] = None, order: str = "asc"):
+        """
+        Página de comentarios de un post; devuelve (comments, next_cursor).
+        order="asc" lista del más antiguo al más reciente y "desc" al revés.
+        """
         try:
             # Validar el post_id
             try:
@@ -45,21 +77,143 @@ class CommentService:
             except (InvalidId, TypeError):
                 raise HTTPException(status_code=400, detail="Invalid post ID format")
             
-            # Primero obtenemos el post
-            post = Post.objects(id=post_object_id).first()
-            if not post:
+            # Primero comprobamos que el post exista
+            if not Post.objects(id=post_object_id).only('id').first():
                 raise HTTPException(status_code=404, detail="Post not found")
             
-            # Obtenemos todos los comentarios que referencian a ese post
-            comments = Comment.objects(post=post)
-            return list(comments)
+            comments = list(self._page_query(post_object_id, limit, after, order))
+            return cut_page(comments, limit, lambda c: (c.created_at, c.id))
             
         except HTTPException:
             raise
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
         except Exception as e:
             print(f"Error en get_comments_for_post: {str(e)}")
             raise HTTPException(status_code=500, detail=f"Error obteniendo los comentarios: {str(e)}")
 
+    def get_comment_rows_page(self, post_object_id: ObjectId, limit: int = DEFAULT_PAGE_SIZE,
+                              after: Optional[str] = None, order: str = "asc"):
+        """
+        Igual que get_comments_for_post pero como diccionarios planos y sin
+        comprobar el post (lo usa la capa de lectura).
+        """
+        rows = list(self._page_query(post_object_id, limit, after, order).only(
+            'post', 'user_name', 'content', 'created_at'
+        ).as_pymongo())
+        return cut_page(rows, limit, lambda r: (r['created_at'], r['_id']))
+
+    def _page_query(self, post_object_id: ObjectId, limit: int, after: Optional[str], order: str):
+        """
+        Consulta keyset de una página de comentarios (pide limit + 1 elementos).
+        Recorre el índice (post, created_at, _id) en el sentido pedido, así que
+        el coste no depende de cuántos comentarios tenga el post.
+        """
+        # Validamos el cursor antes de consultar la base de datos
+        position = decode_cursor(after) if after else None
+
+        query = Comment.objects(post=post_object_id)
+        if position:
+            created_at, last_id = position
+            if order == "desc":
+                query = query.filter(created_at__lte=created_at).filter(
+                    Q(created_at__lt=created_at) | Q(id__lt=last_id)
+                )
+            else:
+                query = query.filter(created_at__gte=created_at).filter(
+                    Q(created_at__gt=created_at) | Q(id__gt=last_id)
+                )
+
+        sort = ('-created_at', '-id') if order == "desc" else ('created_at', 'id')
+        return query.order_by(*sort).limit(limit + 1)
+
+    def bulk_create_comments(self, org_id: str, items: List[Tuple[int, Any]],
+                             post_id: Optional[str] = None) -> dict:
+        """
+        Importa un lote de comentarios de uno o varios posts de la organización.
+
+        Valida todo el lote en una pasada, comprueba los posts con una sola
+        consulta, inserta con insert_many(ordered=False) y aplica un único $inc
+        por post. Los elementos que fallan se informan por índice sin abortar
+        el resto del lote. `items` son pares (índice, elemento) y `post_id`
+        fija el post de todos los elementos.
+        """
+        errors = []
+        valid = []  # (índice, ObjectId del post, CommentBulkItem)
+        for index, raw in items:
+            try:
+                item = CommentBulkItem.model_validate(raw)
+                target = post_id or item.post_id
+                if not target:
+                    raise ValueError("post_id is required")
+                valid.append((index, ObjectId(target), item))
+            except (ValueError, InvalidId, TypeError) as e:
+                errors.append({"index": index, "error": _item_error(e)})
+
+        # Una sola consulta para saber qué posts existen en la organización
+        post_ids = list({post_object_id for _, post_object_id, _ in valid})
+        existing = {
+            p["_id"] for p in Post._get_collection().find(
+                {"_id": {"$in": post_ids}, "organization_id": org_id, **LIVE_POSTS}, {"_id": 1}
+            )
+        } if post_ids else set()
+
+        pending = []
+        for index, post_object_id, item in valid:
+            if post_object_id in existing:
+                pending.append((index, post_object_id, item))
+            else:
+                errors.append({"index": index, "error": "Post not found"})
+
+        created = self._insert_comments(org_id, pending, errors)
+
+        # Un $inc agregado por post con los comentarios que sí se insertaron
+        per_post = Counter(c["post_id"] for c in created)
+        if per_post:
+            Post._get_collection().bulk_write([
+                UpdateOne({"_id": p}, {"$inc": {"comments_count": n, "comments_version": 1}})
+                for p, n in per_post.items()
+            ], ordered=False)
+            post_list_cache.invalidate_counters(org_id)
+
+        contents = {index: item.content for index, _, item in pending}
+        for comment in created:
+            search_index.comment_saved(org_id, comment["post_id"], ObjectId(comment["id"]), contents[comment["index"]])
+
+        return {
+            "inserted": len(created),
+            "failed": len(errors),
+            "created": [{**c, "post_id": str(c["post_id"])} for c in created],
+            "errors": sorted(errors, key=lambda e: e["index"]),
+        }
+
+    @staticmethod
+    def _insert_comments(org_id: str, pending: list, errors: list) -> List[dict]:
+        """insert_many sin orden; devuelve los creados y añade a errors los rechazados"""
+        if not pending:
+            return []
+
+        now = datetime.utcnow()
+        documents = [
+            {"_id": ObjectId(), "post": post_object_id, "organization_id": org_id,
+             "user_name": item.user_name, "content": item.content, "created_at": now}
+            for _, post_object_id, item in pending
+        ]
+        rejected = {}
+        try:
+            Comment._get_collection().insert_many(documents, ordered=False)
+        except BulkWriteError as e:
+            # Con ordered=False Mongo sigue con el resto e informa de cada fallo
+            rejected = {err["index"]: err.get("errmsg", "Write error") for err in e.details.get("writeErrors", [])}
+
+        created = []
+        for position, (index, post_object_id, _) in enumerate(pending):
+            if position in rejected:
+                errors.append({"index": index, "error": rejected[position]})
+            else:
+                created.append({"index": index, "id": str(documents[position]["_id"]), "post_id": post_object_id})
+        return created
+
     def delete_comment(self, comment_id: str):
         try:
             # Validar el comment_id
@@ -75,9 +229,11 @@ class CommentService:
             
             # Decrementar el contador de comentarios en el post
             post = comment.post
-            post.update(dec__comments_count=1)
+            post.update(dec__comments_count=1, inc__comments_version=1)
             
             comment.delete()
+            post_list_cache.invalidate_counters(post.organization_id)
+            search_index.comment_deleted(post.organization_id, post.id, comment_object_id)
             return {"message": "Comment deleted successfully"}
             
         except HTTPException:
@@ -0,0 +1,229 @@
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, ConnectionFailure, ServerSelectionTimeoutError
+
+from app.models.post_model import Post
+from app.services.post_list_cache import post_list_cache
+
+COUNTER_WRITE_BEHIND = os.getenv("COUNTER_WRITE_BEHIND", "false").lower() in ("1", "true", "yes")
+COUNTER_FLUSH_INTERVAL_SECONDS = float(os.getenv("COUNTER_FLUSH_INTERVAL_SECONDS", "1"))
+# Con tantos posts pendientes se adelanta el flush sin esperar al intervalo
+COUNTER_FLUSH_MAX_POSTS = int(os.getenv("COUNTER_FLUSH_MAX_POSTS", "1000"))
+
+
+class CounterBuffer:
+    """
+    Modo write-behind de los contadores de los posts (opcional).
+
+    En lugar de un $inc sobre el post en cada reacción, los deltas se acumulan
+    en memoria por post y un hilo los escribe cada `flush_interval` segundos
+    con un único bulk_write de $inc. Un post muy activo recibe así una
+    escritura por intervalo en vez de una por clic.
+
+    Los contadores leídos de Mongo pueden ir hasta `flush_interval` segundos
+    por detrás (más lo que tarde el flush); ese margen se publica en stats().
+
+    Si el bulk_write falla solo se reintentan los deltas que seguro no se
+    aplicaron. Cuando no se sabe (error de red con la escritura ya enviada)
+    reintentarlos podría contar dos veces: esos posts se marcan y el hilo de
+    flush los reconcilia con CounterReconciler.
+    """
+
+    def __init__(self, enabled: bool = COUNTER_WRITE_BEHIND,
+                 flush_interval: float = COUNTER_FLUSH_INTERVAL_SECONDS,
+                 max_pending_posts: int = COUNTER_FLUSH_MAX_POSTS):
+        self.enabled = enabled
+        self.flush_interval = flush_interval
+        self.max_pending_posts = max_pending_posts
+        self._pending: Dict[ObjectId, Dict[str, int]] = {}
+        self._orgs: Dict[ObjectId, str] = {}
+        # Deltas que se están escribiendo: siguen contando hasta que el flush termina
+        self._inflight: Dict[ObjectId, Dict[str, int]] = {}
+        # Posts cuyo último flush tuvo un resultado desconocido ({post_id: org_id})
+        self._to_reconcile: Dict[ObjectId, str] = {}
+        self._lock = threading.Lock()
+        # Serializa los flush del hilo y los manuales (shutdown, tests)
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._flushes = 0
+        self._flushed_posts = 0
+        self._failed_flushes = 0
+        self._last_flush_ms = 0.0
+        self._max_flush_ms = 0.0
+        self._last_flush_at: Optional[float] = None
+
+    def add(self, post_id: ObjectId, org_id: str, deltas: Dict[str, int]):
+        """Acumula los deltas de un post hasta el próximo flush"""
+        with self._lock:
+            pending = self._pending.setdefault(post_id, {})
+            for field, delta in deltas.items():
+                pending[field] = pending.get(field, 0) + delta
+            self._orgs[post_id] = org_id
+            full = len(self._pending) >= self.max_pending_posts
+        if full:
+            self._wakeup.set()
+
+    def pending(self, post_id: ObjectId) -> Dict[str, int]:
+        """Deltas de un post que todavía no están en Mongo"""
+        with self._lock:
+            pending = dict(self._inflight.get(post_id, {}))
+            for field, delta in self._pending.get(post_id, {}).items():
+                pending[field] = pending.get(field, 0) + delta
+            return pending
+
+    def flush(self) -> int:
+        """Escribe los deltas acumulados con un bulk_write; devuelve cuántos posts actualizó"""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                orgs, self._orgs = self._orgs, {}
+                self._inflight = pending
+
+            post_ids = [post_id for post_id, deltas in pending.items() if any(deltas.values())]
+            operations = [UpdateOne({"_id": post_id}, {"$inc": pending[post_id]}) for post_id in post_ids]
+            if not operations:
+                with self._lock:
+                    self._inflight = {}
+                return 0
+
+            start = time.perf_counter()
+            failed: List[ObjectId] = []
+            try:
+                Post._get_collection().bulk_write(operations, ordered=False)
+            except BulkWriteError as e:
+                # Con ordered=False el resto de operaciones sí se aplicó: solo vuelven las fallidas
+                failed = [post_ids[error["index"]] for error in e.details.get("writeErrors", [])]
+                print(f"⚠️ {len(failed)} contadores acumulados no se pudieron escribir: {e}")
+            except ServerSelectionTimeoutError as e:
+                # No había servidor: no se envió nada y se puede reintentar todo
+                self._requeue_failed(pending, orgs, post_ids, e)
+                return 0
+            except ConnectionFailure as e:
+                # La escritura pudo aplicarse o no: reintentarla podría contar dos veces
+                print(f"⚠️ Resultado desconocido escribiendo contadores ({e}); se reconciliarán {len(post_ids)} posts")
+                with self._lock:
+                    self._inflight = {}
+                    self._failed_flushes += 1
+                    self._to_reconcile.update((post_id, orgs[post_id]) for post_id in post_ids)
+                return 0
+            except Exception as e:
+                self._requeue_failed(pending, orgs, post_ids, e)
+                return 0
+
+            if failed:
+                with self._lock:
+                    self._inflight = {}
+                    self._failed_flushes += 1
+                for post_id in failed:
+                    self.add(post_id, orgs[post_id], pending[post_id])
+
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            with self._lock:
+                self._inflight = {}
+                self._flushes += 1
+                self._flushed_posts += len(operations) - len(failed)
+                self._last_flush_ms = elapsed_ms
+                self._max_flush_ms = max(self._max_flush_ms, elapsed_ms)
+                self._last_flush_at = time.time()
+
+            for org_id in set(orgs.values()):
+                post_list_cache.invalidate_counters(org_id)
+            return len(operations) - len(failed)
+
+    def _requeue_failed(self, pending: Dict, orgs: Dict, post_ids: List[ObjectId], error: Exception):
+        """Devuelve al buffer los deltas de un flush que no llegó a aplicarse"""
+        print(f"⚠️ Error escribiendo contadores acumulados: {error}")
+        with self._lock:
+            self._inflight = {}
+            self._failed_flushes += 1
+        for post_id in post_ids:
+            self.add(post_id, orgs[post_id], pending[post_id])
+
+    def buffered(self, post_ids: List[ObjectId]) -> List[ObjectId]:
+        """Los de `post_ids` con deltas pendientes o escribiéndose"""
+        with self._lock:
+            return [post_id for post_id in post_ids if post_id in self._pending or post_id in self._inflight]
+
+    def reconcile_uncertain(self) -> int:
+        """
+        Reconcilia los posts marcados por un flush de resultado desconocido.
+        Los que aún tienen deltas en el buffer esperan al siguiente intento
+        (la reconciliación no los ve). Si la reconciliación salta algún post
+        (le llegó un delta o cambió su versión mientras tanto) todos siguen
+        marcados para el siguiente intento. Devuelve cuántos posts se
+        reconciliaron.
+        """
+        with self._lock:
+            post_ids = [post_id for post_id in self._to_reconcile
+                        if post_id not in self._pending and post_id not in self._inflight]
+            orgs = {post_id: self._to_reconcile.pop(post_id) for post_id in post_ids}
+        if not post_ids:
+            return 0
+
+        from app.services.counter_reconciliation import CounterReconciler
+        try:
+            report = CounterReconciler().reconcile(post_ids=post_ids)
+        except Exception as e:
+            print(f"⚠️ Error reconciliando contadores: {e}")
+            report = None
+        if report is None or report["skipped_posts"]:
+            with self._lock:
+                for post_id, org_id in orgs.items():
+                    self._to_reconcile.setdefault(post_id, org_id)
+            return 0
+        return len(post_ids)
+
+    def start(self):
+        """Arranca el hilo de flush periódico (solo si el modo está activado)"""
+        if not self.enabled or self._thread is not None:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="counter-flush", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Detiene el hilo y escribe lo que quede pendiente"""
+        if self._thread is not None:
+            self._stopping.set()
+            self._wakeup.set()
+            self._thread.join()
+            self._thread = None
+        self.flush()
+        if self._to_reconcile:
+            print(f"⚠️ {len(self._to_reconcile)} posts con contadores sin confirmar; "
+                  "ejecuta `python -m app.cli reconcile-counters`")
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "buffered_posts": len(self._pending),
+                "buffered_deltas": sum(abs(d) for deltas in self._pending.values() for d in deltas.values()),
+                "flushes": self._flushes,
+                "flushed_posts": self._flushed_posts,
+                "failed_flushes": self._failed_flushes,
+                "posts_to_reconcile": len(self._to_reconcile),
+                "last_flush_ms": round(self._last_flush_ms, 3),
+                "max_flush_ms": round(self._max_flush_ms, 3),
+                "last_flush_at": self._last_flush_at,
+                "max_staleness_seconds": self.flush_interval if self.enabled else 0,
+            }
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+            if self._to_reconcile:
+                self.reconcile_uncertain()
+
+
+# Instancia compartida por los servicios del proceso
+counter_buffer = CounterBuffer()
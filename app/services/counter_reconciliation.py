@@ -0,0 +1,172 @@
+import time
+from typing import Dict, Iterator, List, Optional
+
+from pymongo import UpdateOne
+
+from app.models.comment__model import Comment
+from app.models.post_model import LIVE_POSTS, Post
+from app.models.reaction_model import Reaction
+from app.services.counter_buffer import counter_buffer
+from app.services.post_list_cache import COUNTER_FIELDS, post_list_cache
+
+# Posts que se comparan y reparan en cada lote
+RECONCILE_BATCH_SIZE = 500
+
+# Posts con desvío que se incluyen como ejemplo en el informe
+REPORT_SAMPLE_SIZE = 20
+
+# Versión que se incrementa al corregir cada contador (invalida los ETags)
+VERSION_FIELDS = {
+    'likes_count': 'reactions_version',
+    'dislikes_count': 'reactions_version',
+    'comments_count': 'comments_version',
+}
+
+
+class CounterReconciler:
+    """
+    Recalcula los contadores de los posts a partir de `comments` y `reactions`
+    y corrige los que se hayan desviado.
+
+    Recorre los posts por _id en lotes de `batch_size` (nunca carga la
+    colección entera), cuenta comentarios y reacciones de cada lote con una
+    agregación $group por colección y repara los desvíos con un bulk_write.
+    Cada corrección solo se aplica si el contador y su versión siguen
+    valiendo lo que se leyó; si entretanto cambiaron, el post se cuenta como
+    `skipped` y se corregirá en la siguiente ejecución. La versión cubre lo
+    que el contador no ve: los comentarios y toggles suben
+    comments_version/reactions_version al escribir, aunque su $inc llegue
+    después (write-behind o un $inc posterior a la agregación). Tampoco se
+    corrigen los posts con deltas en el buffer de este proceso.
+    """
+
+    def __init__(self, batch_size: int = RECONCILE_BATCH_SIZE):
+        self.batch_size = batch_size
+
+    def reconcile(self, org_id: Optional[str] = None, dry_run: bool = False,
+                  post_ids: Optional[List] = None) -> dict:
+        """
+        Reconcilia una organización (o todas, o solo `post_ids`) y devuelve el
+        informe de desvíos. El desvío de cada contador es guardado - real
+        (positivo si sobraba).
+        """
+        start = time.perf_counter()
+        # Los deltas acumulados en memoria todavía no están en Mongo
+        if counter_buffer.enabled and not dry_run:
+            counter_buffer.flush()
+
+        report = {
+            "org_id": org_id,
+            "dry_run": dry_run,
+            "scanned_posts": 0,
+            "drifted_posts": 0,
+            "repaired_posts": 0,
+            "skipped_posts": 0,
+            "fields": {f: {"posts": 0, "total_drift": 0, "max_drift": 0} for f in COUNTER_FIELDS},
+            "sample": [],
+        }
+        orgs = set()
+
+        for posts in self._post_batches(org_id, post_ids):
+            report["scanned_posts"] += len(posts)
+            actual = self._actual_counts([p["_id"] for p in posts])
+
+            operations = {}
+            for post in posts:
+                update = self._compare(post, actual.get(post["_id"], {}), report)
+                if update:
+                    operations[post["_id"]] = update
+                    orgs.add(post.get("organization_id"))
+            if dry_run:
+                continue
+
+            # Un delta que llegó al buffer después del flush ya está en la
+            # agregación y se sumaría otra vez en el siguiente flush
+            for post_id in counter_buffer.buffered(list(operations)):
+                del operations[post_id]
+                report["skipped_posts"] += 1
+            if operations:
+                result = Post._get_collection().bulk_write(list(operations.values()), ordered=False)
+                report["repaired_posts"] += result.modified_count
+                report["skipped_posts"] += len(operations) - result.modified_count
+
+        for org in orgs:
+            post_list_cache.invalidate_counters(org)
+
+        report["duration_ms"] = round((time.perf_counter() - start) * 1000, 3)
+        return report
+
+    def _post_batches(self, org_id: Optional[str], post_ids: Optional[List] = None) -> Iterator[List[dict]]:
+        """Lotes de posts con sus contadores, paginando por _id"""
+        query = dict(LIVE_POSTS, organization_id=org_id) if org_id else dict(LIVE_POSTS)
+        if post_ids is not None:
+            query["_id"] = {"$in": list(post_ids)}
+        projection = dict.fromkeys(COUNTER_FIELDS + tuple(sorted(set(VERSION_FIELDS.values()))) + ('organization_id',), 1)
+        last_id = None
+
+        while True:
+            page_query = dict(query, _id=dict(query.get("_id", {}), **{"$gt": last_id})) if last_id else query
+            posts = list(
+                Post._get_collection().find(page_query, projection).sort("_id", 1).limit(self.batch_size)
+            )
+            if not posts:
+                return
+            yield posts
+            if len(posts) < self.batch_size:
+                return
+            last_id = posts[-1]["_id"]
+
+    @staticmethod
+    def _actual_counts(post_ids: list) -> Dict:
+        """Cuenta real de comentarios y reacciones por post ({post_id: {campo: n}})"""
+        actual: Dict = {}
+
+        comments = Comment._get_collection().aggregate([
+            {"$match": {"post": {"$in": post_ids}}},
+            {"$group": {"_id": "$post", "n": {"$sum": 1}}},
+        ])
+        for row in comments:
+            actual.setdefault(row["_id"], {})["comments_count"] = row["n"]
+
+        reactions = Reaction._get_collection().aggregate([
+            {"$match": {"post": {"$in": post_ids}}},
+            {"$group": {"_id": {"post": "$post", "type": "$reaction_type"}, "n": {"$sum": 1}}},
+        ])
+        for row in reactions:
+            field = 'likes_count' if row["_id"]["type"] == 'like' else 'dislikes_count'
+            actual.setdefault(row["_id"]["post"], {})[field] = row["n"]
+
+        return actual
+
+    @staticmethod
+    def _compare(post: dict, actual: dict, report: dict) -> Optional[UpdateOne]:
+        """Anota los desvíos de un post en el informe y devuelve su corrección"""
+        drift = {}
+        for field in COUNTER_FIELDS:
+            stored = post.get(field, 0)
+            delta = stored - actual.get(field, 0)
+            if delta:
+                drift[field] = delta
+                stats = report["fields"][field]
+                stats["posts"] += 1
+                stats["total_drift"] += abs(delta)
+                stats["max_drift"] = max(stats["max_drift"], abs(delta))
+
+        if not drift:
+            return None
+
+        report["drifted_posts"] += 1
+        if len(report["sample"]) < REPORT_SAMPLE_SIZE:
+            report["sample"].append({"post_id": str(post["_id"]), "drift": drift})
+
+        # Condicionado a los valores y versiones leídos: no pisa un $inc
+        # concurrente ni uno pendiente de una escritura posterior a la lectura
+        # (None también coincide con un campo ausente)
+        versions = {VERSION_FIELDS[field]: 1 for field in drift}
+        condition = {"_id": post["_id"]}
+        condition.update({field: post.get(field) for field in drift})
+        condition.update({version: post.get(version) for version in versions})
+        return UpdateOne(
+            condition,
+            {"$set": {field: actual.get(field, 0) for field in drift}, "$inc": versions},
+        )
@@ -0,0 +1,164 @@
+import csv
+import io
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional
+
+from app.core.pagination import decode_cursor, encode_cursor, keyset_filter
+from app.core.serialization import dumps
+from app.models.comment__model import Comment
+from app.models.post_model import LIVE_POSTS, Post
+from app.models.reaction_model import Reaction
+
+# Documentos que Mongo devuelve por cada getMore del cursor
+EXPORT_CURSOR_BATCH_SIZE = 1000
+
+# Posts (con sus comentarios y reacciones) entre dos checkpoints
+EXPORT_POSTS_PER_CHECKPOINT = 500
+
+# Tamaño aproximado de cada trozo que se envía al cliente
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+EXPORT_FORMATS = ("ndjson", "csv")
+
+CSV_COLUMNS = [
+    "type", "id", "post_id", "organization_id", "user_id", "user_name", "title", "content",
+    "reaction_type", "created_at", "updated_at", "likes_count", "dislikes_count",
+    "comments_count", "cursor",
+]
+
+
+class ForumExporter:
+    """
+    Exportación completa de los posts, comentarios y reacciones de una
+    organización, en NDJSON o CSV y con memoria constante.
+
+    Los posts se recorren con un único cursor de Mongo en orden
+    (created_at, _id) ascendente, que es el índice (organization_id,
+    -created_at, -_id) leído al revés. Cada `posts_per_checkpoint` posts se
+    exportan sus comentarios y reacciones (cursores con $in sobre ese grupo)
+    y se emite un registro `checkpoint` cuyo `cursor` permite reanudar la
+    exportación justo después del grupo con `after=`. En memoria solo hay un
+    grupo de posts y un batch de cada cursor.
+    """
+
+    def __init__(self, batch_size: int = EXPORT_CURSOR_BATCH_SIZE,
+                 posts_per_checkpoint: int = EXPORT_POSTS_PER_CHECKPOINT):
+        self.batch_size = batch_size
+        self.posts_per_checkpoint = posts_per_checkpoint
+
+    def records(self, org_id: str, after: Optional[str] = None) -> Iterator[dict]:
+        """
+        Registros de la exportación (type = post, comment, reaction o checkpoint).
+        Lanza ValueError si el cursor `after` no es válido.
+        """
+        query = {"organization_id": org_id, **LIVE_POSTS}
+        if after:
+            query.update(keyset_filter(*decode_cursor(after), ascending=True))
+
+        posts = Post._get_collection().find(query, batch_size=self.batch_size).sort(
+            [("created_at", 1), ("_id", 1)]
+        )
+        try:
+            while True:
+                group = list(islice(posts, self.posts_per_checkpoint))
+                if not group:
+                    return
+                post_ids = [post["_id"] for post in group]
+
+                for post in group:
+                    yield self._post_record(post)
+                for comment in self._children(Comment, post_ids, [("post", 1), ("created_at", 1), ("_id", 1)]):
+                    yield self._comment_record(comment)
+                for reaction in self._children(Reaction, post_ids, [("post", 1), ("user_id", 1)]):
+                    yield self._reaction_record(reaction)
+
+                last = group[-1]
+                yield {"type": "checkpoint", "cursor": encode_cursor(last["created_at"], last["_id"])}
+        finally:
+            posts.close()
+
+    def ndjson(self, org_id: str, after: Optional[str] = None) -> Iterator[bytes]:
+        """Exportación como NDJSON, un registro por línea"""
+        lines = (dumps(record) + b"\n" for record in self.records(org_id, after))
+        return _chunked(lines)
+
+    def csv(self, org_id: str, after: Optional[str] = None) -> Iterator[bytes]:
+        """Exportación como CSV con las columnas CSV_COLUMNS (vacías si no aplican)"""
+        def lines():
+            buffer = io.StringIO()
+            writer = csv.DictWriter(buffer, fieldnames=CSV_COLUMNS, extrasaction="ignore")
+            writer.writeheader()
+            for record in self.records(org_id, after):
+                writer.writerow({k: _csv_value(v) for k, v in record.items()})
+                yield buffer.getvalue().encode("utf-8")
+                buffer.seek(0)
+                buffer.truncate()
+            if buffer.tell():
+                yield buffer.getvalue().encode("utf-8")
+        return _chunked(lines())
+
+    def _children(self, model, post_ids: List, sort: List) -> Iterator[dict]:
+        cursor = model._get_collection().find({"post": {"$in": post_ids}}, batch_size=self.batch_size).sort(sort)
+        try:
+            yield from cursor
+        finally:
+            cursor.close()
+
+    @staticmethod
+    def _post_record(post: dict) -> dict:
+        return {
+            "type": "post",
+            "id": post["_id"],
+            "organization_id": post.get("organization_id"),
+            "user_id": post.get("user_id"),
+            "title": post.get("title"),
+            "content": post.get("content"),
+            "created_at": post.get("created_at"),
+            "updated_at": post.get("updated_at"),
+            "likes_count": post.get("likes_count", 0),
+            "dislikes_count": post.get("dislikes_count", 0),
+            "comments_count": post.get("comments_count", 0),
+        }
+
+    @staticmethod
+    def _comment_record(comment: dict) -> dict:
+        return {
+            "type": "comment",
+            "id": comment["_id"],
+            "post_id": comment.get("post"),
+            "organization_id": comment.get("organization_id"),
+            "user_name": comment.get("user_name"),
+            "content": comment.get("content"),
+            "created_at": comment.get("created_at"),
+        }
+
+    @staticmethod
+    def _reaction_record(reaction: dict) -> dict:
+        return {
+            "type": "reaction",
+            "id": reaction["_id"],
+            "post_id": reaction.get("post"),
+            "user_id": reaction.get("user_id"),
+            "reaction_type": reaction.get("reaction_type"),
+            "created_at": reaction.get("created_at"),
+        }
+
+
+def _csv_value(value):
+    """Fechas en ISO y ObjectId como texto, igual que en el NDJSON"""
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return "" if value is None else str(value)
+
+
+def _chunked(lines: Iterable[bytes], size: int = EXPORT_CHUNK_BYTES) -> Iterator[bytes]:
+    """Agrupa las líneas en trozos de ~size bytes para no escribir al socket línea a línea"""
+    chunk, length = [], 0
+    for line in lines:
+        chunk.append(line)
+        length += len(line)
+        if length >= size:
+            yield b"".join(chunk)
+            chunk, length = [], 0
+    if chunk:
+        yield b"".join(chunk)
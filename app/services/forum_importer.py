@@ -0,0 +1,288 @@
+import json
+import os
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo.errors import BulkWriteError
+
+from app.models.comment__model import Comment
+from app.models.post_model import Post
+from app.models.reaction_model import Reaction
+from app.services.comment_org_backfill import backfill_comment_orgs
+from app.services.counter_reconciliation import CounterReconciler
+
+# Filas que se acumulan antes de cada ronda de insert_many
+IMPORT_BATCH_SIZE = 1000
+
+# Errores de filas que se guardan en el informe (el resto solo se cuenta)
+REPORT_ERROR_SAMPLE = 20
+
+DUPLICATE_KEY = 11000
+
+MODELS = {"post": Post, "comment": Comment, "reaction": Reaction}
+
+
+class ImportRowError(ValueError):
+    """Fila del volcado que no se puede importar"""
+
+
+class ForumImporter:
+    """
+    Carga masiva de volcados NDJSON de posts, comentarios y reacciones (el
+    mismo formato que produce la exportación: un objeto por línea con `type`).
+
+    Lee el fichero en streaming y acumula las filas hasta `batch_size`; cada
+    ronda se escribe con insert_many(ordered=False) por colección y después
+    se guarda en el fichero de estado el byte del volcado hasta el que todo
+    está escrito. Si el proceso muere, `resume=True` continúa desde ese byte;
+    las filas que se repitan chocan con su _id y se cuentan como duplicadas,
+    así que reanudar nunca duplica datos. Un choque con otro índice único
+    (una segunda reacción del mismo usuario a un post) es una fila que no se
+    carga y se informa como error.
+
+    Los posts se insertan con los contadores a 0 y, al terminar, se
+    recalculan con las agregaciones del CounterReconciler para las
+    organizaciones importadas, en lugar de un $inc por fila.
+    """
+
+    def __init__(self, batch_size: int = IMPORT_BATCH_SIZE,
+                 progress: Optional[Callable[[dict], None]] = None):
+        self.batch_size = batch_size
+        self.progress = progress
+
+    def import_file(self, path: str, state_path: Optional[str] = None, resume: bool = False,
+                    rebuild_counters: bool = True) -> dict:
+        """Importa un volcado NDJSON y devuelve el informe de la carga"""
+        state_path = state_path or f"{path}.import-state"
+        state = self._load_state(state_path) if resume else None
+        report = state["report"] if state else {
+            "rows": 0, "inserted": {t: 0 for t in MODELS}, "duplicates": 0, "failed": 0, "errors": [],
+        }
+        orgs = set(state["orgs"]) if state else set()
+        offset = state["offset"] if state else 0
+
+        start = time.perf_counter()
+        rows_at_start = report["rows"]
+        batches: Dict[str, List[dict]] = {t: [] for t in MODELS}
+        buffered = 0
+
+        with open(path, "rb") as dump:
+            dump.seek(offset)
+            line_number = report["rows"]
+            for line in dump:
+                offset += len(line)
+                if not line.strip():
+                    continue
+                line_number += 1
+                report["rows"] += 1
+                try:
+                    kind, document = self._to_document(json.loads(line))
+                except (ValueError, KeyError, TypeError) as e:
+                    self._row_error(report, line_number, e)
+                    continue
+                if kind is None:
+                    continue
+                if kind == "post":
+                    orgs.add(document["organization_id"])
+                batches[kind].append(document)
+                buffered += 1
+
+                if buffered >= self.batch_size:
+                    self._flush(batches, report)
+                    buffered = 0
+                    self._save_state(state_path, offset, report, orgs)
+                    self._report_progress(report, rows_at_start, start)
+
+            self._flush(batches, report)
+            self._save_state(state_path, offset, report, orgs)
+
+        elapsed = time.perf_counter() - start
+        report["duration_s"] = round(elapsed, 3)
+        report["rows_per_second"] = round((report["rows"] - rows_at_start) / elapsed, 1) if elapsed else None
+
+        # Los volcados anteriores a organization_id en comments no lo traen
+        report["comments_backfilled"] = sum(
+            backfill_comment_orgs(org_id=org)["updated_comments"] for org in sorted(orgs)
+        )
+
+        if rebuild_counters:
+            reconciler = CounterReconciler()
+            report["counters"] = {
+                org: reconciler.reconcile(org_id=org)["repaired_posts"] for org in sorted(orgs)
+            }
+
+        os.remove(state_path)
+        return report
+
+    @staticmethod
+    def drop_indexes() -> List[str]:
+        """
+        Quita los índices secundarios no únicos de las tres colecciones para
+        que la carga no los mantenga fila a fila. Los únicos se conservan:
+        son los que impiden duplicados al reanudar.
+        """
+        dropped = []
+        for model in MODELS.values():
+            collection = model._get_collection()
+            for name, spec in collection.index_information().items():
+                if name != "_id_" and not spec.get("unique"):
+                    collection.drop_index(name)
+                    dropped.append(f"{collection.name}.{name}")
+        return dropped
+
+    @staticmethod
+    def rebuild_indexes() -> List[dict]:
+        """
+        Vuelve a crear los índices declarados con sync_indexes, el mismo
+        camino que `python -m app.cli sync-indexes`; devuelve su informe.
+        """
+        from mongoengine import get_db
+        from app.db.indexes import sync_indexes
+
+        return sync_indexes(get_db())
+
+    def _flush(self, batches: Dict[str, List[dict]], report: dict):
+        # Posts primero para que los comentarios y reacciones nunca queden huérfanos si se corta
+        for kind, documents in batches.items():
+            if not documents:
+                continue
+            inserted = len(documents)
+            collection = MODELS[kind]._get_collection()
+            try:
+                collection.insert_many(documents, ordered=False)
+            except BulkWriteError as e:
+                errors = e.details.get("writeErrors", [])
+                replayed = _replayed_ids(collection, errors)
+                for error in errors:
+                    inserted -= 1
+                    if error.get("code") == DUPLICATE_KEY and (error.get("op") or {}).get("_id") in replayed:
+                        report["duplicates"] += 1
+                    else:
+                        # Otro índice único (p. ej. una segunda reacción del mismo usuario al post): fila perdida
+                        self._row_error(report, None, f"{kind} {(error.get('op') or {}).get('_id')}: "
+                                                      f"{error.get('errmsg', 'Write error')}")
+            report["inserted"][kind] += inserted
+            documents.clear()
+
+    @staticmethod
+    def _to_document(record: dict):
+        """Convierte un registro del volcado en (tipo, documento de Mongo)"""
+        kind = record.get("type")
+        if kind == "checkpoint":
+            return None, None
+        if kind not in MODELS:
+            raise ImportRowError(f"Unknown type: {kind!r}")
+
+        document = {"_id": _object_id(record["id"], "id")}
+        created_at = _datetime(record.get("created_at"))
+
+        if kind == "post":
+            for field in ("organization_id", "user_id", "title", "content"):
+                document[field] = _required(record, field)
+            document.update(
+                created_at=created_at,
+                updated_at=_datetime(record.get("updated_at")) or created_at,
+                likes_count=0, dislikes_count=0, comments_count=0,
+                comments_version=0, reactions_version=0,
+            )
+        elif kind == "comment":
+            if record.get("organization_id"):
+                document["organization_id"] = record["organization_id"]
+            document.update(
+                post=_object_id(record["post_id"], "post_id"),
+                user_name=_required(record, "user_name"),
+                content=_required(record, "content"),
+                created_at=created_at,
+            )
+        else:
+            reaction_type = _required(record, "reaction_type")
+            if reaction_type not in ("like", "dislike"):
+                raise ImportRowError(f"Invalid reaction_type: {reaction_type!r}")
+            document.update(
+                post=_object_id(record["post_id"], "post_id"),
+                user_id=_required(record, "user_id"),
+                reaction_type=reaction_type,
+                created_at=created_at,
+            )
+
+        document["created_at"] = document["created_at"] or datetime.utcnow()
+        return kind, document
+
+    @staticmethod
+    def _row_error(report: dict, line_number: Optional[int], error):
+        report["failed"] += 1
+        if len(report["errors"]) < REPORT_ERROR_SAMPLE:
+            report["errors"].append({"line": line_number, "error": str(error)})
+
+    def _report_progress(self, report: dict, rows_at_start: int, start: float):
+        if self.progress:
+            elapsed = time.perf_counter() - start
+            self.progress({
+                "rows": report["rows"],
+                "rows_per_second": round((report["rows"] - rows_at_start) / elapsed, 1) if elapsed else None,
+            })
+
+    @staticmethod
+    def _load_state(state_path: str) -> Optional[dict]:
+        if not os.path.exists(state_path):
+            return None
+        with open(state_path) as f:
+            return json.load(f)
+
+    @staticmethod
+    def _save_state(state_path: str, offset: int, report: dict, orgs: set):
+        # Escritura atómica: un corte a mitad nunca deja un estado ilegible
+        tmp_path = f"{state_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"offset": offset, "report": report, "orgs": sorted(orgs)}, f)
+        os.replace(tmp_path, state_path)
+
+
+def _replayed_ids(collection, errors: List[dict]) -> set:
+    """
+    _id de las filas rechazadas por chocar con su propio _id (ya cargadas en
+    una ronda anterior). Se usa keyPattern/errmsg del servidor; si no los
+    trae, se comprueba con una consulta qué _id existen ya.
+    """
+    replayed, unknown = set(), []
+    for error in errors:
+        if error.get("code") != DUPLICATE_KEY:
+            continue
+        row_id = (error.get("op") or {}).get("_id")
+        key_pattern = error.get("keyPattern")
+        if key_pattern is not None:
+            if list(key_pattern) == ["_id"]:
+                replayed.add(row_id)
+        elif "index: _id_ " in error.get("errmsg", ""):
+            replayed.add(row_id)
+        elif "index: " not in error.get("errmsg", ""):
+            unknown.append(row_id)
+    if unknown:
+        replayed.update(row["_id"] for row in collection.find({"_id": {"$in": unknown}}, {"_id": 1}))
+    return replayed
+
+
+def _object_id(value, field: str) -> ObjectId:
+    try:
+        return ObjectId(value)
+    except (InvalidId, TypeError) as e:
+        raise ImportRowError(f"Invalid {field}: {value!r}") from e
+
+
+def _required(record: dict, field: str):
+    value = record.get(field)
+    if value in (None, ""):
+        raise ImportRowError(f"Missing {field}")
+    return value
+
+
+def _datetime(value) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except (ValueError, TypeError) as e:
+        raise ImportRowError(f"Invalid date: {value!r}") from e
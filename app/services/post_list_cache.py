@@ -0,0 +1,84 @@
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from app.core.cache import CacheBackend, LRUCache
+
+# Campos del post que cambian con comentarios y reacciones
+COUNTER_FIELDS = ('likes_count', 'dislikes_count', 'comments_count')
+
+POST_CACHE_MAX_ORGS = int(os.getenv("POST_CACHE_MAX_ORGS", "1000"))
+POST_CACHE_TTL_SECONDS = float(os.getenv("POST_CACHE_TTL_SECONDS", "30"))
+
+
+class PostListCache:
+    """
+    Caché read-through de la primera página del listado de posts por organización.
+
+    Guarda la respuesta ya serializada (bytes) de cada variante del listado
+    (view, fields, limit). Las variantes que incluyen contadores se guardan en
+    una clave aparte para que comentarios y reacciones solo invaliden esas.
+    """
+
+    def __init__(self, backend: Optional[CacheBackend] = None, ttl: Optional[float] = POST_CACHE_TTL_SECONDS):
+        self.backend = backend or LRUCache(max_keys=POST_CACHE_MAX_ORGS)
+        self.ttl = ttl
+        # Generación por organización: evita guardar una página calculada
+        # antes de una escritura que la invalidó mientras tanto
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def variant(view: str, fields: Optional[List[str]], limit: int, counters: bool = False) -> str:
+        """Identificador de la variante; counters=True añade los contadores a los campos"""
+        fields = set(fields or ['*'])
+        if counters:
+            fields.update(COUNTER_FIELDS)
+        return f"{view}|{','.join(sorted(fields))}|{limit}"
+
+    @staticmethod
+    def _key(org_id: str, variant: str) -> str:
+        fields = variant.split("|")[1].split(",")
+        has_counters = any(f in COUNTER_FIELDS for f in fields)
+        return f"posts:{org_id}:counters" if has_counters else f"posts:{org_id}"
+
+    def generation(self, org_id: str) -> int:
+        with self._lock:
+            return self._generations.get(org_id, 0)
+
+    def get_page(self, org_id: str, variant: str) -> Optional[Tuple[bytes, Optional[str]]]:
+        """Devuelve (body, next_cursor) o None si no está en caché"""
+        value = self.backend.get(self._key(org_id, variant), variant)
+        if value is None:
+            return None
+        cursor, _, body = value.partition(b"\n")
+        return body, cursor.decode() or None
+
+    def set_page(self, org_id: str, variant: str, body: bytes, next_cursor: Optional[str], generation: int):
+        """Guarda la página salvo que la organización se haya invalidado desde `generation`"""
+        if self.generation(org_id) != generation:
+            return
+        # El cursor (base64 url-safe) nunca contiene saltos de línea
+        value = (next_cursor or "").encode() + b"\n" + body
+        self.backend.set(self._key(org_id, variant), variant, value, ttl=self.ttl)
+
+    def invalidate_org(self, org_id: str):
+        """Un post se creó, editó o eliminó: se descartan todas las variantes"""
+        self._bump(org_id)
+        self.backend.delete(f"posts:{org_id}", f"posts:{org_id}:counters")
+
+    def invalidate_counters(self, org_id: str):
+        """Cambió un contador (comentario o reacción): solo las variantes con contadores"""
+        self._bump(org_id)
+        self.backend.delete(f"posts:{org_id}:counters")
+
+    def stats(self) -> Dict[str, int]:
+        return self.backend.stats()
+
+    def _bump(self, org_id: str):
+        with self._lock:
+            self._generations[org_id] = self._generations.get(org_id, 0) + 1
+
+
+# Instancia compartida por rutas y servicios del proceso
+post_list_cache = PostListCache()
@@ -0,0 +1,199 @@
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+from app.models.comment__model import Comment
+from app.models.post_model import DELETED_POSTS, Post
+from app.models.reaction_model import Reaction
+
+POST_PURGE_ENABLED = os.getenv("POST_PURGE_ENABLED", "true").lower() in ("1", "true", "yes")
+# Documentos que se borran por lote (un delete_many sobre esos _id)
+POST_PURGE_BATCH_SIZE = int(os.getenv("POST_PURGE_BATCH_SIZE", "1000"))
+# Pausa entre lotes para no competir con el tráfico
+POST_PURGE_PAUSE_SECONDS = float(os.getenv("POST_PURGE_PAUSE_SECONDS", "0.05"))
+# Cada cuánto se buscan posts borrados si nadie avisa
+POST_PURGE_POLL_SECONDS = float(os.getenv("POST_PURGE_POLL_SECONDS", "30"))
+
+
+class PostPurger:
+    """
+    Purga en segundo plano de los posts borrados (tombstone).
+
+    delete_post solo marca `deleted_at` y responde; a partir de ahí el post
+    queda oculto para las lecturas y este hilo borra sus comentarios y
+    reacciones en lotes de `batch_size` documentos, con `pause` segundos entre
+    lotes, y por último el propio post. Cada lote descuenta lo borrado de los
+    contadores del post, así el backlog pendiente se calcula a partir de ellos
+    sin contar documentos.
+
+    Es seguro ejecutarlo en varios procesos a la vez: cada lote es un
+    delete_many por _id, borrar dos veces lo mismo no tiene efecto y los
+    contadores se descuentan con lo que cada proceso borró de verdad.
+    """
+
+    def __init__(self, enabled: bool = POST_PURGE_ENABLED, batch_size: int = POST_PURGE_BATCH_SIZE,
+                 pause: float = POST_PURGE_PAUSE_SECONDS, poll_interval: float = POST_PURGE_POLL_SECONDS):
+        self.enabled = enabled
+        self.batch_size = batch_size
+        self.pause = pause
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._run_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._purged_posts = 0
+        self._deleted = {"comments": 0, "reactions": 0}
+        self._batches = 0
+        self._failures = 0
+        self._last_batch_ms = 0.0
+        self._current_post: Optional[str] = None
+
+    def wakeup(self):
+        """Avisa de que hay un post nuevo que purgar"""
+        self._wakeup.set()
+
+    def run_once(self, max_batches: Optional[int] = None) -> int:
+        """
+        Purga posts borrados hasta vaciar la cola o gastar `max_batches`
+        lotes; devuelve cuántos posts terminó de purgar.
+        """
+        purged = 0
+        batches = 0
+        with self._run_lock:
+            try:
+                while not self._stopping.is_set():
+                    post = Post._get_collection().find_one(DELETED_POSTS, {"_id": 1}, sort=[("deleted_at", 1)])
+                    if post is None:
+                        break
+                    with self._lock:
+                        self._current_post = str(post["_id"])
+
+                    done = False
+                    while not done and not self._stopping.is_set():
+                        if max_batches is not None and batches >= max_batches:
+                            return purged
+                        done = self._purge_batch(post["_id"])
+                        batches += 1
+                        if not done and self.pause:
+                            self._stopping.wait(self.pause)
+                    if done:
+                        purged += 1
+            finally:
+                with self._lock:
+                    self._current_post = None
+        return purged
+
+    def backlog(self) -> Dict[str, int]:
+        """Posts borrados pendientes y los comentarios/reacciones que les quedan"""
+        rows = list(Post._get_collection().aggregate([
+            {"$match": DELETED_POSTS},
+            {"$group": {
+                "_id": None,
+                "posts": {"$sum": 1},
+                "comments": {"$sum": "$comments_count"},
+                "reactions": {"$sum": {"$add": ["$likes_count", "$dislikes_count"]}},
+            }},
+        ]))
+        if not rows:
+            return {"posts": 0, "comments": 0, "reactions": 0}
+        return {k: rows[0][k] for k in ("posts", "comments", "reactions")}
+
+    def start(self):
+        """Arranca el hilo de purga (solo si está activado)"""
+        if not self.enabled or self._thread is not None:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="post-purger", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Detiene el hilo; lo que quede pendiente se purga en el siguiente arranque"""
+        if self._thread is not None:
+            self._stopping.set()
+            self._wakeup.set()
+            self._thread.join()
+            self._thread = None
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "running": self._thread is not None,
+                "current_post": self._current_post,
+                "purged_posts": self._purged_posts,
+                "deleted_comments": self._deleted["comments"],
+                "deleted_reactions": self._deleted["reactions"],
+                "batches": self._batches,
+                "failures": self._failures,
+                "last_batch_ms": round(self._last_batch_ms, 3),
+                "batch_size": self.batch_size,
+                "pause_seconds": self.pause,
+            }
+
+    def _purge_batch(self, post_id) -> bool:
+        """
+        Borra un lote de comentarios o reacciones del post; True cuando ya no
+        le queda nada. Los contadores se descuentan con lo que este proceso
+        borró (deleted_count), no con lo que leyó: si otro proceso purga el
+        mismo lote a la vez, cada documento se descuenta una sola vez.
+        """
+        start = time.perf_counter()
+        comments = [row["_id"] for row in self._batch(Comment, post_id)]
+        if comments:
+            deleted = Comment._get_collection().delete_many({"_id": {"$in": comments}}).deleted_count
+            Post._get_collection().update_one({"_id": post_id}, {"$inc": {"comments_count": -deleted}})
+            self._record_batch("comments", deleted, start)
+            return False
+
+        reactions = self._batch(Reaction, post_id, {"reaction_type": 1})
+        if reactions:
+            # Un delete_many por tipo para saber cuántos likes y dislikes se borraron de verdad
+            likes = [r["_id"] for r in reactions if r.get("reaction_type") == "like"]
+            dislikes = [r["_id"] for r in reactions if r.get("reaction_type") != "like"]
+            deleted_likes = self._delete_reactions(likes, "like")
+            deleted_dislikes = self._delete_reactions(dislikes, {"$ne": "like"})
+            Post._get_collection().update_one(
+                {"_id": post_id}, {"$inc": {"likes_count": -deleted_likes, "dislikes_count": -deleted_dislikes}}
+            )
+            self._record_batch("reactions", deleted_likes + deleted_dislikes, start)
+            return False
+
+        # Sin dependientes: se borra el post (por la colección, sin pasar por el CASCADE de MongoEngine)
+        Post._get_collection().delete_one({"_id": post_id, **DELETED_POSTS})
+        with self._lock:
+            self._purged_posts += 1
+        return True
+
+    def _batch(self, model, post_id, projection: Optional[Dict[str, int]] = None) -> List[dict]:
+        return list(model._get_collection().find({"post": post_id}, projection or {"_id": 1}).limit(self.batch_size))
+
+    def _delete_reactions(self, ids: List, reaction_type) -> int:
+        """Borra esas reacciones si siguen siendo del tipo leído; devuelve cuántas borró"""
+        if not ids:
+            return 0
+        return Reaction._get_collection().delete_many(
+            {"_id": {"$in": ids}, "reaction_type": reaction_type}
+        ).deleted_count
+
+    def _record_batch(self, kind: str, count: int, start: float):
+        with self._lock:
+            self._deleted[kind] += count
+            self._batches += 1
+            self._last_batch_ms = (time.perf_counter() - start) * 1000
+
+    def _run(self):
+        while not self._stopping.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"⚠️ Error purgando posts borrados: {e}")
+                with self._lock:
+                    self._failures += 1
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+
+
+# Instancia compartida por los servicios del proceso
+post_purger = PostPurger()
@@ -1,9 +1,54 @@
+import operator
+from datetime import datetime
+from functools import reduce
 from bson import ObjectId
 from bson.errors import InvalidId
+from mongoengine import Q
+from app.core.pagination import DEFAULT_PAGE_SIZE, cut_page, decode_cursor
 from app.models.post_model import Post
+from app.services.post_list_cache import post_list_cache
+from app.services.post_purger import post_purger
+from app.services.search_index import search_index
 from app.schemas.post_schema import PostCreate, PostUpdate
-from app.schemas.post_schema import PostCreate, PostUpdate
-from typing import Optional  
+from typing import List, Optional
+
+# Campos que se pueden pedir en el listado con ?fields=
+PROJECTABLE_FIELDS = (
+    'organization_id', 'user_id', 'title', 'content', 'created_at', 'updated_at',
+    'likes_count', 'dislikes_count', 'comments_count',
+)
+
+# Longitud del extracto del contenido en el listado resumido (?view=summary)
+SUMMARY_EXCERPT_LENGTH = 200
+
+# Proyección del listado resumido: Mongo recorta el contenido antes de enviarlo
+SUMMARY_PROJECTION = {
+    "organization_id": 1,
+    "user_id": 1,
+    "title": 1,
+    "created_at": 1,
+    "excerpt": {"$substrCP": ["$content", 0, SUMMARY_EXCERPT_LENGTH]},
+    "truncated": {"$gt": [{"$strLenCP": "$content"}, SUMMARY_EXCERPT_LENGTH]},
+}
+
+
+def summary_projection(counters: bool = False) -> dict:
+    """Proyección del listado resumido, con los contadores del post si se piden"""
+    if not counters:
+        return SUMMARY_PROJECTION
+    return dict(SUMMARY_PROJECTION, likes_count=1, dislikes_count=1, comments_count=1)
+
+
+def check_projectable_fields(fields: List[str]):
+    """Lanza ValueError si se pide algún campo que no se puede proyectar"""
+    invalid = [f for f in fields if f not in PROJECTABLE_FIELDS]
+    if invalid:
+        raise ValueError(f"Invalid fields: {', '.join(invalid)}")
+
+
+class PreconditionFailed(Exception):
+    """El post no coincide con la versión esperada (If-Match / expected_updated_at)"""
+
 
 class PostService:
     def create_post(self, org_id: str, post_data: PostCreate) -> Post:
@@ -14,11 +59,62 @@ class PostService:
             content=post_data.content
         )
         post.save()  # Guardamos el post en la base de datos
+        post_list_cache.invalidate_org(org_id)
+        search_index.post_saved(post)
         return post
 
     def get_all_posts(self, org_id: str):
         return Post.objects(organization_id=org_id).all()  
 
+    def get_posts_page(self, org_id: str, limit: int = DEFAULT_PAGE_SIZE, after: Optional[str] = None):
+        """
+        Obtiene una página de posts de una organización, del más reciente al
+        más antiguo, recorriendo el índice ('organization_id', '-created_at', '-id').
+
+        Devuelve una tupla (posts, next_cursor); next_cursor es None en la última página.
+        """
+        posts = list(self._page_query(org_id, limit, after))
+        return cut_page(posts, limit, lambda p: (p.created_at, p.id))
+
+    def get_posts_projection_page(self, org_id: str, fields: List[str],
+                                  limit: int = DEFAULT_PAGE_SIZE, after: Optional[str] = None):
+        """
+        Igual que get_posts_page pero trae de Mongo solo los campos pedidos,
+        como diccionarios planos y sin construir documentos Post.
+        El _id y created_at siempre se incluyen porque forman el cursor.
+        """
+        check_projectable_fields(fields)
+
+        only = set(fields) | {'created_at'}
+        rows = list(self._page_query(org_id, limit, after).only(*only).as_pymongo())
+        return cut_page(rows, limit, lambda r: (r['created_at'], r['_id']))
+
+    def get_posts_summary_page(self, org_id: str, limit: int = DEFAULT_PAGE_SIZE, after: Optional[str] = None,
+                               counters: bool = False):
+        """
+        Página de posts en modo resumen para el feed: en lugar del contenido
+        completo, Mongo devuelve un extracto de SUMMARY_EXCERPT_LENGTH caracteres.
+        """
+        rows = list(self._page_query(org_id, limit, after).aggregate([{"$project": summary_projection(counters)}]))
+        return cut_page(rows, limit, lambda r: (r['created_at'], r['_id']))
+
+    def _page_query(self, org_id: str, limit: int, after: Optional[str]):
+        """Construye la consulta keyset de una página (pide limit + 1 elementos)"""
+        # Validamos el cursor antes de consultar la base de datos
+        position = decode_cursor(after) if after else None
+
+        query = Post.objects(organization_id=org_id)
+        if position:
+            created_at, last_id = position
+            # El rango sobre created_at acota el recorrido del índice y el _id
+            # desempata posts creados en el mismo instante
+            query = query.filter(created_at__lte=created_at).filter(
+                Q(created_at__lt=created_at) | Q(id__lt=last_id)
+            )
+
+        # Pedimos un elemento extra para saber si existe una página siguiente
+        return query.order_by('-created_at', '-id').limit(limit + 1)
+
     def get_post_by_id(self, org_id: str, post_id: str) -> Post:
         try:
             obj_id = ObjectId(post_id)
@@ -33,16 +129,64 @@ class PostService:
             raise Exception("Post not found")
         return post
 
-    def update_post(self, org_id: str, post_id: str, post_data: PostUpdate) -> Post:
-        post = self.get_post_by_id(org_id, post_id)  # Filtramos por org_id y post_id
+    def update_post(self, org_id: str, post_id: str, post_data: PostUpdate,
+                    expected: Optional[List[dict]] = None) -> Post:
+        """
+        Actualiza título/contenido y updated_at con un único find_one_and_update
+        que devuelve el post ya modificado.
+
+        expected permite concurrencia optimista: lista de versiones alternativas
+        ({'updated_at': ..., ...}); la actualización solo se aplica si el post
+        coincide con alguna. Si ya no coincide se lanza PreconditionFailed.
+        """
+        try:
+            obj_id = ObjectId(post_id)
+        except InvalidId:
+            raise Exception("Invalid post ID format")
+
+        changes = {}
         if post_data.title:
-            post.update(set__title=post_data.title)
+            changes['set__title'] = post_data.title
         if post_data.content:
-            post.update(set__content=post_data.content)
-        post.reload()  # Recargamos el post con la nueva información
+            changes['set__content'] = post_data.content
+
+        query = Post.objects(id=obj_id, organization_id=org_id)
+        if expected:
+            query = query.filter(reduce(operator.or_, (Q(**version) for version in expected)))
+
+        if changes:
+            # updated_at forma parte del ETag del post, así que se actualiza junto a los cambios
+            post = query.modify(new=True, set__updated_at=datetime.utcnow(), **changes)
+        else:
+            post = query.first()
+
+        if not post:
+            # Solo en el caso de fallo distinguimos "no existe" de "cambió entretanto"
+            if expected and Post.objects(id=obj_id, organization_id=org_id).only('id').first():
+                raise PreconditionFailed("Post was modified by another request")
+            raise Exception("Post not found")
+
+        if changes:
+            post_list_cache.invalidate_org(org_id)
+            search_index.post_saved(post)
         return post
 
     def delete_post(self, org_id: str, post_id: str):
-        post = self.get_post_by_id(org_id, post_id)
-        post.delete()  # Eliminamos el post de la base de datos
+        """
+        Borra el post al instante marcándolo con deleted_at (tombstone): desde
+        ese momento las lecturas no lo ven. Sus comentarios y reacciones, y
+        luego el propio documento, los borra post_purger en segundo plano.
+        """
+        try:
+            obj_id = ObjectId(post_id)
+        except InvalidId:
+            raise Exception("Invalid post ID format")
+
+        post = Post.objects(id=obj_id, organization_id=org_id).modify(new=True, set__deleted_at=datetime.utcnow())
+        if not post:
+            raise Exception("Post not found")
+
+        post_list_cache.invalidate_org(org_id)
+        search_index.post_deleted(org_id, post.id)
+        post_purger.wakeup()
         return {"message": "Post deleted successfully"}
@@ -1,9 +1,20 @@
+from datetime import datetime
 from fastapi import HTTPException
+from mongoengine import NotUniqueError
 from app.models.reaction_model import Reaction
 from app.models.post_model import Post
+from app.services.counter_buffer import counter_buffer
+from app.services.post_list_cache import post_list_cache
 from bson import ObjectId
 from bson.errors import InvalidId
 
+# Contador del post que corresponde a cada tipo de reacción
+COUNTER_FIELDS = {'like': 'likes_count', 'dislike': 'dislikes_count'}
+
+# Reintentos ante carreras con otra petición del mismo usuario
+MAX_TOGGLE_ATTEMPTS = 5
+
+
 class ReactionService:
     
     def add_or_update_reaction(self, post_id: str, user_id: str, reaction_type: str):
@@ -11,6 +22,12 @@ class ReactionService:
         Agrega o actualiza una reacción de un usuario a un post.
         Si el usuario ya reaccionó, actualiza la reacción.
         Si la nueva reacción es igual a la anterior, la elimina (toggle).
+
+        Cada cambio de estado es una única operación atómica sobre la reacción
+        (upsert o borrado condicionado, apoyados en el índice único
+        (post, user_id)) y solo quien la aplica ajusta los contadores, con un
+        único find_one_and_update sobre el post. Así las peticiones
+        concurrentes no duplican reacciones ni desvían los contadores.
         """
         try:
             # Validar post_id
@@ -19,79 +36,86 @@ class ReactionService:
             except (InvalidId, TypeError):
                 raise HTTPException(status_code=400, detail="Invalid post ID format")
             
-            # Verificar que el post existe
-            post = Post.objects(id=post_object_id).first()
+            message, deltas, inserted = self._toggle(post_object_id, user_id, reaction_type)
+            user_reaction = None if message == "Reaction removed" else reaction_type
+
+            post = self._apply_counters(post_object_id, deltas)
             if not post:
+                if inserted:
+                    # El post no existe (o se acaba de borrar): deshacemos la reacción creada
+                    Reaction.objects(post=post_object_id, user_id=user_id).delete()
                 raise HTTPException(status_code=404, detail="Post not found")
-            
-            # Buscar si el usuario ya reaccionó a este post
-            existing_reaction = Reaction.objects(post=post, user_id=user_id).first()
-            
-            if existing_reaction:
-                # Si la reacción es la misma, la eliminamos (toggle off)
-                if existing_reaction.reaction_type == reaction_type:
-                    old_type = existing_reaction.reaction_type
-                    existing_reaction.delete()
-                    
-                    # Actualizar contador en el post
-                    if old_type == 'like':
-                        post.update(dec__likes_count=1)
-                    else:
-                        post.update(dec__dislikes_count=1)
-                    
-                    post.reload()
-                    return {
-                        "message": "Reaction removed",
-                        "likes_count": post.likes_count,
-                        "dislikes_count": post.dislikes_count,
-                        "user_reaction": None
-                    }
-                else:
-                    # Cambiar de like a dislike o viceversa
-                    old_type = existing_reaction.reaction_type
-                    existing_reaction.update(set__reaction_type=reaction_type)
-                    
-                    # Actualizar contadores
-                    if old_type == 'like':
-                        post.update(dec__likes_count=1, inc__dislikes_count=1)
-                    else:
-                        post.update(inc__likes_count=1, dec__dislikes_count=1)
-                    
-                    post.reload()
-                    return {
-                        "message": "Reaction updated",
-                        "likes_count": post.likes_count,
-                        "dislikes_count": post.dislikes_count,
-                        "user_reaction": reaction_type
-                    }
-            else:
-                # Crear nueva reacción
-                reaction = Reaction(
-                    post=post,
-                    user_id=user_id,
-                    reaction_type=reaction_type
-                )
-                reaction.save()
-                
-                # Actualizar contador en el post
-                if reaction_type == 'like':
-                    post.update(inc__likes_count=1)
-                else:
-                    post.update(inc__dislikes_count=1)
-                
-                post.reload()
-                return {
-                    "message": "Reaction added",
-                    "likes_count": post.likes_count,
-                    "dislikes_count": post.dislikes_count,
-                    "user_reaction": reaction_type
-                }
+
+            return {
+                "message": message,
+                "likes_count": post.likes_count,
+                "dislikes_count": post.dislikes_count,
+                "user_reaction": user_reaction
+            }
                 
         except HTTPException:
             raise
         except Exception as e:
             print(f"Error en add_or_update_reaction: {str(e)}")
             raise HTTPException(status_code=500, detail=f"Error processing reaction: {str(e)}")
+
+    def _toggle(self, post_object_id: ObjectId, user_id: str, reaction_type: str):
+        """
+        Aplica el cambio de estado de la reacción y devuelve
+        (message, deltas de contadores, si se insertó una reacción nueva).
+        """
+        for _ in range(MAX_TOGGLE_ATTEMPTS):
+            try:
+                # Upsert atómico: devuelve la reacción previa o None si la acaba de crear
+                previous = Reaction.objects(post=post_object_id, user_id=user_id).modify(
+                    upsert=True,
+                    new=False,
+                    set__reaction_type=reaction_type,
+                    set_on_insert__created_at=datetime.utcnow(),
+                )
+            except NotUniqueError:
+                # Otra petición insertó la misma reacción a la vez: volvemos a intentarlo
+                continue
+
+            if previous is None:
+                return "Reaction added", {COUNTER_FIELDS[reaction_type]: 1}, True
+
+            if previous.reaction_type != reaction_type:
+                # Cambio de like a dislike o viceversa
+                return "Reaction updated", {
+                    COUNTER_FIELDS[reaction_type]: 1,
+                    COUNTER_FIELDS[previous.reaction_type]: -1,
+                }, False
+
+            # Misma reacción: toggle off, solo si nadie la cambió entretanto
+            if Reaction.objects(id=previous.id, reaction_type=reaction_type).delete():
+                return "Reaction removed", {COUNTER_FIELDS[reaction_type]: -1}, False
+
+        raise HTTPException(status_code=409, detail="Concurrent reaction update, please retry")
+
+    @staticmethod
+    def _apply_counters(post_object_id: ObjectId, deltas: dict):
+        """Ajusta los contadores y devuelve el post actualizado (None si no existe)"""
+        if counter_buffer.enabled:
+            # Write-behind: los contadores los escribe el próximo flush, pero
+            # reactions_version se sube ya para que el ETag de /stats cambie en
+            # cuanto cambia la reacción del usuario (en cualquier instancia)
+            post = Post.objects(id=post_object_id).only(
+                'organization_id', 'likes_count', 'dislikes_count'
+            ).modify(new=True, inc__reactions_version=1)
+            if post:
+                counter_buffer.add(post_object_id, post.organization_id, deltas)
+                pending = counter_buffer.pending(post_object_id)
+                post.likes_count += pending.get('likes_count', 0)
+                post.dislikes_count += pending.get('dislikes_count', 0)
+            return post
+
+        deltas = dict(deltas, reactions_version=1)
+        inc = {f"inc__{field}": delta for field, delta in deltas.items()}
+        post = Post.objects(id=post_object_id).modify(new=True, **inc)
+        if post:
+            post_list_cache.invalidate_counters(post.organization_id)
+        return post
     
     def get_reaction_stats(self, post_id: str, user_id: str = None):
         """
@@ -138,24 +162,16 @@ class ReactionService:
             except (InvalidId, TypeError):
                 raise HTTPException(status_code=400, detail="Invalid post ID format")
             
-            # Verificar que el post existe
-            post = Post.objects(id=post_object_id).first()
-            if not post:
-                raise HTTPException(status_code=404, detail="Post not found")
-            
-            # Buscar la reacción del usuario
-            reaction = Reaction.objects(post=post, user_id=user_id).first()
+            # Borrado atómico que devuelve la reacción eliminada
+            reaction = Reaction.objects(post=post_object_id, user_id=user_id).modify(remove=True)
             if not reaction:
+                if not Post.objects(id=post_object_id).only('id').first():
+                    raise HTTPException(status_code=404, detail="Post not found")
                 raise HTTPException(status_code=404, detail="Reaction not found")
             
-            # Actualizar contador antes de eliminar
-            if reaction.reaction_type == 'like':
-                post.update(dec__likes_count=1)
-            else:
-                post.update(dec__dislikes_count=1)
-            
-            reaction.delete()
-            post.reload()
+            post = self._apply_counters(post_object_id, {COUNTER_FIELDS[reaction.reaction_type]: -1})
+            if not post:
+                raise HTTPException(status_code=404, detail="Post not found")
             
             return {
                 "message": "Reaction removed successfully",
@@ -0,0 +1,227 @@
+from typing import List, Optional
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import HTTPException
+
+from app.core.pagination import DEFAULT_PAGE_SIZE
+from app.db.async_mongodb import async_backend_enabled
+from app.db.mongodb import DB_BACKEND
+from app.models.post_model import Post
+from app.models.reaction_model import Reaction
+from app.services.comment_service import CommentService
+from app.services.post_list_cache import COUNTER_FIELDS
+from app.services.post_service import PostService
+
+# Campos que expone PostOut (además del id)
+POST_OUT_FIELDS = ('organization_id', 'user_id', 'title', 'content', 'created_at', 'updated_at')
+
+# Máximo de posts por petición de estadísticas en lote (una página del feed)
+MAX_STATS_BATCH = 100
+
+# Campos del post que determinan el ETag de cada endpoint
+POST_VERSION_FIELDS = ('updated_at', 'likes_count', 'dislikes_count', 'comments_count')
+COMMENTS_VERSION_FIELDS = ('comments_count', 'comments_version')
+REACTIONS_VERSION_FIELDS = ('likes_count', 'dislikes_count', 'reactions_version')
+
+
+def version_of(row: dict, fields: tuple) -> tuple:
+    """Tupla de versión de un post crudo (los campos ausentes valen su default)"""
+    return tuple(row.get(f, 0) for f in fields)
+
+
+def with_counters(fields, counters: bool) -> List[str]:
+    """Campos a proyectar, más los contadores del post si se piden"""
+    return list(dict.fromkeys(tuple(fields) + (COUNTER_FIELDS if counters else ())))
+
+
+def post_row_to_out(row: dict, counters: bool = False) -> dict:
+    """Convierte un post crudo de Mongo al formato de la API (_id -> id)"""
+    out = {"id": row.pop("_id")}
+    out.update(row)
+    if counters:
+        # as_pymongo no aplica los valores por defecto del Document
+        for field in COUNTER_FIELDS:
+            out.setdefault(field, 0)
+    return out
+
+
+def comment_row_to_out(row: dict) -> dict:
+    """Convierte un comentario crudo de Mongo al formato de la API"""
+    return {
+        "id": row["_id"],
+        "post_id": row["post"],  # ObjectId guardado en la referencia
+        "user_name": row["user_name"],
+        "content": row["content"],
+        "created_at": row["created_at"],
+    }
+
+
+def reaction_stats_by_post(rows: List[dict], user_reactions: dict) -> dict:
+    """Arma {post_id: stats} a partir de los contadores crudos y las reacciones del usuario"""
+    return {
+        str(row["_id"]): {
+            "likes_count": row.get("likes_count", 0),
+            "dislikes_count": row.get("dislikes_count", 0),
+            "user_reaction": user_reactions.get(row["_id"]),
+        }
+        for row in rows
+    }
+
+
+class ForumReadService:
+    """
+    Capa de lectura de los endpoints GET más usados.
+
+    Consulta Mongo con as_pymongo() y proyecciones, así que trabaja con
+    diccionarios planos en lugar de construir Documents de MongoEngine y
+    modelos de Pydantic. El resultado se serializa con app.core.serialization.
+    """
+
+    def __init__(self, post_service: Optional[PostService] = None,
+                 comment_service: Optional[CommentService] = None):
+        self.post_service = post_service or PostService()
+        self.comment_service = comment_service or CommentService()
+
+    def list_posts(self, org_id: str, limit: int = DEFAULT_PAGE_SIZE, after: Optional[str] = None,
+                   view: str = "full", fields: Optional[List[str]] = None, counters: bool = False):
+        """
+        Página de posts de una organización; devuelve (items, next_cursor).
+        Con counters=True cada post incluye además sus contadores.
+        """
+        if fields:
+            rows, next_cursor = self.post_service.get_posts_projection_page(
+                org_id, with_counters(fields, counters), limit=limit, after=after
+            )
+        elif view == "summary":
+            rows, next_cursor = self.post_service.get_posts_summary_page(
+                org_id, limit=limit, after=after, counters=counters
+            )
+        else:
+            rows, next_cursor = self.post_service.get_posts_projection_page(
+                org_id, with_counters(POST_OUT_FIELDS, counters), limit=limit, after=after
+            )
+        return [post_row_to_out(r, counters) for r in rows], next_cursor
+
+    def get_post(self, org_id: str, post_id: str) -> dict:
+        try:
+            obj_id = ObjectId(post_id)
+        except (InvalidId, TypeError):
+            raise Exception("Invalid post ID format")
+
+        row = Post.objects(id=obj_id, organization_id=org_id).only(*POST_OUT_FIELDS).as_pymongo().first()
+        if not row:
+            raise Exception("Post not found")
+        return post_row_to_out(row)
+
+    def post_version(self, org_id: str, post_id: str) -> tuple:
+        """Versión del post para el ETag; solo lee los campos que cambian"""
+        try:
+            obj_id = ObjectId(post_id)
+        except (InvalidId, TypeError):
+            raise Exception("Invalid post ID format")
+
+        row = Post.objects(id=obj_id, organization_id=org_id).only(*POST_VERSION_FIELDS).as_pymongo().first()
+        if not row:
+            raise Exception("Post not found")
+        return version_of(row, POST_VERSION_FIELDS)
+
+    def comments_version(self, post_id: str) -> tuple:
+        """Versión de la lista de comentarios de un post (para el ETag)"""
+        return self._post_version_row(self._post_object_id(post_id), COMMENTS_VERSION_FIELDS)
+
+    def reaction_stats_version(self, post_id: str) -> tuple:
+        """Versión de las estadísticas de reacciones de un post (para el ETag)"""
+        return self._post_version_row(self._post_object_id(post_id), REACTIONS_VERSION_FIELDS)
+
+    def list_comments(self, post_id: str, ensure_post: bool = True, limit: int = DEFAULT_PAGE_SIZE,
+                      after: Optional[str] = None, order: str = "asc"):
+        """
+        Página de comentarios de un post; devuelve (items, next_cursor).
+        Con ensure_post=False no se comprueba que el post exista (la ruta ya
+        lo hizo al leer su versión).
+        """
+        post_object_id = self._post_object_id(post_id)
+        if ensure_post:
+            self._ensure_post_exists(post_object_id)
+
+        rows, next_cursor = self.comment_service.get_comment_rows_page(post_object_id, limit, after, order)
+        return [comment_row_to_out(r) for r in rows], next_cursor
+
+    def get_reaction_stats(self, post_id: str, user_id: Optional[str] = None) -> dict:
+        post_object_id = self._post_object_id(post_id)
+
+        post = Post.objects(id=post_object_id).only('likes_count', 'dislikes_count').as_pymongo().first()
+        if not post:
+            raise HTTPException(status_code=404, detail="Post not found")
+
+        user_reaction = None
+        if user_id:
+            reaction = Reaction.objects(post=post_object_id, user_id=user_id).only(
+                'reaction_type'
+            ).as_pymongo().first()
+            if reaction:
+                user_reaction = reaction["reaction_type"]
+
+        # as_pymongo no aplica los valores por defecto del Document
+        return {
+            "likes_count": post.get("likes_count", 0),
+            "dislikes_count": post.get("dislikes_count", 0),
+            "user_reaction": user_reaction,
+        }
+
+    def get_reaction_stats_batch(self, org_id: str, post_ids: List[str], user_id: Optional[str] = None) -> dict:
+        """
+        Estadísticas de reacciones de varios posts de una organización con una
+        consulta $in por colección. Devuelve {post_id: stats}; los posts que no
+        existen (o son de otra organización) no aparecen en el resultado.
+        """
+        object_ids = list(dict.fromkeys(self._post_object_id(p) for p in post_ids))
+
+        rows = list(Post.objects(id__in=object_ids, organization_id=org_id).only(
+            'likes_count', 'dislikes_count'
+        ).as_pymongo())
+
+        user_reactions = {}
+        if user_id and rows:
+            user_reactions = self.viewer_reactions([r["_id"] for r in rows], user_id)
+        return reaction_stats_by_post(rows, user_reactions)
+
+    def viewer_reactions(self, post_object_ids: List[ObjectId], user_id: str) -> dict:
+        """Reacción de un usuario a cada post ({post_id: tipo}); una sola consulta sobre (post, user_id)"""
+        rows = Reaction.objects(post__in=post_object_ids, user_id=user_id).only(
+            'post', 'reaction_type'
+        ).as_pymongo()
+        return {r["post"]: r["reaction_type"] for r in rows}
+
+    @staticmethod
+    def _post_object_id(post_id: str) -> ObjectId:
+        try:
+            return ObjectId(post_id)
+        except (InvalidId, TypeError):
+            raise HTTPException(status_code=400, detail="Invalid post ID format")
+
+    @staticmethod
+    def _post_version_row(post_object_id: ObjectId, fields: tuple) -> tuple:
+        row = Post.objects(id=post_object_id).only(*fields).as_pymongo().first()
+        if not row:
+            raise HTTPException(status_code=404, detail="Post not found")
+        return version_of(row, fields)
+
+    @staticmethod
+    def _ensure_post_exists(post_object_id: ObjectId):
+        if not Post.objects(id=post_object_id).only('id').as_pymongo().first():
+            raise HTTPException(status_code=404, detail="Post not found")
+
+
+def create_read_service(post_service: Optional[PostService] = None):
+    """
+    Crea la capa de lectura según FORUM_DB_BACKEND: 'async' usa Motor y
+    'sync' mantiene MongoEngine en el thread pool (útil para comparar).
+    """
+    if DB_BACKEND == "async":
+        if async_backend_enabled():
+            from app.services.async_read_service import AsyncForumReadService
+            return AsyncForumReadService()
+        print("⚠️ Backend async no disponible (no se pudo importar Motor); se usa MongoEngine")
+    return ForumReadService(post_service)
@@ -0,0 +1,145 @@
+import os
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from app.core.search import FIELD_WEIGHTS, InvertedIndex, SearchBackend
+from app.models.comment__model import Comment
+from app.models.post_model import LIVE_POSTS, Post
+
+# Backend de búsqueda: 'mongo' (índices de texto, producción) o 'memory' (índice invertido del proceso)
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "mongo").lower()
+SEARCH_INDEX_MAX_ORGS = int(os.getenv("SEARCH_INDEX_MAX_ORGS", "100"))
+
+# Posts por consulta de comentarios al cargar una organización en memoria
+LOAD_BATCH_SIZE = 500
+
+# Posts con comentarios coincidentes que el backend de Mongo considera como
+# candidatos (los de posts borrados se descartan después)
+MONGO_COMMENT_CANDIDATES = 1000
+
+
+class MongoTextSearch(SearchBackend):
+    """
+    Búsqueda con los índices de texto de Mongo declarados en los modelos:
+    (organization_id, $title, $content) en posts y (organization_id, $content)
+    en comments.
+    Mongo mantiene los índices, así que los avisos de escritura no hacen nada.
+
+    La relevancia de un post es su textScore más FIELD_WEIGHTS['comments']
+    veces la suma de los textScore de sus comentarios.
+    """
+
+    def index_post(self, org_id: str, post_id, title: str, content: str):
+        pass
+
+    def remove_post(self, org_id: str, post_id):
+        pass
+
+    def index_comment(self, org_id: str, post_id, comment_id, content: str):
+        pass
+
+    def remove_comment(self, org_id: str, post_id, comment_id):
+        pass
+
+    def search(self, org_id: str, query: str, limit: int) -> List[dict]:
+        text = {"$search": query}
+        scores: Dict = {}
+        matched: Dict = {}
+
+        # El prefijo de igualdad sobre organization_id acota el índice de texto a la organización
+        posts = Post._get_collection().find(
+            {"organization_id": org_id, "$text": text, **LIVE_POSTS},
+            {"score": {"$meta": "textScore"}},
+        ).sort([("score", {"$meta": "textScore"})]).limit(limit)
+        for row in posts:
+            scores[row["_id"]] = row["score"]
+            # El textScore no distingue si coincidió el título o el contenido
+            matched[row["_id"]] = ["post"]
+
+        comments = list(Comment._get_collection().aggregate([
+            {"$match": {"organization_id": org_id, "$text": text}},
+            {"$group": {"_id": "$post", "score": {"$sum": {"$meta": "textScore"}}}},
+            {"$sort": {"score": -1}},
+            {"$limit": MONGO_COMMENT_CANDIDATES},
+        ]))
+        if comments:
+            # Solo cuentan los posts que siguen vivos
+            live = {
+                row["_id"] for row in Post._get_collection().find(
+                    {"_id": {"$in": [c["_id"] for c in comments]}, "organization_id": org_id, **LIVE_POSTS}, {"_id": 1}
+                )
+            }
+            for row in comments:
+                if row["_id"] in live:
+                    scores[row["_id"]] = scores.get(row["_id"], 0.0) + FIELD_WEIGHTS["comments"] * row["score"]
+                    matched.setdefault(row["_id"], []).append("comments")
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], str(item[0])))[:limit]
+        return [{"post_id": post_id, "score": round(score, 4), "matched": matched[post_id]}
+                for post_id, score in ranked]
+
+    def stats(self) -> Dict[str, int]:
+        return {}
+
+
+def load_org_documents(org_id: str) -> Iterator[Tuple[str, tuple]]:
+    """Posts y comentarios de una organización para cargar el índice en memoria"""
+    posts = Post._get_collection().find({"organization_id": org_id, **LIVE_POSTS}, {"title": 1, "content": 1})
+    while True:
+        batch = list(islice(posts, LOAD_BATCH_SIZE))
+        if not batch:
+            return
+        for post in batch:
+            yield "post", (post["_id"], post.get("title"), post.get("content"))
+        comments = Comment._get_collection().find(
+            {"post": {"$in": [post["_id"] for post in batch]}}, {"post": 1, "content": 1}
+        )
+        for comment in comments:
+            yield "comment", (comment["post"], comment["_id"], comment.get("content"))
+
+
+def create_search_backend(kind: str = SEARCH_BACKEND) -> SearchBackend:
+    if kind == "memory":
+        return InvertedIndex(loader=load_org_documents, max_orgs=SEARCH_INDEX_MAX_ORGS)
+    return MongoTextSearch()
+
+
+class SearchIndex:
+    """
+    Punto de entrada de las escrituras al backend de búsqueda.
+
+    PostService y CommentService avisan de sus escrituras con post_saved,
+    post_deleted, comment_saved y comment_deleted. Un fallo del índice nunca
+    hace fallar la escritura: solo se registra.
+    """
+
+    def __init__(self, backend: Optional[SearchBackend] = None):
+        self.backend = backend or create_search_backend()
+
+    def search(self, org_id: str, query: str, limit: int) -> List[dict]:
+        return self.backend.search(org_id, query, limit)
+
+    def post_saved(self, post):
+        self._notify("index_post", post.organization_id, post.id, post.title, post.content)
+
+    def post_deleted(self, org_id: str, post_id):
+        self._notify("remove_post", org_id, post_id)
+
+    def comment_saved(self, org_id: str, post_id, comment_id, content: str):
+        self._notify("index_comment", org_id, post_id, comment_id, content)
+
+    def comment_deleted(self, org_id: str, post_id, comment_id):
+        self._notify("remove_comment", org_id, post_id, comment_id)
+
+    def stats(self) -> Dict[str, int]:
+        return dict(self.backend.stats(), backend=type(self.backend).__name__)
+
+    def _notify(self, method: str, *args):
+        try:
+            getattr(self.backend, method)(*args)
+        except Exception as e:
+            print(f"⚠️ Error actualizando el índice de búsqueda ({method}): {e}")
+
+
+# Instancia compartida por rutas y servicios del proceso
+search_index = SearchIndex()
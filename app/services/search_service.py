@@ -0,0 +1,41 @@
+from typing import List, Optional
+
+from app.models.post_model import LIVE_POSTS, Post
+from app.services.post_service import summary_projection
+from app.services.read_service import post_row_to_out
+from app.services.search_index import SearchIndex, search_index
+
+# Resultados por búsqueda
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 50
+
+
+class SearchService:
+    """
+    Búsqueda de posts por texto dentro de una organización (título, contenido
+    y comentarios). El backend del SearchIndex ordena los posts por
+    relevancia y aquí se leen en formato resumen con una sola consulta.
+    """
+
+    def __init__(self, index: Optional[SearchIndex] = None):
+        self.index = index or search_index
+
+    def search(self, org_id: str, query: str, limit: int = DEFAULT_SEARCH_LIMIT) -> List[dict]:
+        """Posts en formato resumen (con contadores) ordenados por relevancia, con `score` y `matched`"""
+        hits = self.index.search(org_id, query, limit)
+        if not hits:
+            return []
+
+        rows = Post._get_collection().aggregate([
+            {"$match": {"_id": {"$in": [hit["post_id"] for hit in hits]}, "organization_id": org_id, **LIVE_POSTS}},
+            {"$project": summary_projection(counters=True)},
+        ])
+        posts = {row["_id"]: row for row in rows}
+
+        results = []
+        for hit in hits:
+            row = posts.get(hit["post_id"])
+            # Un post borrado entre la búsqueda y la lectura simplemente no aparece
+            if row is not None:
+                results.append(dict(post_row_to_out(row, counters=True), score=hit["score"], matched=hit["matched"]))
+        return results
@@ -0,0 +1,185 @@
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from app.models.comment__model import Comment
+from app.models.post_model import Post
+from app.models.reaction_model import Reaction
+from app.services.post_list_cache import post_list_cache
+from app.services.search_index import search_index
+
+# Posts de la organización que se procesan por lote
+TENANT_PURGE_BATCH_SIZE = int(os.getenv("TENANT_PURGE_BATCH_SIZE", "500"))
+# Pausa entre lotes para dejar pasar el tráfico de las demás organizaciones
+TENANT_PURGE_PAUSE_SECONDS = float(os.getenv("TENANT_PURGE_PAUSE_SECONDS", "0.1"))
+# Tope de documentos borrados por segundo (0 = sin tope)
+TENANT_PURGE_MAX_DOCS_PER_SECOND = float(os.getenv("TENANT_PURGE_MAX_DOCS_PER_SECOND", "0"))
+
+# Orden en que se leen los hijos de un lote: el de sus índices por post
+# (COMMENT_INDEXES, REACTION_INDEXES). Cada tramo recorre el índice desde la
+# primera entrada que queda en vez de ordenar todos los hijos restantes
+COMMENT_PURGE_ORDER = [("post", 1), ("created_at", 1), ("_id", 1)]
+REACTION_PURGE_ORDER = [("post", 1), ("user_id", 1)]
+
+
+class TenantPurger:
+    """
+    Borrado completo de una organización dada de baja: posts, comentarios y
+    reacciones, sin pasar por delete_post ni por el CASCADE de MongoEngine.
+
+    Recorre los posts de la organización por _id en lotes de `batch_size`.
+    De cada lote borra primero los comentarios y reacciones en tramos de como
+    mucho `batch_size` documentos, en el orden de su índice por post, y al
+    final los posts del lote (delete_many con $gte/$lte y $in de sus _id),
+    así un corte nunca deja huérfanos y volver a lanzarlo continúa donde se
+    quedó.
+
+    El ritmo se controla con `pause` (segundos entre tramos) y
+    `max_docs_per_second`. Con dry_run solo cuenta lo que se borraría.
+    """
+
+    def __init__(self, batch_size: int = TENANT_PURGE_BATCH_SIZE, pause: float = TENANT_PURGE_PAUSE_SECONDS,
+                 max_docs_per_second: float = TENANT_PURGE_MAX_DOCS_PER_SECOND):
+        self.batch_size = batch_size
+        self.pause = pause
+        self.max_docs_per_second = max_docs_per_second
+        self._jobs: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+
+    def purge(self, org_id: str, dry_run: bool = False, report: Optional[dict] = None) -> dict:
+        """Purga (o cuenta, con dry_run) todo lo de la organización y devuelve el informe"""
+        report = report if report is not None else self._new_report(org_id, dry_run)
+        self._stopping.clear()
+        start = time.perf_counter()
+        report["status"] = "running"
+
+        for post_ids in self._post_batches(org_id, skip_seen=dry_run):
+            if self._stopping.is_set():
+                report["status"] = "stopped"
+                break
+            if dry_run:
+                report["posts"] += len(post_ids)
+                report["comments"] += Comment._get_collection().count_documents({"post": {"$in": post_ids}})
+                report["reactions"] += Reaction._get_collection().count_documents({"post": {"$in": post_ids}})
+                continue
+
+            # Los posts del lote solo se borran si ya no les quedan hijos: si se
+            # pide parar a medias se deja el lote entero para la próxima vez
+            drained = self._delete_children(Comment, "comments", COMMENT_PURGE_ORDER, post_ids, report) \
+                and self._delete_children(Reaction, "reactions", REACTION_PURGE_ORDER, post_ids, report)
+            if not drained:
+                report["status"] = "stopped"
+                break
+            # El rango acota el recorrido del índice; $in deja fuera los posts
+            # escritos dentro del rango después de leer el lote (sus hijos no se borraron)
+            result = Post._get_collection().delete_many({
+                "organization_id": org_id, "_id": {"$gte": post_ids[0], "$lte": post_ids[-1], "$in": post_ids},
+            })
+            report["posts"] += result.deleted_count
+            self._paced(report, result.deleted_count)
+            for post_id in post_ids:
+                search_index.post_deleted(org_id, post_id)
+
+        if report["status"] == "running":
+            report["status"] = "done"
+        if not dry_run:
+            post_list_cache.invalidate_org(org_id)
+        report["duration_ms"] = round((time.perf_counter() - start) * 1000, 3)
+        report["finished_at"] = datetime.utcnow()
+        return report
+
+    def start(self, org_id: str) -> dict:
+        """Lanza la purga en un hilo; si ya hay una en curso devuelve su progreso"""
+        self._stopping.clear()
+        with self._lock:
+            job = self._jobs.get(org_id)
+            if job is not None and job["status"] == "running":
+                return dict(job)
+            job = self._jobs[org_id] = self._new_report(org_id, dry_run=False)
+            job["status"] = "running"
+
+        def run():
+            try:
+                self.purge(org_id, report=job)
+            except Exception as e:
+                print(f"❌ Error purgando la organización {org_id}: {e}")
+                job.update(status="failed", error=str(e))
+
+        threading.Thread(target=run, name=f"tenant-purge-{org_id}", daemon=True).start()
+        return dict(job)
+
+    def status(self, org_id: str) -> Optional[dict]:
+        """Progreso de la última purga lanzada con start() para la organización"""
+        with self._lock:
+            job = self._jobs.get(org_id)
+            return dict(job) if job is not None else None
+
+    def stop(self):
+        """Pide a las purgas en curso que terminen tras el tramo actual"""
+        self._stopping.set()
+
+    def _post_batches(self, org_id: str, skip_seen: bool):
+        """
+        _id de los posts de la organización por lotes ordenados. Al borrar, el
+        siguiente lote vuelve a empezar desde el principio (lo anterior ya no
+        existe); al contar hay que saltarse lo ya visto.
+        """
+        last_id = None
+        while True:
+            query = {"organization_id": org_id}
+            if skip_seen and last_id is not None:
+                query["_id"] = {"$gt": last_id}
+            post_ids = [
+                row["_id"] for row in
+                Post._get_collection().find(query, {"_id": 1}).sort("_id", 1).limit(self.batch_size)
+            ]
+            if not post_ids:
+                return
+            yield post_ids
+            last_id = post_ids[-1]
+
+    def _delete_children(self, model, counter: str, order: List, post_ids: List, report: dict) -> bool:
+        """
+        Borra los documentos de los posts en tramos de como mucho batch_size,
+        leídos en el orden `order` de su índice, y los suma a report[counter].
+        Lo ya borrado desaparece del índice, así que cada tramo empieza en lo
+        que queda sin volver a leerlo todo. Devuelve True si no queda ninguno y
+        False si se pidió parar antes de acabar.
+        """
+        collection = model._get_collection()
+        while True:
+            if self._stopping.is_set():
+                return False
+            ids = [
+                row["_id"] for row in
+                collection.find({"post": {"$in": post_ids}}, {"_id": 1}).sort(order).limit(self.batch_size)
+            ]
+            if not ids:
+                return True
+            result = collection.delete_many({"_id": {"$in": ids}})
+            report[counter] += result.deleted_count
+            self._paced(report, result.deleted_count)
+
+    def _paced(self, report: dict, deleted: int):
+        """Espera entre tramos según `pause` y el tope de documentos por segundo"""
+        report["batches"] += 1
+        wait = self.pause
+        if self.max_docs_per_second:
+            wait = max(wait, deleted / self.max_docs_per_second)
+        if wait:
+            self._stopping.wait(wait)
+
+    @staticmethod
+    def _new_report(org_id: str, dry_run: bool) -> dict:
+        return {
+            "org_id": org_id, "dry_run": dry_run, "status": "pending",
+            "posts": 0, "comments": 0, "reactions": 0, "batches": 0,
+            "started_at": datetime.utcnow(), "finished_at": None,
+        }
+
+
+# Instancia compartida por las rutas de administración
+tenant_purger = TenantPurger()
@@ -0,0 +1,107 @@
+"""
+Benchmark de las estadísticas de reacciones de una página del feed.
+
+Compara, para N posts y un usuario:
+  - loop:  N llamadas a get_reaction_stats (lo que hacía el frontend con
+           /posts/{post_id}/reactions/stats), 2 consultas por post
+  - batch: una llamada a get_reaction_stats_batch (/reactions/stats?post_ids=),
+           una consulta $in por colección
+
+Sin --mongo-url usa mongomock: mide solo el coste de CPU, así que además se
+estima la latencia sumando --rtt-ms por cada viaje a la base de datos.
+Con --mongo-url se mide contra un MongoDB real (se crea y borra la base forum_bench).
+
+Uso:
+    python benchmarks/reaction_stats_batch.py [--posts 50] [--repeat 20] [--rtt-ms 1.0]
+    python benchmarks/reaction_stats_batch.py --mongo-url mongodb://localhost:27017
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from mongoengine import connect, disconnect  # noqa: E402
+
+from app.models.post_model import Post  # noqa: E402
+from app.models.reaction_model import Reaction  # noqa: E402
+from app.services.read_service import ForumReadService  # noqa: E402
+
+DB_NAME = "forum_bench"
+ORG_ID = "org_bench"
+USER_ID = "user_bench"
+
+
+def seed(n: int):
+    posts = [
+        Post(organization_id=ORG_ID, user_id="author", title=f"Post {i}", content="...",
+             likes_count=i % 7, dislikes_count=i % 3)
+        for i in range(n)
+    ]
+    for post in posts:
+        post.save()
+    # El usuario reaccionó a la mitad de los posts
+    for post in posts[::2]:
+        Reaction(post=post, user_id=USER_ID, reaction_type="like").save()
+    return [str(p.id) for p in posts]
+
+
+def loop_path(service, post_ids):
+    return {p: service.get_reaction_stats(p, user_id=USER_ID) for p in post_ids}
+
+
+def batch_path(service, post_ids):
+    return service.get_reaction_stats_batch(ORG_ID, post_ids, user_id=USER_ID)
+
+
+def bench(fn, service, post_ids, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(service, post_ids)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--posts", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--rtt-ms", type=float, default=1.0, help="latencia de red estimada por consulta (mongomock)")
+    parser.add_argument("--mongo-url", default=None)
+    args = parser.parse_args()
+
+    if args.mongo_url:
+        client = connect(DB_NAME, host=args.mongo_url)
+    else:
+        import mongomock
+        client = connect(DB_NAME, host="mongodb://localhost", mongo_client_class=mongomock.MongoClient)
+
+    try:
+        post_ids = seed(args.posts)
+        service = ForumReadService()
+        assert loop_path(service, post_ids) == batch_path(service, post_ids)
+
+        loop = bench(loop_path, service, post_ids, args.repeat)
+        batch = bench(batch_path, service, post_ids, args.repeat)
+        trips = {"loop": 2 * args.posts, "batch": 2}
+
+        print(f"posts por página: {args.posts} (mejor de {args.repeat})")
+        print(f"  loop  ({trips['loop']:3d} consultas): {loop * 1e3:8.2f} ms")
+        print(f"  batch ({trips['batch']:3d} consultas): {batch * 1e3:8.2f} ms")
+        if not args.mongo_url:
+            rtt = args.rtt_ms / 1e3
+            loop_est = loop + trips["loop"] * rtt
+            batch_est = batch + trips["batch"] * rtt
+            print(f"  estimado con {args.rtt_ms} ms de RTT: loop {loop_est * 1e3:.2f} ms, "
+                  f"batch {batch_est * 1e3:.2f} ms ({loop_est / batch_est:.1f}x)")
+        else:
+            print(f"  aceleración: {loop / batch:.1f}x")
+    finally:
+        client.drop_database(DB_NAME)
+        disconnect()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmark del camino de lectura de posts (no necesita MongoDB).
+
+Compara el coste por elemento de serializar una página de posts:
+  - ORM: documento Post de MongoEngine -> PostOut.from_orm -> validación del
+    response_model -> JSON (lo que hacía GET /orgs/{org_id}/forum/)
+  - raw: diccionario de as_pymongo() -> post_row_to_out -> dumps (capa de lectura)
+
+Uso:
+    python benchmarks/read_path.py [--items 1000] [--repeat 20]
+"""
+import argparse
+import json
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from bson import ObjectId
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+
+from app.core.serialization import dumps  # noqa: E402
+from app.models.post_model import Post  # noqa: E402
+from app.schemas.post_schema import PostOut  # noqa: E402
+from app.services.read_service import POST_OUT_FIELDS, post_row_to_out  # noqa: E402
+
+
+def make_rows(n: int):
+    """Documentos tal y como los devuelve pymongo para una organización"""
+    base = datetime(2024, 1, 1)
+    return [
+        {
+            "_id": ObjectId(),
+            "organization_id": "org_bench",
+            "user_id": f"user_{i % 50}",
+            "title": f"Post de prueba {i}",
+            "content": "Lorem ipsum dolor sit amet. " * 40,
+            "created_at": base + timedelta(seconds=i),
+            "updated_at": base + timedelta(seconds=i),
+            "likes_count": i % 7,
+            "dislikes_count": i % 3,
+            "comments_count": i % 11,
+        }
+        for i in range(n)
+    ]
+
+
+def orm_path(rows):
+    adapter = TypeAdapter(list[PostOut])
+    posts = [Post._from_son(dict(r)) for r in rows]
+    out = [PostOut.from_orm(p) for p in posts]
+    # FastAPI vuelve a validar contra response_model y luego codifica
+    validated = adapter.validate_python([o.model_dump() for o in out])
+    return json.dumps(jsonable_encoder(validated)).encode()
+
+
+def raw_path(rows):
+    # as_pymongo con proyección solo devuelve los campos de PostOut
+    projected = [{k: r[k] for k in ("_id",) + POST_OUT_FIELDS} for r in rows]
+    return dumps([post_row_to_out(r) for r in projected])
+
+
+def bench(fn, rows, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(rows)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rows = make_rows(args.items)
+    orm = bench(orm_path, rows, args.repeat)
+    raw = bench(raw_path, rows, args.repeat)
+
+    print(f"items por página: {args.items} (mejor de {args.repeat})")
+    print(f"  ORM  Post -> PostOut : {orm / args.items * 1e6:8.2f} µs/item")
+    print(f"  raw  dict -> bytes   : {raw / args.items * 1e6:8.2f} µs/item")
+    print(f"  aceleración          : {orm / raw:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Benchmark del arranque en frío (escalado a cero).
+
+Mide, en procesos nuevos:
+  - import: tiempo de `import app.main` (mediana y mínimo de --repeat procesos)
+  - first response: desde lanzar uvicorn hasta la primera respuesta 200 de
+    /health/live (la app acepta tráfico) y de /health/ready (Mongo precalentado)
+
+Sin --mongo-url solo se mide el modo FAST_START contra un Mongo inalcanzable:
+la app responde sin esperar a Mongo y /health/ready no llega a estar listo.
+Con --mongo-url se comparan el arranque normal y FAST_START.
+
+Con --json imprime una línea JSON para guardar y comparar entre versiones.
+
+Uso:
+    python benchmarks/startup.py [--repeat 5] [--json]
+    python benchmarks/startup.py --mongo-url mongodb://localhost:27017
+"""
+import argparse
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+# Mongo al que no se puede conectar (puerto reservado) para medir sin base de datos
+UNREACHABLE_MONGO = "mongodb://127.0.0.1:9/?serverSelectionTimeoutMS=500"
+
+IMPORT_SNIPPET = (
+    "import time; start = time.perf_counter(); import app.main; "
+    "print((time.perf_counter() - start) * 1000)"
+)
+
+
+def child_env(mongo_url: str, fast_start: bool) -> dict:
+    return dict(os.environ, MONGO_URI=mongo_url, FAST_START=str(fast_start).lower())
+
+
+def measure_imports(repeat: int, env: dict) -> dict:
+    """Tiempo de import de app.main y del proceso completo (intérprete incluido)"""
+    imports, processes = [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = subprocess.run([sys.executable, "-c", IMPORT_SNIPPET], cwd=ROOT, env=env,
+                             capture_output=True, text=True, check=True).stdout
+        processes.append((time.perf_counter() - start) * 1000)
+        imports.append(float(out.strip().splitlines()[-1]))
+    return {
+        "import_ms": round(statistics.median(imports), 1),
+        "import_min_ms": round(min(imports), 1),
+        "process_ms": round(statistics.median(processes), 1),
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_for(url: str, deadline: float, proc: subprocess.Popen):
+    """Sondea `url` hasta el primer 200; None si el proceso muere o vence el plazo"""
+    while time.perf_counter() < deadline and proc.poll() is None:
+        try:
+            with urllib.request.urlopen(url, timeout=0.5) as response:
+                if response.status == 200:
+                    return time.perf_counter()
+        except OSError:
+            pass
+        time.sleep(0.005)
+    return None
+
+
+def measure_first_response(env: dict, timeout: float, wait_ready: bool) -> dict:
+    """Lanza uvicorn y mide cuándo responde /health/live y, si se pide, /health/ready"""
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = start + timeout
+        live = wait_for(f"{base}/health/live", deadline, proc)
+        ready = wait_for(f"{base}/health/ready", deadline, proc) if live and wait_ready else None
+    finally:
+        proc.terminate()
+        proc.wait(10)
+
+    def elapsed(t):
+        return round((t - start) * 1000, 1) if t else None
+
+    return {"first_response_ms": elapsed(live), "ready_ms": elapsed(ready)}
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=30, help="segundos máximos por arranque")
+    parser.add_argument("--mongo-url", default=None)
+    parser.add_argument("--json", action="store_true", help="imprimir el resultado como una línea JSON")
+    args = parser.parse_args()
+
+    mongo_url = args.mongo_url or UNREACHABLE_MONGO
+    result = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        **measure_imports(args.repeat, child_env(mongo_url, fast_start=True)),
+        "modes": {},
+    }
+    modes = [False, True] if args.mongo_url else [True]
+    for fast_start in modes:
+        runs = [measure_first_response(child_env(mongo_url, fast_start), args.timeout, bool(args.mongo_url))
+                for _ in range(args.repeat)]
+        summary = {}
+        for key in ("first_response_ms", "ready_ms"):
+            values = [r[key] for r in runs if r[key] is not None]
+            summary[key] = round(statistics.median(values), 1) if values else None
+        result["modes"]["fast_start" if fast_start else "standard"] = summary
+
+    if args.json:
+        print(json.dumps(result))
+        return
+
+    print(f"revisión {result['revision']} · Python {result['python']} (mediana de {args.repeat})")
+    print(f"  import app.main       : {result['import_ms']:8.1f} ms (mín. {result['import_min_ms']:.1f} ms)")
+    print(f"  proceso completo      : {result['process_ms']:8.1f} ms")
+    for mode, summary in result["modes"].items():
+        first, ready = summary["first_response_ms"], summary["ready_ms"]
+        print(f"  {mode:<12} primera respuesta: {first if first is not None else '—':>8} ms"
+              + (f" · lista: {ready} ms" if ready is not None else ""))
+
+
+if __name__ == "__main__":
+    main()
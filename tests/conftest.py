@@ -27,6 +27,14 @@ def mock_mongodb_connection():
          patch('app.db.mongodb.init_db', return_value=True):
         yield mock_connect
 
+@pytest.fixture(autouse=True)
+def clear_post_list_cache():
+    """Cada test empieza con la caché del listado de posts vacía"""
+    from app.core.cache import LRUCache
+    from app.services.post_list_cache import post_list_cache
+    post_list_cache.backend = LRUCache()
+    yield post_list_cache
+
 @pytest.fixture
 def client():
     """Cliente de prueba de FastAPI"""
@@ -0,0 +1,100 @@
+"""
+Sonda para tests/test_query_count.py: cuenta los comandos que llegan a la
+base de datos al listar y serializar comentarios y reacciones, con
+MongoEngine real sobre mongomock (conftest sustituye mongoengine por un
+mock, así que se ejecuta en un proceso aparte).
+
+Cada llamada de pymongo que envía un comando (find, find_one, aggregate...)
+cuenta una vez; las que mongomock hace internamente no se cuentan.
+
+Uso:
+    python tests/query_count_probe.py 1 50   -> JSON {n: {escenario: comandos}}
+"""
+import json
+import os
+import sys
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ["FORUM_DB_BACKEND"] = "sync"
+os.environ.setdefault("MONGO_URI", "mongodb://localhost")
+
+import mongomock  # noqa: E402
+from mongoengine import connect  # noqa: E402
+
+COMMAND_METHODS = (
+    "find", "find_one", "aggregate", "count_documents", "estimated_document_count", "distinct",
+    "insert_one", "insert_many", "update_one", "update_many", "replace_one", "bulk_write",
+    "delete_one", "delete_many", "find_one_and_update", "find_one_and_delete", "find_one_and_replace",
+)
+
+commands = []
+_depth = threading.local()
+
+
+def _counted(name, method):
+    def wrapper(self, *args, **kwargs):
+        depth = getattr(_depth, "value", 0)
+        if depth == 0:
+            commands.append(f"{self.name}.{name}")
+        _depth.value = depth + 1
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            _depth.value = depth
+    return wrapper
+
+
+for _name in COMMAND_METHODS:
+    setattr(mongomock.collection.Collection, _name, _counted(_name, getattr(mongomock.collection.Collection, _name)))
+
+
+def count(fn):
+    """Ejecuta fn y devuelve (resultado, comandos enviados)"""
+    before = len(commands)
+    result = fn()
+    return result, len(commands) - before
+
+
+def scenario(n: int) -> dict:
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from app.models.comment__model import Comment
+    from app.models.post_model import Post
+    from app.models.reaction_model import Reaction
+
+    post = Post(organization_id="org_1", user_id="author", title="Post", content="...").save()
+    for i in range(n):
+        Comment(post=post, organization_id="org_1", user_name=f"user_{i}", content=f"Comentario {i}").save()
+        Reaction(post=post, user_id=f"user_{i}", reaction_type="like").save()
+    client = TestClient(app)
+
+    response, listed = count(lambda: client.get(f"/orgs/org_1/forum/posts/{post.id}/comments/?limit=100"))
+    assert response.status_code == 200 and len(response.json()) == n
+    assert all(c["post_id"] == str(post.id) for c in response.json())
+
+    comments, comment_dicts = count(lambda: [c.to_dict() for c in Comment.objects(post=post)])
+    reactions, reaction_dicts = count(lambda: [r.to_dict() for r in Reaction.objects(post=post)])
+    assert {c["post_id"] for c in comments + reactions} == {str(post.id)}
+
+    # Control: acceder a la referencia sí carga el Post (la sonda detecta el N+1)
+    _, dereferenced = count(lambda: [c.post.title for c in Comment.objects(post=post)])
+
+    post.delete()
+    return {
+        "list_comments": listed,
+        "comment_to_dict": comment_dicts,
+        "reaction_to_dict": reaction_dicts,
+        "dereference_control": dereferenced,
+    }
+
+
+def main():
+    connect("forum_query_count", host="mongodb://localhost", mongo_client_class=mongomock.MongoClient,
+            uuidRepresentation="standard")
+    print(json.dumps({n: scenario(int(n)) for n in sys.argv[1:]}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+"""
+Tests para AsyncForumReadService y la ejecución de servicios desde rutas async
+Usan una base de datos Motor simulada (los métodos de E/S son AsyncMock)
+"""
+import pytest
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
+from datetime import datetime
+from bson import ObjectId
+from fastapi import HTTPException
+
+
+def make_async_db():
+    """Base de datos con la forma de Motor: find() síncrono, E/S asíncrona"""
+    db = MagicMock()
+    for name in ("posts", "comments", "reactions"):
+        collection = getattr(db, name)
+        collection.find_one = AsyncMock(return_value=None)
+        cursor = collection.find.return_value
+        cursor.sort.return_value.limit.return_value.to_list = AsyncMock(return_value=[])
+        cursor.to_list = AsyncMock(return_value=[])
+        collection.aggregate.return_value.to_list = AsyncMock(return_value=[])
+    return db
+
+
+class TestAsyncForumReadService:
+    """Tests para la capa de lectura sobre Motor"""
+
+    @pytest.mark.asyncio
+    async def test_list_posts_next_cursor(self):
+        """Test: Se piden limit + 1 posts en orden del índice y se genera cursor"""
+        # Arrange
+        from app.services.async_read_service import AsyncForumReadService, POSTS_SORT
+        from app.core.pagination import decode_cursor
+
+        db = make_async_db()
+        rows = [
+            {"_id": ObjectId(), "title": f"Post {i}", "created_at": datetime(2024, 1, 1, 12, i)}
+            for i in range(3)
+        ]
+        page = db.posts.find.return_value.sort.return_value.limit
+        page.return_value.to_list.return_value = rows
+        service = AsyncForumReadService(db)
+
+        # Act
+        items, next_cursor = await service.list_posts("org_123", limit=2)
+
+        # Assert
+        query, projection = db.posts.find.call_args.args
+        assert query == {"organization_id": "org_123", "deleted_at": None}
+        assert "content" in projection
+        db.posts.find.return_value.sort.assert_called_once_with(POSTS_SORT)
+        page.assert_called_once_with(3)
+        assert [item["title"] for item in items] == ["Post 0", "Post 1"]
+        assert decode_cursor(next_cursor) == (datetime(2024, 1, 1, 12, 1), items[-1]["id"])
+
+    @pytest.mark.asyncio
+    async def test_list_posts_after_cursor(self):
+        """Test: El cursor se traduce a un filtro keyset sobre (created_at, _id)"""
+        # Arrange
+        from app.services.async_read_service import AsyncForumReadService
+        from app.core.pagination import encode_cursor
+
+        db = make_async_db()
+        service = AsyncForumReadService(db)
+        last_id = ObjectId()
+        created_at = datetime(2024, 1, 1)
+
+        # Act
+        await service.list_posts("org_123", after=encode_cursor(created_at, last_id))
+
+        # Assert
+        query = db.posts.find.call_args.args[0]
+        assert query["created_at"] == {"$lte": created_at}
+        assert {"_id": {"$lt": last_id}} in query["$or"]
+
+    @pytest.mark.asyncio
+    async def test_list_posts_summary_uses_aggregate(self):
+        """Test: view=summary recorta el contenido en un pipeline de agregación"""
+        # Arrange
+        from app.services.async_read_service import AsyncForumReadService
+        from app.services.post_service import SUMMARY_PROJECTION
+
+        db = make_async_db()
+        service = AsyncForumReadService(db)
+
+        # Act
+        items, next_cursor = await service.list_posts("org_123", limit=5, view="summary")
+
+        # Assert
+        pipeline = db.posts.aggregate.call_args.args[0]
+        assert pipeline[0] == {"$match": {"organization_id": "org_123", "deleted_at": None}}
+        assert pipeline[2] == {"$limit": 6}
+        assert pipeline[3] == {"$project": SUMMARY_PROJECTION}
+        db.posts.find.assert_not_called()
+        assert items == [] and next_cursor is None
+
+    @pytest.mark.asyncio
+    async def test_list_posts_invalid_field(self):
+        """Test: Un campo no proyectable lanza ValueError antes de consultar"""
+        # Arrange
+        from app.services.async_read_service import AsyncForumReadService
+
+        db = make_async_db()
+        service = AsyncForumReadService(db)
+
+        # Act & Assert
+        with pytest.raises(ValueError):
+            await service.list_posts("org_123", fields=["password"])
+        db.posts.find.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_get_post_not_found(self):
+        """Test: Post inexistente lanza excepción"""
+        # Arrange
+        from app.services.async_read_service import AsyncForumReadService
+        service = AsyncForumReadService(make_async_db())
+
+        # Act & Assert
+        with pytest.raises(Exception, match="Post not found"):
+            await service.get_post("org_123", str(ObjectId()))
+
+    @pytest.mark.asyncio
+    async def test_list_comments_post_not_found(self):
+        """Test: Comentarios de un post inexistente retorna 404"""
+        # Arrange
+        from app.services.async_read_service import AsyncForumReadService
+        db = make_async_db()
+        service = AsyncForumReadService(db)
+
+        # Act & Assert
+        with pytest.raises(HTTPException) as exc:
+            await service.list_comments(str(ObjectId()))
+        assert exc.value.status_code == 404
+        db.comments.find.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_list_comments_oldest_first_after_cursor(self):
+        """Test: Los comentarios se paginan en orden ascendente sobre (created_at, _id)"""
+        # Arrange
+        from app.services.async_read_service import AsyncForumReadService
+        from app.core.pagination import encode_cursor
+
+        db = make_async_db()
+        service = AsyncForumReadService(db)
+        post_id = ObjectId()
+        last_id = ObjectId()
+        created_at = datetime(2024, 1, 1)
+
+        # Act
+        items, next_cursor = await service.list_comments(
+            str(post_id), ensure_post=False, limit=10, after=encode_cursor(created_at, last_id)
+        )
+
+        # Assert
+        query = db.comments.find.call_args.args[0]
+        assert query["post"] == post_id
+        assert query["created_at"] == {"$gte": created_at}
+        assert {"_id": {"$gt": last_id}} in query["$or"]
+        db.comments.find.return_value.sort.assert_called_once_with([("created_at", 1), ("_id", 1)])
+        db.comments.find.return_value.sort.return_value.limit.assert_called_once_with(11)
+        assert items == [] and next_cursor is None
+
+    @pytest.mark.asyncio
+    async def test_get_reaction_stats(self):
+        """Test: Stats con la reacción del usuario"""
+        # Arrange
+        from app.services.async_read_service import AsyncForumReadService
+
+        db = make_async_db()
+        db.posts.find_one.return_value = {"_id": ObjectId(), "likes_count": 2, "dislikes_count": 1}
+        db.reactions.find_one.return_value = {"reaction_type": "dislike"}
+        service = AsyncForumReadService(db)
+        post_id = ObjectId()
+
+        # Act
+        stats = await service.get_reaction_stats(str(post_id), user_id="user_123")
+
+        # Assert
+        db.reactions.find_one.assert_awaited_once_with(
+            {"post": post_id, "user_id": "user_123"}, {"reaction_type": 1}
+        )
+        assert stats == {"likes_count": 2, "dislikes_count": 1, "user_reaction": "dislike"}
+
+    @pytest.mark.asyncio
+    async def test_get_reaction_stats_batch(self):
+        """Test: Un find $in sobre posts y otro sobre reacciones"""
+        # Arrange
+        from app.services.async_read_service import AsyncForumReadService
+
+        db = make_async_db()
+        post_id = ObjectId()
+        db.posts.find.return_value.to_list.return_value = [{"_id": post_id, "likes_count": 1}]
+        db.reactions.find.return_value.to_list.return_value = [{"post": post_id, "reaction_type": "like"}]
+        service = AsyncForumReadService(db)
+
+        # Act
+        stats = await service.get_reaction_stats_batch("org_123", [str(post_id)], user_id="user_123")
+
+        # Assert
+        assert db.posts.find.call_args.args[0] == {"_id": {"$in": [post_id]}, "organization_id": "org_123", "deleted_at": None}
+        assert db.reactions.find.call_args.args[0] == {"post": {"$in": [post_id]}, "user_id": "user_123"}
+        assert stats == {str(post_id): {"likes_count": 1, "dislikes_count": 0, "user_reaction": "like"}}
+
+
+class TestRunService:
+    """Tests para run_service"""
+
+    @pytest.mark.asyncio
+    async def test_awaits_coroutines(self):
+        """Test: Las corrutinas se esperan en el event loop"""
+        # Arrange
+        from app.core.concurrency import run_service
+        fn = AsyncMock(return_value="ok")
+
+        # Act
+        result = await run_service(fn, 1, key="value")
+
+        # Assert
+        assert result == "ok"
+        fn.assert_awaited_once_with(1, key="value")
+
+    @pytest.mark.asyncio
+    async def test_runs_sync_functions_in_threadpool(self):
+        """Test: Las funciones síncronas se ejecutan fuera del event loop"""
+        # Arrange
+        import threading
+        from app.core.concurrency import run_service
+        loop_thread = threading.get_ident()
+
+        # Act
+        worker_thread = await run_service(threading.get_ident)
+
+        # Assert
+        assert worker_thread != loop_thread
+
+    @patch('app.api.v1.forum_routes.read_service.post_version', AsyncMock(return_value=(None, 0, 0, 0)))
+    @patch('app.api.v1.forum_routes.read_service.get_post', new_callable=AsyncMock)
+    def test_route_awaits_async_backend(self, mock_get_post, client):
+        """Test: La ruta espera la corrutina del backend async"""
+        # Arrange
+        post_id = ObjectId()
+        mock_get_post.return_value = {"id": post_id, "title": "Async"}
+
+        # Act
+        response = client.get(f"/orgs/org_123/forum/{post_id}")
+
+        # Assert
+        assert response.status_code == 200
+        assert response.json() == {"id": str(post_id), "title": "Async"}
+        mock_get_post.assert_awaited_once_with("org_123", str(post_id))
@@ -0,0 +1,169 @@
+"""
+Tests para la importación de comentarios en lote
+Usan colecciones de mongomock para el insert_many y el bulk_write de contadores
+"""
+import json
+import pytest
+import mongomock
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+from pymongo.errors import BulkWriteError
+from app.core.serialization import loads_items
+
+
+@pytest.fixture
+def db():
+    """Colecciones posts y comments en memoria conectadas a comment_service"""
+    database = mongomock.MongoClient().forum_db
+    with patch('app.services.comment_service.Post', SimpleNamespace(_get_collection=lambda: database.posts)), \
+         patch('app.services.comment_service.Comment', SimpleNamespace(_get_collection=lambda: database.comments)):
+        yield database
+
+
+def add_post(db, org_id="org_1"):
+    return db.posts.insert_one({"organization_id": org_id, "comments_count": 0, "comments_version": 0}).inserted_id
+
+
+class TestLoadsItems:
+    """Tests para serialization.loads_items"""
+
+    def test_json_array(self):
+        """Test: Un array JSON se numera por posición"""
+        # Act
+        items, errors = loads_items(b'[{"a": 1}, {"a": 2}]', "application/json")
+
+        # Assert
+        assert items == [(0, {"a": 1}), (1, {"a": 2})]
+        assert errors == []
+
+    def test_ndjson_bad_line_is_item_error(self):
+        """Test: En NDJSON una línea inválida solo falla ese elemento"""
+        # Act
+        items, errors = loads_items(b'{"a": 1}\n{oops\n\n{"a": 3}\n', "application/x-ndjson")
+
+        # Assert
+        assert items == [(0, {"a": 1}), (2, {"a": 3})]
+        assert [e["index"] for e in errors] == [1]
+
+    def test_invalid_array_raises(self):
+        """Test: Un array JSON mal formado es un ValueError"""
+        # Act & Assert
+        with pytest.raises(ValueError):
+            loads_items(b'[{"a": 1},', "application/json")
+
+
+class TestBulkCreateComments:
+    """Tests para CommentService.bulk_create_comments"""
+
+    def test_mixed_batch_reports_per_item(self, db, clear_post_list_cache):
+        """Test: Inserta los válidos, informa los fallidos por índice y agrega un $inc por post"""
+        # Arrange
+        from app.services.comment_service import CommentService
+        first, second = add_post(db), add_post(db)
+        foreign = add_post(db, org_id="org_2")
+        items = list(enumerate([
+            {"post_id": str(first), "user_name": "ana", "content": "uno"},
+            {"post_id": str(first), "user_name": "ana", "content": ""},
+            {"post_id": str(second), "user_name": "luis", "content": "dos"},
+            {"post_id": str(foreign), "user_name": "eva", "content": "ajeno"},
+            {"post_id": "not-an-id", "user_name": "eva", "content": "x"},
+            {"user_name": "eva", "content": "sin post"},
+            {"post_id": str(first), "user_name": "ana", "content": "tres"},
+        ]))
+        generation = clear_post_list_cache.generation("org_1")
+
+        # Act
+        report = CommentService().bulk_create_comments("org_1", items)
+
+        # Assert
+        assert report["inserted"] == 3 and report["failed"] == 4
+        assert [e["index"] for e in report["errors"]] == [1, 3, 4, 5]
+        assert report["errors"][1]["error"] == "Post not found"
+        assert [c["index"] for c in report["created"]] == [0, 2, 6]
+        assert db.comments.count_documents({"post": first, "organization_id": "org_1"}) == 2
+        assert db.posts.find_one({"_id": first})["comments_count"] == 2
+        assert db.posts.find_one({"_id": first})["comments_version"] == 1
+        assert db.posts.find_one({"_id": second})["comments_count"] == 1
+        assert db.posts.find_one({"_id": foreign})["comments_count"] == 0
+        assert clear_post_list_cache.generation("org_1") == generation + 1
+
+    def test_fixed_post_id(self, db):
+        """Test: Con post_id todos los elementos van a ese post"""
+        # Arrange
+        from app.services.comment_service import CommentService
+        post_id = add_post(db)
+        items = [(i, {"user_name": "ana", "content": f"c{i}"}) for i in range(5)]
+
+        # Act
+        report = CommentService().bulk_create_comments("org_1", items, post_id=str(post_id))
+
+        # Assert
+        assert report["inserted"] == 5
+        assert db.posts.find_one({"_id": post_id})["comments_count"] == 5
+
+    def test_write_errors_map_to_items(self, db):
+        """Test: Los writeErrors del insert_many se informan con el índice del elemento"""
+        # Arrange
+        from app.services.comment_service import CommentService
+        post_id = add_post(db)
+        comments = Mock()
+        comments.insert_many.side_effect = BulkWriteError({"writeErrors": [{"index": 1, "errmsg": "dup"}]})
+        items = [(i, {"user_name": "ana", "content": f"c{i}"}) for i in range(3)]
+
+        # Act
+        with patch('app.services.comment_service.Comment', SimpleNamespace(_get_collection=lambda: comments)):
+            report = CommentService().bulk_create_comments("org_1", items, post_id=str(post_id))
+
+        # Assert
+        assert report["errors"] == [{"index": 1, "error": "dup"}]
+        assert [c["index"] for c in report["created"]] == [0, 2]
+        assert db.posts.find_one({"_id": post_id})["comments_count"] == 2
+
+
+class TestBulkCommentRoutes:
+    """Tests para POST .../comments/bulk"""
+
+    @patch('app.api.v1.comment_routes.comment_service.bulk_create_comments')
+    def test_ndjson_with_bad_line(self, mock_bulk, client):
+        """Test: Las líneas ilegibles se suman a los errores del servicio"""
+        # Arrange
+        mock_bulk.return_value = {"inserted": 1, "failed": 1, "created": [], "errors": [{"index": 2, "error": "x"}]}
+        post_id = "507f1f77bcf86cd799439011"
+        body = '{"user_name": "a", "content": "b"}\n{bad\n{"user_name": "a", "content": ""}\n'
+
+        # Act
+        response = client.post(
+            f"/orgs/org_1/forum/posts/{post_id}/comments/bulk",
+            content=body, headers={"Content-Type": "application/x-ndjson"},
+        )
+
+        # Assert
+        assert response.status_code == 200
+        data = response.json()
+        assert data["failed"] == 2
+        assert [e["index"] for e in data["errors"]] == [1, 2]
+        args, kwargs = mock_bulk.call_args
+        assert args[0] == "org_1" and [i for i, _ in args[1]] == [0, 2]
+        assert kwargs == {"post_id": post_id}
+
+    def test_batch_over_limit(self, client):
+        """Test: Un lote de más de MAX_BULK_COMMENTS elementos retorna 413"""
+        # Arrange
+        from app.services.comment_service import MAX_BULK_COMMENTS
+        body = json.dumps([{"user_name": "a", "content": "b"}] * (MAX_BULK_COMMENTS + 1))
+
+        # Act
+        response = client.post("/orgs/org_1/forum/comments/bulk", content=body,
+                               headers={"Content-Type": "application/json"})
+
+        # Assert
+        assert response.status_code == 413
+
+    def test_invalid_array(self, client):
+        """Test: Un array JSON mal formado retorna 400"""
+        # Act
+        response = client.post("/orgs/org_1/forum/comments/bulk", content="[{",
+                               headers={"Content-Type": "application/json"})
+
+        # Assert
+        assert response.status_code == 400
@@ -30,12 +30,19 @@ class TestCommentRoutes:
         assert data["user_name"] == mock_comment.user_name
         assert data["content"] == mock_comment.content
     
-    @patch('app.api.v1.comment_routes.comment_service.get_comments_for_post')
+    @patch('app.api.v1.comment_routes.read_service.comments_version', Mock(return_value=(0, 0)))
+    @patch('app.api.v1.comment_routes.read_service.list_comments')
     def test_get_comments_for_post(self, mock_get_comments, client, mock_comment):
         """Test: GET /orgs/{org_id}/forum/posts/{post_id}/comments/ - Obtener comentarios"""
         # Arrange
         post_id = "507f1f77bcf86cd799439011"
-        mock_get_comments.return_value = [mock_comment]
+        mock_get_comments.return_value = ([{
+            "id": mock_comment.id,
+            "post_id": mock_comment.post.id,
+            "user_name": mock_comment.user_name,
+            "content": mock_comment.content,
+            "created_at": mock_comment.created_at,
+        }], None)
         
         # Act
         response = client.get(f"/orgs/org_123/forum/posts/{post_id}/comments/")
@@ -46,13 +53,15 @@ class TestCommentRoutes:
         assert isinstance(data, list)
         assert len(data) == 1
         assert data[0]["user_name"] == mock_comment.user_name
+        assert data[0]["post_id"] == str(mock_comment.post.id)
     
-    @patch('app.api.v1.comment_routes.comment_service.get_comments_for_post')
+    @patch('app.api.v1.comment_routes.read_service.comments_version', Mock(return_value=(0, 0)))
+    @patch('app.api.v1.comment_routes.read_service.list_comments')
     def test_get_comments_empty_list(self, mock_get_comments, client):
         """Test: Obtener comentarios cuando no hay ninguno"""
         # Arrange
         post_id = "507f1f77bcf86cd799439011"
-        mock_get_comments.return_value = []
+        mock_get_comments.return_value = ([], None)
         
         # Act
         response = client.get(f"/orgs/org_123/forum/posts/{post_id}/comments/")
@@ -60,6 +69,48 @@ class TestCommentRoutes:
         # Assert
         assert response.status_code == 200
         assert response.json() == []
+        assert "x-next-cursor" not in response.headers
+    
+    @patch('app.api.v1.comment_routes.read_service.comments_version', Mock(return_value=(0, 0)))
+    @patch('app.api.v1.comment_routes.read_service.list_comments')
+    def test_get_comments_next_cursor(self, mock_get_comments, client):
+        """Test: La página siguiente se indica en X-Next-Cursor y se respetan order/limit"""
+        # Arrange
+        post_id = "507f1f77bcf86cd799439011"
+        mock_get_comments.return_value = ([], "cursor_123")
+        
+        # Act
+        response = client.get(
+            f"/orgs/org_123/forum/posts/{post_id}/comments/?limit=5&order=desc&after=abc"
+        )
+        
+        # Assert
+        assert response.status_code == 200
+        assert response.headers["x-next-cursor"] == "cursor_123"
+        mock_get_comments.assert_called_once_with(
+            post_id, ensure_post=False, limit=5, after="abc", order="desc"
+        )
+    
+    @patch('app.api.v1.comment_routes.read_service.comments_version', Mock(return_value=(0, 0)))
+    @patch('app.api.v1.comment_routes.read_service.list_comments')
+    def test_get_comments_invalid_cursor(self, mock_get_comments, client):
+        """Test: Un cursor inválido retorna 400"""
+        # Arrange
+        mock_get_comments.side_effect = ValueError("Invalid cursor")
+        
+        # Act
+        response = client.get("/orgs/org_123/forum/posts/507f1f77bcf86cd799439011/comments/?after=bad")
+        
+        # Assert
+        assert response.status_code == 400
+    
+    def test_get_comments_invalid_order(self, client):
+        """Test: Solo se aceptan order=asc y order=desc"""
+        # Act
+        response = client.get("/orgs/org_123/forum/posts/507f1f77bcf86cd799439011/comments/?order=random")
+        
+        # Assert
+        assert response.status_code == 422
     
     @patch('app.api.v1.comment_routes.comment_service.delete_comment')
     def test_delete_comment_success(self, mock_delete, client):
@@ -0,0 +1,215 @@
+"""
+Tests para el modo write-behind de contadores (CounterBuffer)
+Verifican la acumulación de deltas, el bulk_write del flush y sus métricas
+"""
+import pytest
+from unittest.mock import Mock, patch
+from bson import ObjectId
+from pymongo import UpdateOne
+
+
+@pytest.fixture
+def buffer():
+    from app.services.counter_buffer import CounterBuffer
+    return CounterBuffer(enabled=True, flush_interval=0.05)
+
+
+class TestCounterBuffer:
+    """Tests para app.services.counter_buffer"""
+
+    def test_accumulates_deltas_per_post(self, buffer):
+        """Test: Los deltas de un mismo post se suman en memoria"""
+        # Arrange
+        post_id = ObjectId()
+
+        # Act
+        buffer.add(post_id, "org_1", {"likes_count": 1, "reactions_version": 1})
+        buffer.add(post_id, "org_1", {"likes_count": 1, "dislikes_count": -1, "reactions_version": 1})
+
+        # Assert
+        assert buffer.pending(post_id) == {"likes_count": 2, "dislikes_count": -1, "reactions_version": 2}
+        assert buffer.stats()["buffered_posts"] == 1
+        assert buffer.stats()["buffered_deltas"] == 5
+
+    @patch('app.services.counter_buffer.Post')
+    def test_flush_uses_single_bulk_write(self, mock_post_class, buffer, clear_post_list_cache):
+        """Test: El flush escribe todos los posts con un bulk_write de $inc e invalida la caché"""
+        # Arrange
+        first, second = ObjectId(), ObjectId()
+        buffer.add(first, "org_1", {"likes_count": 3})
+        buffer.add(second, "org_2", {"dislikes_count": 1})
+        buffer.add(second, "org_2", {"dislikes_count": -1})
+        generation = clear_post_list_cache.generation("org_1")
+
+        # Act
+        flushed = buffer.flush()
+
+        # Assert
+        bulk_write = mock_post_class._get_collection.return_value.bulk_write
+        bulk_write.assert_called_once_with(
+            [UpdateOne({"_id": first}, {"$inc": {"likes_count": 3}})], ordered=False
+        )
+        assert flushed == 1
+        assert buffer.pending(first) == {}
+        assert clear_post_list_cache.generation("org_1") == generation + 1
+        stats = buffer.stats()
+        assert stats["flushes"] == 1 and stats["flushed_posts"] == 1
+        assert stats["buffered_posts"] == 0 and stats["last_flush_ms"] >= 0
+
+    @patch('app.services.counter_buffer.Post')
+    def test_failed_flush_keeps_deltas(self, mock_post_class, buffer):
+        """Test: Si el bulk_write falla los deltas vuelven al buffer"""
+        # Arrange
+        post_id = ObjectId()
+        buffer.add(post_id, "org_1", {"likes_count": 2})
+        mock_post_class._get_collection.return_value.bulk_write.side_effect = Exception("timeout")
+
+        # Act
+        flushed = buffer.flush()
+
+        # Assert
+        assert flushed == 0
+        assert buffer.pending(post_id) == {"likes_count": 2}
+        assert buffer.stats()["failed_flushes"] == 1
+
+    @patch('app.services.counter_buffer.Post')
+    def test_bulk_write_error_requeues_only_failed_posts(self, mock_post_class, buffer):
+        """Test: Con ordered=False las operaciones que sí se aplicaron no vuelven al buffer"""
+        # Arrange
+        from pymongo.errors import BulkWriteError
+        applied, failed = ObjectId(), ObjectId()
+        buffer.add(applied, "org_1", {"likes_count": 1})
+        buffer.add(failed, "org_1", {"dislikes_count": 2})
+        mock_post_class._get_collection.return_value.bulk_write.side_effect = BulkWriteError(
+            {"writeErrors": [{"index": 1, "code": 11600, "errmsg": "interrupted"}], "nModified": 1}
+        )
+
+        # Act
+        flushed = buffer.flush()
+
+        # Assert
+        assert flushed == 1
+        assert buffer.pending(applied) == {}
+        assert buffer.pending(failed) == {"dislikes_count": 2}
+        assert buffer.stats()["failed_flushes"] == 1
+
+    @patch('app.services.counter_buffer.Post')
+    def test_unknown_outcome_marks_posts_for_reconciliation(self, mock_post_class, buffer):
+        """Test: Tras un error de red no se reintentan los deltas (podrían contar dos veces)"""
+        # Arrange
+        from pymongo.errors import NetworkTimeout
+        post_id = ObjectId()
+        buffer.add(post_id, "org_1", {"likes_count": 1})
+        mock_post_class._get_collection.return_value.bulk_write.side_effect = NetworkTimeout("timed out")
+
+        # Act
+        buffer.flush()
+        with patch('app.services.counter_reconciliation.CounterReconciler') as mock_reconciler:
+            mock_reconciler.return_value.reconcile.return_value = {"skipped_posts": 0}
+            reconciled = buffer.reconcile_uncertain()
+
+        # Assert
+        assert buffer.pending(post_id) == {}
+        mock_reconciler.return_value.reconcile.assert_called_once_with(post_ids=[post_id])
+        assert reconciled == 1
+        assert buffer.stats()["posts_to_reconcile"] == 0
+
+    def test_delta_during_reconciliation_is_not_counted_twice(self, buffer):
+        """Test: Un delta que llega mientras se reconcilia deja el post marcado y se aplica una sola vez"""
+        # Arrange
+        import mongomock
+        from contextlib import ExitStack
+        from types import SimpleNamespace
+        from app.services.counter_reconciliation import CounterReconciler
+        db = mongomock.MongoClient().forum_db
+        post_id = db.posts.insert_one({"organization_id": "org_1", "likes_count": 1, "dislikes_count": 0,
+                                       "comments_count": 0, "reactions_version": 1}).inserted_id
+        db.reactions.insert_one({"post": post_id, "user_id": "u0", "reaction_type": "like"})
+        buffer._to_reconcile[post_id] = "org_1"
+        original_counts = CounterReconciler._actual_counts
+        toggles = []
+
+        def toggle_during_aggregation(post_ids):
+            # Toggle ya guardado (reacción y versión) cuyo +1 entra al buffer tras el flush de reconcile
+            if not toggles:
+                toggles.append(post_id)
+                db.reactions.insert_one({"post": post_id, "user_id": "late", "reaction_type": "like"})
+                buffer.add(post_id, "org_1", {"likes_count": 1})
+            return original_counts(post_ids)
+
+        collections = {
+            'app.services.counter_buffer.Post': db.posts,
+            'app.services.counter_reconciliation.Post': db.posts,
+            'app.services.counter_reconciliation.Comment': db.comments,
+            'app.services.counter_reconciliation.Reaction': db.reactions,
+        }
+        with ExitStack() as stack:
+            for target, collection in collections.items():
+                stack.enter_context(patch(target, SimpleNamespace(_get_collection=lambda c=collection: c)))
+            stack.enter_context(patch('app.services.counter_reconciliation.counter_buffer', buffer))
+            stack.enter_context(patch.object(CounterReconciler, '_actual_counts', staticmethod(toggle_during_aggregation)))
+
+            # Act
+            during = buffer.reconcile_uncertain()
+            likes_after_reconcile = db.posts.find_one({"_id": post_id})["likes_count"]
+            buffer.flush()
+            after = buffer.reconcile_uncertain()
+
+        # Assert
+        assert during == 0 and likes_after_reconcile == 1
+        assert after == 1
+        assert db.posts.find_one({"_id": post_id})["likes_count"] == 2
+        assert buffer.stats()["posts_to_reconcile"] == 0
+
+    @patch('app.services.counter_buffer.Post')
+    def test_no_server_requeues_everything(self, mock_post_class, buffer):
+        """Test: Si no había servidor no se envió nada y los deltas vuelven al buffer"""
+        # Arrange
+        from pymongo.errors import ServerSelectionTimeoutError
+        post_id = ObjectId()
+        buffer.add(post_id, "org_1", {"likes_count": 1})
+        mock_post_class._get_collection.return_value.bulk_write.side_effect = ServerSelectionTimeoutError("no servers")
+
+        # Act
+        buffer.flush()
+
+        # Assert
+        assert buffer.pending(post_id) == {"likes_count": 1}
+        assert buffer.stats()["posts_to_reconcile"] == 0
+
+    @patch('app.services.counter_buffer.Post')
+    def test_stop_flushes_pending(self, mock_post_class, buffer):
+        """Test: Al apagar se detiene el hilo y se escribe lo pendiente"""
+        # Arrange
+        buffer.flush_interval = 60
+        buffer.start()
+        buffer.add(ObjectId(), "org_1", {"likes_count": 1})
+
+        # Act
+        buffer.stop()
+
+        # Assert
+        mock_post_class._get_collection.return_value.bulk_write.assert_called_once()
+        assert buffer.stats()["buffered_posts"] == 0
+
+    def test_disabled_buffer_does_not_start(self):
+        """Test: Sin COUNTER_WRITE_BEHIND no se arranca el hilo de flush"""
+        # Arrange
+        from app.services.counter_buffer import CounterBuffer
+        buffer = CounterBuffer(enabled=False)
+
+        # Act
+        buffer.start()
+
+        # Assert
+        assert buffer._thread is None
+        assert buffer.stats()["max_staleness_seconds"] == 0
+
+    def test_counter_stats_endpoint(self, client):
+        """Test: GET /counters/stats expone las métricas del buffer"""
+        # Act
+        response = client.get("/counters/stats")
+
+        # Assert
+        assert response.status_code == 200
+        assert {"buffered_deltas", "last_flush_ms", "max_staleness_seconds"} <= set(response.json())
@@ -0,0 +1,167 @@
+"""
+Tests para la reconciliación de contadores
+Usan colecciones de mongomock para ejecutar las agregaciones y el bulk_write
+"""
+import pytest
+import mongomock
+from types import SimpleNamespace
+from unittest.mock import patch
+
+
+@pytest.fixture
+def db():
+    """Colecciones posts, comments y reactions en memoria conectadas al reconciliador"""
+    database = mongomock.MongoClient().forum_db
+    with patch('app.services.counter_reconciliation.Post', SimpleNamespace(_get_collection=lambda: database.posts)), \
+         patch('app.services.counter_reconciliation.Comment', SimpleNamespace(_get_collection=lambda: database.comments)), \
+         patch('app.services.counter_reconciliation.Reaction', SimpleNamespace(_get_collection=lambda: database.reactions)):
+        yield database
+
+
+def add_post(db, org_id="org_1", likes=0, dislikes=0, comments=0, real_likes=0, real_dislikes=0, real_comments=0):
+    """Post con contadores guardados y los comentarios/reacciones que realmente tiene"""
+    post_id = db.posts.insert_one({
+        "organization_id": org_id, "likes_count": likes, "dislikes_count": dislikes,
+        "comments_count": comments, "comments_version": 0, "reactions_version": 0,
+    }).inserted_id
+    for _ in range(real_comments):
+        db.comments.insert_one({"post": post_id, "content": "c"})
+    for i in range(real_likes):
+        db.reactions.insert_one({"post": post_id, "user_id": f"l{i}", "reaction_type": "like"})
+    for i in range(real_dislikes):
+        db.reactions.insert_one({"post": post_id, "user_id": f"d{i}", "reaction_type": "dislike"})
+    return post_id
+
+
+class TestCounterReconciler:
+    """Tests para CounterReconciler"""
+
+    def test_repairs_drift_across_batches(self, db):
+        """Test: Corrige los posts desviados de todos los lotes e informa del desvío"""
+        # Arrange
+        from app.services.counter_reconciliation import CounterReconciler
+        ok = add_post(db, likes=2, comments=1, real_likes=2, real_comments=1)
+        over = add_post(db, likes=5, real_likes=2)
+        under = add_post(db, dislikes=0, comments=1, real_dislikes=1, real_comments=4)
+
+        # Act
+        report = CounterReconciler(batch_size=2).reconcile()
+
+        # Assert
+        assert report["scanned_posts"] == 3
+        assert report["drifted_posts"] == 2 and report["repaired_posts"] == 2
+        assert report["fields"]["likes_count"] == {"posts": 1, "total_drift": 3, "max_drift": 3}
+        assert report["fields"]["comments_count"]["total_drift"] == 3
+        assert {"post_id": str(over), "drift": {"likes_count": 3}} in report["sample"]
+        assert db.posts.find_one({"_id": over})["likes_count"] == 2
+        fixed = db.posts.find_one({"_id": under})
+        assert (fixed["dislikes_count"], fixed["comments_count"]) == (1, 4)
+        assert (fixed["reactions_version"], fixed["comments_version"]) == (1, 1)
+        assert db.posts.find_one({"_id": ok})["reactions_version"] == 0
+
+    def test_dry_run_only_reports(self, db):
+        """Test: dry_run informa sin escribir"""
+        # Arrange
+        from app.services.counter_reconciliation import CounterReconciler
+        post_id = add_post(db, likes=4, real_likes=1)
+
+        # Act
+        report = CounterReconciler().reconcile(dry_run=True)
+
+        # Assert
+        assert report["drifted_posts"] == 1 and report["repaired_posts"] == 0
+        assert db.posts.find_one({"_id": post_id})["likes_count"] == 4
+
+    def test_single_org(self, db, clear_post_list_cache):
+        """Test: Con org_id solo se recorren los posts de esa organización"""
+        # Arrange
+        from app.services.counter_reconciliation import CounterReconciler
+        mine = add_post(db, org_id="org_1", comments=3)
+        other = add_post(db, org_id="org_2", comments=3)
+        generation = clear_post_list_cache.generation("org_1")
+
+        # Act
+        report = CounterReconciler().reconcile(org_id="org_1")
+
+        # Assert
+        assert report["scanned_posts"] == 1
+        assert db.posts.find_one({"_id": mine})["comments_count"] == 0
+        assert db.posts.find_one({"_id": other})["comments_count"] == 3
+        assert clear_post_list_cache.generation("org_1") == generation + 1
+
+    def test_only_given_posts(self, db):
+        """Test: Con post_ids solo se reconcilian esos posts, aunque ocupen varios lotes"""
+        # Arrange
+        from app.services.counter_reconciliation import CounterReconciler
+        chosen = [add_post(db, likes=2) for _ in range(3)]
+        other = add_post(db, likes=2)
+
+        # Act
+        report = CounterReconciler(batch_size=2).reconcile(post_ids=chosen)
+
+        # Assert
+        assert report["scanned_posts"] == 3 and report["repaired_posts"] == 3
+        assert db.posts.find_one({"_id": other})["likes_count"] == 2
+
+    def test_changed_counter_is_skipped(self, db):
+        """Test: Si el contador cambió tras leerlo no se pisa (skipped)"""
+        # Arrange
+        from app.services.counter_reconciliation import CounterReconciler
+        post_id = add_post(db, likes=3, real_likes=1)
+        reconciler = CounterReconciler()
+        original_counts = reconciler._actual_counts
+
+        def concurrent_like(post_ids):
+            # Un $inc concurrente llega entre la lectura y la corrección
+            db.posts.update_one({"_id": post_id}, {"$inc": {"likes_count": 1}})
+            return original_counts(post_ids)
+
+        # Act
+        with patch.object(reconciler, '_actual_counts', side_effect=concurrent_like):
+            report = reconciler.reconcile()
+
+        # Assert
+        assert report["skipped_posts"] == 1 and report["repaired_posts"] == 0
+        assert db.posts.find_one({"_id": post_id})["likes_count"] == 4
+
+    def test_changed_version_is_skipped(self, db):
+        """Test: Si la versión cambió tras leerla (su $inc aún no llegó) no se pisa el contador"""
+        # Arrange
+        from app.services.counter_reconciliation import CounterReconciler
+        post_id = add_post(db, likes=1, real_likes=1)
+        reconciler = CounterReconciler()
+        original_counts = reconciler._actual_counts
+
+        def concurrent_toggle(post_ids):
+            # Toggle en write-behind: la reacción y la versión ya están, el +1 sigue en memoria
+            db.reactions.insert_one({"post": post_id, "user_id": "late", "reaction_type": "like"})
+            db.posts.update_one({"_id": post_id}, {"$inc": {"reactions_version": 1}})
+            return original_counts(post_ids)
+
+        # Act
+        with patch.object(reconciler, '_actual_counts', side_effect=concurrent_toggle):
+            report = reconciler.reconcile()
+        db.posts.update_one({"_id": post_id}, {"$inc": {"likes_count": 1}})  # llega el flush
+
+        # Assert
+        assert report["drifted_posts"] == 1
+        assert report["skipped_posts"] == 1 and report["repaired_posts"] == 0
+        assert db.posts.find_one({"_id": post_id})["likes_count"] == 2
+
+
+class TestReconcileRoute:
+    """Tests para POST /admin/counters/reconcile"""
+
+    @patch('app.api.v1.admin_routes.reconciler.reconcile')
+    def test_reconcile_endpoint(self, mock_reconcile, client):
+        """Test: El endpoint devuelve el informe del reconciliador"""
+        # Arrange
+        mock_reconcile.return_value = {"scanned_posts": 10, "drifted_posts": 1}
+
+        # Act
+        response = client.post("/admin/counters/reconcile?org_id=org_1&dry_run=true")
+
+        # Assert
+        assert response.status_code == 200
+        assert response.json()["drifted_posts"] == 1
+        mock_reconcile.assert_called_once_with(org_id="org_1", dry_run=True)
@@ -0,0 +1,182 @@
+"""
+Tests para los ETags y GET condicionales
+Verifican que un If-None-Match vigente responde 304 sin la lectura completa
+"""
+import pytest
+from unittest.mock import Mock, patch
+from datetime import datetime
+from bson import ObjectId
+
+
+class TestEtagHelpers:
+    """Tests para app.core.etag"""
+
+    def test_same_state_same_etag(self):
+        """Test: El ETag solo depende de los valores de versión"""
+        # Arrange
+        from app.core.etag import make_etag
+        updated_at = datetime(2024, 1, 1)
+
+        # Act & Assert
+        assert make_etag("post", "1", updated_at, 3) == make_etag("post", "1", updated_at, 3)
+        assert make_etag("post", "1", updated_at, 3) != make_etag("post", "1", updated_at, 4)
+        assert make_etag("post", "1").startswith('"')
+
+    def test_post_etag_roundtrip(self):
+        """Test: El ETag de un post se puede traducir de vuelta a su versión"""
+        # Arrange
+        from app.core.etag import make_post_etag, parse_post_etag
+        updated_at = datetime(2024, 1, 1, 12, 30, 15, 250000)
+
+        # Act
+        version = parse_post_etag(make_post_etag(updated_at, 1, 2, 3))
+
+        # Assert
+        assert version == {"updated_at": updated_at, "likes_count": 1, "dislikes_count": 2, "comments_count": 3}
+        assert parse_post_etag('"abc"') is None
+        assert parse_post_etag("1.2.3.4") is None
+
+    def test_if_none_match_variants(self):
+        """Test: Se aceptan listas, '*' y ETags débiles"""
+        # Arrange
+        from app.core.etag import etag_matches
+        etag = '"abc"'
+
+        # Act & Assert
+        assert etag_matches('"abc"', etag)
+        assert etag_matches('"zzz", W/"abc"', etag)
+        assert etag_matches('*', etag)
+        assert not etag_matches('"zzz"', etag)
+        assert not etag_matches(None, etag)
+
+
+class TestConditionalRoutes:
+    """Tests de GET condicionales en las rutas"""
+
+    @patch('app.api.v1.forum_routes.read_service.post_version', Mock(return_value=(datetime(2024, 1, 1), 1, 0, 2)))
+    @patch('app.api.v1.forum_routes.read_service.get_post')
+    def test_get_post_not_modified(self, mock_get_post, client):
+        """Test: Un ETag vigente responde 304 sin leer el post completo"""
+        # Arrange
+        post_id = str(ObjectId())
+        mock_get_post.return_value = {"id": post_id, "title": "Test"}
+        etag = client.get(f"/orgs/org_123/forum/{post_id}").headers["ETag"]
+        mock_get_post.reset_mock()
+
+        # Act
+        response = client.get(f"/orgs/org_123/forum/{post_id}", headers={"If-None-Match": etag})
+
+        # Assert
+        assert response.status_code == 304
+        assert response.headers["ETag"] == etag
+        assert response.content == b""
+        mock_get_post.assert_not_called()
+
+    @patch('app.api.v1.forum_routes.read_service.post_version')
+    @patch('app.api.v1.forum_routes.read_service.get_post')
+    def test_get_post_modified(self, mock_get_post, mock_post_version, client):
+        """Test: Si el post cambió se devuelve 200 con el nuevo ETag"""
+        # Arrange
+        post_id = str(ObjectId())
+        mock_get_post.return_value = {"id": post_id, "title": "Test"}
+        mock_post_version.return_value = (datetime(2024, 1, 1), 0, 0, 0)
+        old_etag = client.get(f"/orgs/org_123/forum/{post_id}").headers["ETag"]
+        mock_post_version.return_value = (datetime(2024, 1, 2), 0, 0, 0)
+
+        # Act
+        response = client.get(f"/orgs/org_123/forum/{post_id}", headers={"If-None-Match": old_etag})
+
+        # Assert
+        assert response.status_code == 200
+        assert response.headers["ETag"] != old_etag
+
+    @patch('app.api.v1.comment_routes.read_service.comments_version', Mock(return_value=(3, 5)))
+    @patch('app.api.v1.comment_routes.read_service.list_comments')
+    def test_get_comments_not_modified(self, mock_list_comments, client):
+        """Test: La lista de comentarios responde 304 si no hubo cambios"""
+        # Arrange
+        post_id = "507f1f77bcf86cd799439011"
+        mock_list_comments.return_value = ([], None)
+        first = client.get(f"/orgs/org_123/forum/posts/{post_id}/comments/")
+        mock_list_comments.reset_mock()
+
+        # Act
+        response = client.get(
+            f"/orgs/org_123/forum/posts/{post_id}/comments/",
+            headers={"If-None-Match": first.headers["ETag"]}
+        )
+
+        # Assert
+        assert response.status_code == 304
+        mock_list_comments.assert_not_called()
+
+    @patch('app.api.v1.reaction_routes.read_service.reaction_stats_version', Mock(return_value=(1, 0, 1)))
+    @patch('app.api.v1.reaction_routes.read_service.get_reaction_stats')
+    def test_reaction_stats_etag_depends_on_user(self, mock_get_stats, client):
+        """Test: El ETag de las stats distingue al usuario que consulta"""
+        # Arrange
+        post_id = "507f1f77bcf86cd799439011"
+        mock_get_stats.return_value = {"likes_count": 1, "dislikes_count": 0, "user_reaction": None}
+        url = f"/orgs/org_123/forum/posts/{post_id}/reactions/stats"
+
+        # Act
+        etag_a = client.get(f"{url}?user_id=a").headers["ETag"]
+        etag_b = client.get(f"{url}?user_id=b").headers["ETag"]
+
+        # Assert
+        assert etag_a != etag_b
+
+    @patch('app.api.v1.reaction_routes.counter_buffer', Mock(enabled=True, flush_interval=1.0))
+    @patch('app.api.v1.reaction_routes.read_service.reaction_stats_version', Mock(return_value=(1, 0, 1)))
+    @patch('app.api.v1.reaction_routes.read_service.get_reaction_stats')
+    def test_reaction_stats_not_modified_keeps_staleness_header(self, mock_get_stats, client):
+        """Test: Con write-behind el 304 también indica el margen de los contadores"""
+        # Arrange
+        mock_get_stats.return_value = {"likes_count": 1, "dislikes_count": 0, "user_reaction": None}
+        url = "/orgs/org_123/forum/posts/507f1f77bcf86cd799439011/reactions/stats?user_id=a"
+        etag = client.get(url).headers["ETag"]
+
+        # Act
+        response = client.get(url, headers={"If-None-Match": etag})
+
+        # Assert
+        assert response.status_code == 304
+        assert response.headers["X-Counters-Max-Staleness"] == "1.0"
+
+
+class TestReadServiceVersions:
+    """Tests de las lecturas de versión (solo proyección)"""
+
+    @patch('app.services.read_service.Post')
+    def test_post_version_projects_only_version_fields(self, mock_post_class):
+        """Test: La versión del post solo proyecta updated_at y contadores"""
+        # Arrange
+        from app.services.read_service import ForumReadService, POST_VERSION_FIELDS
+
+        query = mock_post_class.objects.return_value
+        query.only.return_value.as_pymongo.return_value.first.return_value = {
+            '_id': ObjectId(), 'updated_at': datetime(2024, 1, 1), 'likes_count': 2
+        }
+        service = ForumReadService(Mock())
+
+        # Act
+        version = service.post_version("org_123", str(ObjectId()))
+
+        # Assert
+        query.only.assert_called_once_with(*POST_VERSION_FIELDS)
+        assert version == (datetime(2024, 1, 1), 2, 0, 0)
+
+    @patch('app.services.read_service.Post')
+    def test_comments_version_post_not_found(self, mock_post_class):
+        """Test: La versión de un post inexistente retorna 404"""
+        # Arrange
+        from fastapi import HTTPException
+        from app.services.read_service import ForumReadService
+
+        mock_post_class.objects.return_value.only.return_value.as_pymongo.return_value.first.return_value = None
+        service = ForumReadService(Mock())
+
+        # Act & Assert
+        with pytest.raises(HTTPException) as exc:
+            service.comments_version(str(ObjectId()))
+        assert exc.value.status_code == 404
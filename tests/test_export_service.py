@@ -0,0 +1,136 @@
+"""
+Tests para la exportación en streaming de una organización
+Usan colecciones de mongomock para recorrer los cursores
+"""
+import csv
+import io
+import json
+import pytest
+import mongomock
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import patch
+
+
+@pytest.fixture
+def db():
+    """Colecciones posts, comments y reactions en memoria conectadas al exportador"""
+    database = mongomock.MongoClient().forum_db
+    with patch('app.services.export_service.Post', SimpleNamespace(_get_collection=lambda: database.posts)), \
+         patch('app.services.export_service.Comment', SimpleNamespace(_get_collection=lambda: database.comments)), \
+         patch('app.services.export_service.Reaction', SimpleNamespace(_get_collection=lambda: database.reactions)):
+        yield database
+
+
+def seed(db, n_posts=5, org_id="org_1"):
+    """n_posts posts con un comentario y una reacción cada uno"""
+    start = datetime(2024, 1, 1)
+    post_ids = []
+    for i in range(n_posts):
+        post_id = db.posts.insert_one({
+            "organization_id": org_id, "user_id": "u1", "title": f"Post {i}", "content": "...",
+            "created_at": start + timedelta(minutes=i), "updated_at": start,
+        }).inserted_id
+        db.comments.insert_one({"post": post_id, "user_name": "ana", "content": f"c{i}", "created_at": start})
+        db.reactions.insert_one({"post": post_id, "user_id": "u2", "reaction_type": "like", "created_at": start})
+        post_ids.append(post_id)
+    return post_ids
+
+
+def read_ndjson(chunks):
+    return [json.loads(line) for line in b"".join(chunks).splitlines()]
+
+
+class TestForumExporter:
+    """Tests para ForumExporter"""
+
+    def test_ndjson_groups_and_checkpoints(self, db):
+        """Test: Cada grupo de posts va seguido de sus comentarios, reacciones y un checkpoint"""
+        # Arrange
+        from app.services.export_service import ForumExporter
+        post_ids = seed(db, n_posts=5)
+        seed(db, n_posts=2, org_id="org_2")
+
+        # Act
+        records = read_ndjson(ForumExporter(batch_size=2, posts_per_checkpoint=2).ndjson("org_1"))
+
+        # Assert
+        types = [r["type"] for r in records]
+        assert types[:7] == ["post", "post", "comment", "comment", "reaction", "reaction", "checkpoint"]
+        assert types.count("post") == 5 and types.count("checkpoint") == 3
+        assert [r["id"] for r in records if r["type"] == "post"] == [str(p) for p in post_ids]
+        assert records[2]["post_id"] == str(post_ids[0])
+
+    def test_resume_from_checkpoint(self, db):
+        """Test: Con after= se continúa justo después del checkpoint"""
+        # Arrange
+        from app.services.export_service import ForumExporter
+        post_ids = seed(db, n_posts=5)
+        exporter = ForumExporter(posts_per_checkpoint=2)
+        first_run = list(exporter.records("org_1"))
+        checkpoint = [r for r in first_run if r["type"] == "checkpoint"][0]["cursor"]
+
+        # Act
+        resumed = list(exporter.records("org_1", after=checkpoint))
+
+        # Assert
+        assert [r["id"] for r in resumed if r["type"] == "post"] == post_ids[2:]
+        assert sum(r["type"] == "comment" for r in resumed) == 3
+
+    def test_csv(self, db):
+        """Test: El CSV tiene cabecera fija y una fila por registro"""
+        # Arrange
+        from app.services.export_service import CSV_COLUMNS, ForumExporter
+        seed(db, n_posts=3)
+
+        # Act
+        body = b"".join(ForumExporter().csv("org_1")).decode("utf-8")
+
+        # Assert
+        rows = list(csv.DictReader(io.StringIO(body)))
+        assert list(rows[0].keys()) == CSV_COLUMNS
+        assert [r["type"] for r in rows].count("post") == 3
+        assert rows[0]["created_at"] == "2024-01-01T00:00:00"
+        assert rows[-1]["type"] == "checkpoint" and rows[-1]["cursor"]
+
+    def test_streams_lazily(self, db):
+        """Test: El primer trozo se produce sin leer la colección entera"""
+        # Arrange
+        from app.services.export_service import ForumExporter
+        seed(db, n_posts=50)
+        exporter = ForumExporter(posts_per_checkpoint=10)
+
+        # Act
+        with patch.object(exporter, '_children', wraps=exporter._children) as children:
+            records = exporter.records("org_1")
+            first_group = [next(records) for _ in range(10 + 10 + 10 + 1)]
+
+        # Assert
+        assert first_group[-1]["type"] == "checkpoint"
+        assert children.call_count == 2  # solo comentarios y reacciones del primer grupo
+
+
+class TestExportRoute:
+    """Tests para GET /admin/orgs/{org_id}/export"""
+
+    def test_export_ndjson(self, db, client):
+        """Test: El endpoint transmite el NDJSON como adjunto"""
+        # Arrange
+        seed(db, n_posts=2)
+
+        # Act
+        response = client.get("/admin/orgs/org_1/export")
+
+        # Assert
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        assert "forum-org_1.ndjson" in response.headers["content-disposition"]
+        assert len(response.text.splitlines()) == 2 + 2 + 2 + 1
+
+    def test_invalid_cursor(self, client):
+        """Test: Un cursor inválido retorna 400 antes de empezar a transmitir"""
+        # Act
+        response = client.get("/admin/orgs/org_1/export?after=not-a-cursor")
+
+        # Assert
+        assert response.status_code == 400
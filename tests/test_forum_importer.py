@@ -0,0 +1,218 @@
+"""
+Tests para la importación masiva de volcados NDJSON
+Usan colecciones de mongomock para el insert_many y la reconstrucción de contadores
+"""
+import json
+import pytest
+import mongomock
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import patch
+from bson import ObjectId
+
+
+@pytest.fixture
+def db():
+    """Colecciones en memoria conectadas al importador y al reconciliador"""
+    database = mongomock.MongoClient().forum_db
+    models = {
+        'post': SimpleNamespace(_get_collection=lambda: database.posts),
+        'comment': SimpleNamespace(_get_collection=lambda: database.comments),
+        'reaction': SimpleNamespace(_get_collection=lambda: database.reactions),
+    }
+    with patch.dict('app.services.forum_importer.MODELS', models), \
+         patch('app.services.counter_reconciliation.Post', models['post']), \
+         patch('app.services.counter_reconciliation.Comment', models['comment']), \
+         patch('app.services.counter_reconciliation.Reaction', models['reaction']), \
+         patch('app.services.comment_org_backfill.Post', models['post']), \
+         patch('app.services.comment_org_backfill.Comment', models['comment']):
+        yield database
+
+
+def write_dump(tmp_path, n_posts=3, extra=()):
+    """Volcado con n_posts posts, dos comentarios y una reacción por post"""
+    lines = []
+    for i in range(n_posts):
+        post_id = str(ObjectId())
+        lines.append({"type": "post", "id": post_id, "organization_id": "org_1", "user_id": "u1",
+                      "title": f"Post {i}", "content": "...", "created_at": "2024-01-01T00:00:00",
+                      "likes_count": 99})
+        for j in range(2):
+            lines.append({"type": "comment", "id": str(ObjectId()), "post_id": post_id,
+                          "user_name": "ana", "content": f"c{j}"})
+        lines.append({"type": "reaction", "id": str(ObjectId()), "post_id": post_id,
+                      "user_id": "u2", "reaction_type": "like"})
+    lines.append({"type": "checkpoint", "cursor": "abc"})
+    lines.extend(extra)
+    path = tmp_path / "dump.ndjson"
+    path.write_text("".join(json.dumps(line) + "\n" for line in lines))
+    return str(path)
+
+
+class TestForumImporter:
+    """Tests para ForumImporter"""
+
+    def test_imports_and_rebuilds_counters(self, db, tmp_path):
+        """Test: Inserta por lotes y recalcula los contadores con agregaciones"""
+        # Arrange
+        from app.services.forum_importer import ForumImporter
+        path = write_dump(tmp_path, n_posts=3)
+        progress = []
+
+        # Act
+        report = ForumImporter(batch_size=4, progress=progress.append).import_file(path)
+
+        # Assert
+        assert report["inserted"] == {"post": 3, "comment": 6, "reaction": 3}
+        assert report["failed"] == 0 and report["rows"] == 13
+        assert report["counters"] == {"org_1": 3}
+        post = db.posts.find_one()
+        assert (post["likes_count"], post["comments_count"]) == (1, 2)
+        assert isinstance(post["created_at"], datetime)
+        # El volcado no trae la organización de los comentarios: se copia de su post
+        assert report["comments_backfilled"] == 6
+        assert db.comments.count_documents({"organization_id": "org_1"}) == 6
+        assert progress and progress[-1]["rows_per_second"] > 0
+        assert not (tmp_path / "dump.ndjson.import-state").exists()
+
+    def test_bad_rows_are_reported(self, db, tmp_path):
+        """Test: Las filas inválidas se cuentan con su línea sin detener la carga"""
+        # Arrange
+        from app.services.forum_importer import ForumImporter
+        path = write_dump(tmp_path, n_posts=1, extra=[
+            {"type": "comment", "id": str(ObjectId()), "post_id": "legacy-42", "user_name": "a", "content": "x"},
+            {"type": "reaction", "id": str(ObjectId()), "post_id": str(ObjectId()), "user_id": "u", "reaction_type": "love"},
+            {"type": "poll"},
+        ])
+
+        # Act
+        report = ForumImporter().import_file(path)
+
+        # Assert
+        assert report["failed"] == 3
+        assert [e["line"] for e in report["errors"]] == [6, 7, 8]
+        assert "post_id" in report["errors"][0]["error"]
+        assert report["inserted"]["comment"] == 2
+
+    def test_unique_conflict_is_a_row_error(self, db, tmp_path):
+        """Test: Una segunda reacción del mismo usuario al post (otro _id) es un error, no un duplicado"""
+        # Arrange
+        from app.services.forum_importer import ForumImporter
+        db.reactions.create_index([("post", 1), ("user_id", 1)], unique=True)
+        path = write_dump(tmp_path, n_posts=1)
+        with open(path) as f:
+            post_id = json.loads(f.readline())["id"]
+        second = str(ObjectId())
+        with open(path, "a") as f:
+            f.write(json.dumps({"type": "reaction", "id": second, "post_id": post_id,
+                                "user_id": "u2", "reaction_type": "dislike"}) + "\n")
+
+        # Act
+        report = ForumImporter().import_file(path)
+
+        # Assert
+        assert report["duplicates"] == 0
+        assert report["failed"] == 1 and second in report["errors"][0]["error"]
+        assert report["inserted"]["reaction"] == 1
+
+    def test_duplicates_are_told_apart_by_key_pattern(self):
+        """Test: Con keyPattern/errmsg del servidor solo los choques de _id son duplicados"""
+        # Arrange
+        from unittest.mock import MagicMock
+        from app.services.forum_importer import _replayed_ids
+        replay, conflict, by_message = ObjectId(), ObjectId(), ObjectId()
+        collection = MagicMock()
+        errors = [
+            {"code": 11000, "keyPattern": {"_id": 1}, "op": {"_id": replay}},
+            {"code": 11000, "keyPattern": {"post": 1, "user_id": 1}, "op": {"_id": conflict}},
+            {"code": 11000, "errmsg": "E11000 duplicate key error collection: forum_db.reactions "
+                                     "index: _id_ dup key: { _id: 1 }", "op": {"_id": by_message}},
+        ]
+
+        # Act
+        replayed = _replayed_ids(collection, errors)
+
+        # Assert
+        assert replayed == {replay, by_message}
+        collection.find.assert_not_called()
+
+    def test_resume_after_crash(self, db, tmp_path):
+        """Test: Tras un fallo a mitad, --resume completa la carga sin duplicar filas"""
+        # Arrange
+        from app.services.forum_importer import ForumImporter
+        path = write_dump(tmp_path, n_posts=4)
+        comments = db.comments
+        calls = {"n": 0}
+        original_insert = comments.insert_many
+
+        def crash_on_third_batch(documents, ordered=True):
+            calls["n"] += 1
+            if calls["n"] == 3:
+                # Se escribe la mitad del lote y el proceso muere
+                original_insert(documents[:1], ordered=ordered)
+                raise RuntimeError("connection lost")
+            return original_insert(documents, ordered=ordered)
+
+        # Act
+        with patch.object(comments, 'insert_many', side_effect=crash_on_third_batch):
+            with pytest.raises(RuntimeError):
+                ForumImporter(batch_size=4).import_file(path)
+        report = ForumImporter(batch_size=4).import_file(path, resume=True)
+
+        # Assert
+        assert db.posts.count_documents({}) == 4
+        assert db.comments.count_documents({}) == 8
+        assert db.reactions.count_documents({}) == 4
+        assert report["duplicates"] >= 1
+        assert report["rows"] == 17
+        assert all(p["comments_count"] == 2 for p in db.posts.find())
+
+    def test_drop_indexes_keeps_unique(self, db):
+        """Test: Solo se quitan los índices secundarios no únicos"""
+        # Arrange
+        from app.services.forum_importer import ForumImporter
+        db.comments.create_index([("post", 1), ("created_at", 1), ("_id", 1)])
+        db.reactions.create_index([("post", 1), ("user_id", 1)], unique=True)
+
+        # Act
+        dropped = ForumImporter.drop_indexes()
+
+        # Assert
+        assert dropped == ["comments.post_1_created_at_1__id_1"]
+        assert "post_1_user_id_1" in db.reactions.index_information()
+
+    def test_rebuild_indexes_uses_sync_indexes(self, db):
+        """Test: Tras quitar los índices se recrean los declarados, como con el comando indexes"""
+        # Arrange
+        from app.db.indexes import in_sync, sync_indexes
+        from app.services.forum_importer import ForumImporter
+        sync_indexes(db)
+        ForumImporter.drop_indexes()
+
+        # Act
+        with patch('mongoengine.get_db', return_value=db):
+            reports = ForumImporter.rebuild_indexes()
+
+        # Assert
+        assert any(r["created"] for r in reports)
+        assert in_sync(sync_indexes(db, dry_run=True))
+
+
+class TestImportCommand:
+    """Tests para python -m app.cli import-forum"""
+
+    @patch('app.cli.init_db', return_value=True)
+    @patch('app.services.forum_importer.ForumImporter.import_file')
+    def test_import_command(self, mock_import, _init_db, capsys):
+        """Test: El comando pasa las opciones al importador e imprime el informe"""
+        # Arrange
+        from app.cli import main
+        mock_import.return_value = {"rows": 10, "failed": 0}
+
+        # Act
+        code = main(["import-forum", "dump.ndjson", "--batch-size", "500", "--resume", "--skip-counters"])
+
+        # Assert
+        assert code == 0
+        mock_import.assert_called_once_with("dump.ndjson", state_path=None, resume=True, rebuild_counters=False)
+        assert json.loads(capsys.readouterr().out)["rows"] == 10
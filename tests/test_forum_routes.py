@@ -4,6 +4,7 @@ Verifican los endpoints de la API para posts
 """
 import pytest
 from unittest.mock import Mock, patch
+from datetime import datetime
 
 
 class TestForumRoutes:
@@ -25,17 +26,18 @@ class TestForumRoutes:
         assert response.status_code == 200
         assert "id" in response.json()
     
-    @patch('app.api.v1.forum_routes.service.get_all_posts')
-    def test_get_all_posts(self, mock_get_all, client, mock_post):
+    @patch('app.api.v1.forum_routes.read_service.list_posts')
+    def test_get_all_posts(self, mock_list_posts, client, mock_post):
         """Test: GET /orgs/{org_id}/forum/ - Obtener todos los posts"""
         # Arrange
-        mock_post.to_mongo = Mock(return_value={
-            '_id': mock_post.id,
+        mock_list_posts.return_value = ([{
+            'id': mock_post.id,
             'organization_id': 'org_123',
+            'user_id': 'user_123',
             'title': 'Test',
-            'content': 'Content'
-        })
-        mock_get_all.return_value = [mock_post]
+            'content': 'Content',
+            'created_at': mock_post.created_at,
+        }], None)
         
         # Act
         response = client.get("/orgs/org_123/forum/")
@@ -44,19 +46,62 @@ class TestForumRoutes:
         assert response.status_code == 200
         assert isinstance(response.json(), list)
         assert len(response.json()) == 1
+        assert response.json()[0]["id"] == str(mock_post.id)
+        assert "X-Next-Cursor" not in response.headers
+        mock_list_posts.assert_called_once_with(
+            "org_123", limit=20, after=None, view="full", fields=None, counters=False
+        )
     
-    @patch('app.api.v1.forum_routes.service.get_post_by_id')
-    def test_get_post_by_id_success(self, mock_get_by_id, client, mock_post):
+    @patch('app.api.v1.forum_routes.read_service.list_posts')
+    def test_get_posts_next_cursor_header(self, mock_list_posts, client):
+        """Test: El cursor de la página siguiente se devuelve en X-Next-Cursor"""
+        # Arrange
+        mock_list_posts.return_value = ([{"id": "abc", "title": "Test"}], "next-cursor")
+        
+        # Act
+        response = client.get("/orgs/org_123/forum/?limit=1&after=prev-cursor")
+        
+        # Assert
+        assert response.status_code == 200
+        assert response.headers["X-Next-Cursor"] == "next-cursor"
+        mock_list_posts.assert_called_once_with(
+            "org_123", limit=1, after="prev-cursor", view="full", fields=None, counters=False
+        )
+    
+    @patch('app.api.v1.forum_routes.read_service.list_posts')
+    def test_get_posts_invalid_cursor(self, mock_get_page, client):
+        """Test: Un cursor inválido retorna 400"""
+        # Arrange
+        mock_get_page.side_effect = ValueError("Invalid cursor")
+        
+        # Act
+        response = client.get("/orgs/org_123/forum/?after=basura")
+        
+        # Assert
+        assert response.status_code == 400
+    
+    def test_get_posts_limit_out_of_range(self, client):
+        """Test: Un limit fuera de rango retorna error de validación"""
+        # Act
+        response = client.get("/orgs/org_123/forum/?limit=1000")
+        
+        # Assert
+        assert response.status_code == 422
+    
+    @patch('app.api.v1.forum_routes.read_service.post_version', Mock(return_value=(None, 0, 0, 0)))
+    @patch('app.api.v1.forum_routes.read_service.get_post')
+    def test_get_post_by_id_success(self, mock_get_post, client, mock_post):
         """Test: GET /orgs/{org_id}/forum/{post_id} - Obtener post por ID"""
         # Arrange
         post_id = str(mock_post.id)
-        mock_post.to_mongo = Mock(return_value={
-            '_id': mock_post.id,
+        mock_get_post.return_value = {
+            'id': mock_post.id,
             'organization_id': 'org_123',
-            'title': 'Test',
-            'content': 'Content'
-        })
-        mock_get_by_id.return_value = mock_post
+            'user_id': 'user_123',
+            'title': 'Test Post',
+            'content': 'Content',
+            'created_at': mock_post.created_at,
+        }
         
         # Act
         response = client.get(f"/orgs/org_123/forum/{post_id}")
@@ -64,14 +109,15 @@ class TestForumRoutes:
         # Assert
         assert response.status_code == 200
         data = response.json()
-        assert "id" in data
+        assert data["id"] == post_id
         assert data["title"] == "Test Post"
+        assert data["created_at"] == mock_post.created_at.isoformat()
     
-    @patch('app.api.v1.forum_routes.service.get_post_by_id')
-    def test_get_post_not_found(self, mock_get_by_id, client):
+    @patch('app.api.v1.forum_routes.read_service.post_version')
+    def test_get_post_not_found(self, mock_post_version, client):
         """Test: GET post inexistente retorna 404"""
         # Arrange
-        mock_get_by_id.side_effect = Exception("Post not found")
+        mock_post_version.side_effect = Exception("Post not found")
         
         # Act
         response = client.get("/orgs/org_123/forum/invalid_id")
@@ -107,6 +153,75 @@ class TestForumRoutes:
         data = response.json()
         assert data["title"] == "Updated Title"
     
+    @patch('app.api.v1.forum_routes.service.update_post')
+    def test_update_post_returns_etag(self, mock_update, client, mock_post):
+        """Test: PUT devuelve el ETag de la nueva versión del post"""
+        # Arrange
+        from app.core.etag import make_post_etag
+        mock_update.return_value = mock_post
+        
+        # Act
+        response = client.put(f"/orgs/org_123/forum/{mock_post.id}", json={"title": "Nuevo"})
+        
+        # Assert
+        assert response.status_code == 200
+        assert response.headers["etag"] == make_post_etag(
+            mock_post.updated_at, mock_post.likes_count, mock_post.dislikes_count, mock_post.comments_count
+        )
+        assert mock_update.call_args.kwargs["expected"] is None
+    
+    @patch('app.api.v1.forum_routes.service.update_post')
+    def test_update_post_if_match(self, mock_update, client, mock_post):
+        """Test: If-Match se traduce a la versión esperada del post"""
+        # Arrange
+        from app.core.etag import make_post_etag
+        updated_at = datetime(2024, 1, 1, 12, 0, 0)
+        mock_update.return_value = mock_post
+        
+        # Act
+        response = client.put(
+            f"/orgs/org_123/forum/{mock_post.id}",
+            json={"title": "Nuevo"},
+            headers={"If-Match": make_post_etag(updated_at, 1, 2, 3)},
+        )
+        
+        # Assert
+        assert response.status_code == 200
+        assert mock_update.call_args.kwargs["expected"] == [
+            {"updated_at": updated_at, "likes_count": 1, "dislikes_count": 2, "comments_count": 3}
+        ]
+    
+    @patch('app.api.v1.forum_routes.service.update_post')
+    def test_update_post_precondition_failed(self, mock_update, client, mock_post):
+        """Test: Si el post cambió entretanto se responde 412"""
+        # Arrange
+        from app.services.post_service import PreconditionFailed
+        mock_update.side_effect = PreconditionFailed("Post was modified by another request")
+        
+        # Act
+        response = client.put(
+            f"/orgs/org_123/forum/{mock_post.id}",
+            json={"title": "Nuevo", "expected_updated_at": "2024-01-01T12:00:00"},
+        )
+        
+        # Assert
+        assert response.status_code == 412
+        assert mock_update.call_args.kwargs["expected"] == [{"updated_at": datetime(2024, 1, 1, 12, 0, 0)}]
+    
+    @patch('app.api.v1.forum_routes.service.update_post')
+    def test_update_post_unknown_if_match(self, mock_update, client, mock_post):
+        """Test: Un If-Match que no es ETag de post no puede coincidir: 412 sin escribir"""
+        # Act
+        response = client.put(
+            f"/orgs/org_123/forum/{mock_post.id}",
+            json={"title": "Nuevo"},
+            headers={"If-Match": '"abc"'},
+        )
+        
+        # Assert
+        assert response.status_code == 412
+        mock_update.assert_not_called()
+    
     @patch('app.api.v1.forum_routes.service.delete_post')
     def test_delete_post_success(self, mock_delete, client, mock_post):
         """Test: DELETE /orgs/{org_id}/forum/{post_id} - Eliminar post"""
@@ -136,4 +251,107 @@ class TestForumRoutes:
         )
         
         # Assert
-        assert response.status_code == 422  # Validation error
\ No newline at end of file
+        assert response.status_code == 422  # Validation error    
+    @patch('app.api.v1.forum_routes.read_service.list_posts')
+    def test_get_posts_summary_view(self, mock_get_summary, client):
+        """Test: GET con view=summary devuelve extractos sin el contenido completo"""
+        # Arrange
+        from bson import ObjectId
+        from datetime import datetime
+        post_id = ObjectId()
+        mock_get_summary.return_value = ([{
+            'id': post_id,
+            'organization_id': 'org_123',
+            'user_id': 'user_123',
+            'title': 'Test',
+            'created_at': datetime(2024, 1, 1, 12, 0),
+            'excerpt': 'Cont',
+            'truncated': True,
+        }], "next-cursor")
+        
+        # Act
+        response = client.get("/orgs/org_123/forum/?view=summary")
+        
+        # Assert
+        assert response.status_code == 200
+        data = response.json()
+        assert data[0]["id"] == str(post_id)
+        assert data[0]["excerpt"] == "Cont"
+        assert data[0]["created_at"] == "2024-01-01T12:00:00"
+        assert "content" not in data[0]
+        assert response.headers["X-Next-Cursor"] == "next-cursor"
+    
+    @patch('app.api.v1.forum_routes.read_service.list_posts')
+    def test_get_posts_fields_projection(self, mock_get_projection, client):
+        """Test: GET con fields= pide solo esos campos al servicio"""
+        # Arrange
+        from bson import ObjectId
+        from datetime import datetime
+        mock_get_projection.return_value = ([{
+            'id': ObjectId(),
+            'title': 'Test',
+            'created_at': datetime(2024, 1, 1),
+        }], None)
+        
+        # Act
+        response = client.get("/orgs/org_123/forum/?fields=title, created_at")
+        
+        # Assert
+        assert response.status_code == 200
+        assert set(response.json()[0]) == {"id", "title", "created_at"}
+        mock_get_projection.assert_called_once_with(
+            "org_123", limit=20, after=None, view="full", fields=["title", "created_at"], counters=False
+        )
+    
+    @patch('app.api.v1.forum_routes.read_service.viewer_reactions')
+    @patch('app.api.v1.forum_routes.read_service.list_posts')
+    def test_get_posts_viewer_reaction(self, mock_list_posts, mock_viewer_reactions, client):
+        """Test: Con viewer_id cada post trae contadores y la reacción del usuario"""
+        # Arrange
+        from bson import ObjectId
+        liked, other = ObjectId(), ObjectId()
+        mock_list_posts.return_value = ([
+            {'id': liked, 'title': 'A', 'likes_count': 3, 'dislikes_count': 0, 'comments_count': 1},
+            {'id': other, 'title': 'B', 'likes_count': 0, 'dislikes_count': 0, 'comments_count': 0},
+        ], None)
+        mock_viewer_reactions.return_value = {liked: 'like'}
+        
+        # Act
+        response = client.get("/orgs/org_viewer/forum/?viewer_id=user_123")
+        
+        # Assert
+        assert response.status_code == 200
+        data = response.json()
+        assert data[0]["viewer_reaction"] == "like" and data[0]["likes_count"] == 3
+        assert data[1]["viewer_reaction"] is None
+        assert mock_list_posts.call_args.kwargs["counters"] is True
+        mock_viewer_reactions.assert_called_once_with([liked, other], "user_123")
+    
+    @patch('app.api.v1.forum_routes.read_service.viewer_reactions')
+    @patch('app.api.v1.forum_routes.read_service.list_posts')
+    def test_get_posts_viewer_reaction_from_cache(self, mock_list_posts, mock_viewer_reactions, client):
+        """Test: La página cacheada se comparte entre usuarios; solo cambia viewer_reaction"""
+        # Arrange
+        from bson import ObjectId
+        post_id = ObjectId()
+        mock_list_posts.return_value = ([{'id': post_id, 'title': 'A', 'likes_count': 1}], None)
+        mock_viewer_reactions.side_effect = [{post_id: 'like'}, {}]
+        
+        # Act
+        first = client.get("/orgs/org_viewer_cache/forum/?viewer_id=user_1")
+        second = client.get("/orgs/org_viewer_cache/forum/?viewer_id=user_2")
+        
+        # Assert
+        mock_list_posts.assert_called_once()
+        assert first.json()[0]["viewer_reaction"] == "like"
+        assert second.json()[0]["viewer_reaction"] is None
+        assert second.json()[0]["likes_count"] == 1
+        assert mock_viewer_reactions.call_args.args == ([post_id], "user_2")
+    
+    def test_get_posts_summary_and_fields_conflict(self, client):
+        """Test: No se puede combinar view=summary con fields"""
+        # Act
+        response = client.get("/orgs/org_123/forum/?view=summary&fields=title")
+        
+        # Assert
+        assert response.status_code == 400
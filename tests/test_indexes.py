@@ -0,0 +1,180 @@
+"""
+Tests para la sincronización de índices y las consultas calientes
+La sincronización se prueba con mongomock; explain necesita un MongoDB real
+(MONGO_TEST_URI) y se omite si no está configurado
+"""
+import os
+import pytest
+import mongomock
+from unittest.mock import patch
+from app.db.indexes import (
+    DECLARED_INDEXES,
+    HOT_QUERIES,
+    in_sync,
+    index_candidates,
+    index_spec,
+    key_signature,
+    sort_served,
+    sync_indexes,
+)
+
+
+@pytest.fixture
+def db():
+    """Base de datos en memoria sin índices"""
+    return mongomock.MongoClient().forum_db
+
+
+def by_collection(reports):
+    return {r["collection"]: r for r in reports}
+
+
+class TestIndexSpec:
+    """Tests para la traducción de las declaraciones de MongoEngine"""
+
+    def test_translates_directions_and_id(self):
+        """Test: '-' es descendente, '$' texto e 'id' es _id"""
+        # Act
+        key, options = index_spec(('organization_id', '-created_at', '-id'))
+        text_key, text_options = index_spec({'fields': ('$content',), 'default_language': 'spanish'})
+
+        # Assert
+        assert key == [("organization_id", 1), ("created_at", -1), ("_id", -1)]
+        assert options == {}
+        assert text_key == [("content", "text")]
+        assert text_options == {"default_language": "spanish"}
+
+    def test_text_signature_matches_server_format(self):
+        """Test: Mongo devuelve los índices de texto como _fts/_ftsx con weights"""
+        # Arrange
+        declared, _ = index_spec({'fields': ('organization_id', '$title', '$content')})
+        server_key = [("organization_id", 1), ("_fts", "text"), ("_ftsx", 1)]
+
+        # Act & Assert
+        assert key_signature(declared) == key_signature(server_key, {"title": 3, "content": 1})
+
+
+class TestSyncIndexes:
+    """Tests para sync_indexes"""
+
+    def test_creates_missing_indexes(self, db):
+        """Test: En una base vacía se crean todos los índices declarados"""
+        # Act
+        created = by_collection(sync_indexes(db))
+        again = sync_indexes(db, dry_run=True)
+
+        # Assert
+        assert len(created["posts"]["created"]) == len(DECLARED_INDEXES["posts"])
+        assert db.reactions.index_information()["post_1_user_id_1"]["unique"] is True
+        assert "deleted_at_1" in db.posts.index_information()
+        assert in_sync(again)
+        assert all(not r["missing"] and not r["stale"] for r in again)
+
+    def test_dry_run_changes_nothing(self, db):
+        """Test: Con dry_run solo se informa de lo que falta"""
+        # Act
+        reports = by_collection(sync_indexes(db, dry_run=True))
+
+        # Assert
+        assert len(reports["comments"]["missing"]) == len(DECLARED_INDEXES["comments"])
+        assert reports["comments"]["created"] == []
+        assert list(db.comments.index_information()) in ([], ["_id_"])
+        assert not in_sync(reports.values())
+
+    def test_stale_indexes_are_only_dropped_on_request(self, db):
+        """Test: Un índice que ya no se declara se informa y solo se borra con drop_stale"""
+        # Arrange
+        sync_indexes(db)
+        db.reactions.create_index([("reaction_type", 1)])
+
+        # Act
+        kept = by_collection(sync_indexes(db))
+        dropped = by_collection(sync_indexes(db, drop_stale=True))
+
+        # Assert
+        assert kept["reactions"]["stale"] == ["reaction_type_1"]
+        assert kept["reactions"]["dropped"] == []
+        assert dropped["reactions"]["dropped"] == ["reaction_type_1"]
+        assert "reaction_type_1" not in db.reactions.index_information()
+
+    def test_changed_options_are_recreated_with_drop_stale(self, db):
+        """Test: Un índice con la misma clave y sin unique se detecta y se recrea"""
+        # Arrange
+        db.reactions.create_index([("post", 1), ("user_id", 1)])
+
+        # Act
+        plan = by_collection(sync_indexes(db, dry_run=True))
+        sync_indexes(db, drop_stale=True)
+
+        # Assert
+        [changed] = plan["reactions"]["changed"]
+        assert changed["differences"] == {"unique": {"declared": True, "actual": None}}
+        assert not in_sync(plan.values())
+        assert db.reactions.index_information()["post_1_user_id_1"]["unique"] is True
+
+
+class TestHotQueries:
+    """Cada consulta caliente de los servicios debe poder usar un índice declarado"""
+
+    @pytest.mark.parametrize("query", HOT_QUERIES, ids=[q["name"] for q in HOT_QUERIES])
+    def test_has_index_that_serves_filter_and_sort(self, query):
+        """Test: Hay un índice elegible y que devuelve las filas ya ordenadas"""
+        # Act
+        candidates = index_candidates(query, DECLARED_INDEXES[query["collection"]])
+
+        # Assert
+        assert candidates, f"{query['name']} haría COLLSCAN"
+        assert any(sort_served(query, list(key)) for key in candidates), f"{query['name']} ordenaría en memoria"
+
+    def test_detects_missing_index(self):
+        """Test: Sin el índice por post, la consulta de comentarios no tiene candidato"""
+        # Arrange
+        query = next(q for q in HOT_QUERIES if q["name"] == "CommentService.get_comments")
+
+        # Act & Assert
+        assert index_candidates(query, ['user_name']) == []
+
+
+@pytest.mark.skipif(not os.getenv("MONGO_TEST_URI"), reason="explain necesita un MongoDB real (MONGO_TEST_URI)")
+class TestExplainHotQueries:
+    """Las consultas calientes pasan por explain sin COLLSCAN tras sincronizar los índices"""
+
+    def test_no_collection_scans(self):
+        """Test: Ninguna consulta caliente recorre la colección entera"""
+        # Arrange
+        from pymongo import MongoClient
+        from app.db.indexes import explain_hot_queries
+        client = MongoClient(os.environ["MONGO_TEST_URI"], serverSelectionTimeoutMS=5000)
+        db = client["forum_index_test"]
+        for name in DECLARED_INDEXES:
+            db.drop_collection(name)
+            db[name].insert_one({"organization_id": "org"})
+
+        try:
+            # Act
+            sync_indexes(db)
+            results = explain_hot_queries(db)
+        finally:
+            client.drop_database("forum_index_test")
+
+        # Assert
+        assert [r["name"] for r in results if r["collscan"]] == []
+
+
+class TestSyncIndexesCommand:
+    """Tests para python -m app.cli sync-indexes"""
+
+    @patch('app.cli.init_db', return_value=True)
+    def test_check_fails_when_indexes_are_missing(self, _, db, capsys):
+        """Test: --check no crea nada y sale con 1 si faltan índices"""
+        # Arrange
+        from app import cli
+
+        # Act
+        with patch('mongoengine.get_db', return_value=db):
+            status = cli.main(["sync-indexes", "--check"])
+
+        # Assert
+        assert status == 1
+        assert '"missing"' in capsys.readouterr().out
+        assert list(db.posts.index_information()) in ([], ["_id_"])
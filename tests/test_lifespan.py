@@ -0,0 +1,384 @@
+"""
+Tests para el ciclo de vida de la conexión a MongoDB
+Arranque con precalentamiento (también en segundo plano), readiness/liveness y apagado ordenado
+"""
+import threading
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from app.core.config import Settings
+
+
+@pytest.fixture
+def manager(mock_mongodb_connection):
+    """Gestor con un cliente simulado (connect está parcheado por conftest)"""
+    from app.db.mongodb import MongoConnectionManager
+    config = Settings(MONGO_URI="mongodb://db.local", MONGO_MAX_POOL_SIZE=20, MONGO_MIN_POOL_SIZE=4,
+                      MONGO_SERVER_SELECTION_TIMEOUT_MS=1500)
+    return MongoConnectionManager(config)
+
+
+@pytest.fixture
+def motor_disabled(monkeypatch):
+    """Capa de lectura con MongoEngine: sin cliente Motor que precalentar ni pingear"""
+    monkeypatch.setattr('app.main.async_backend_enabled', lambda: False)
+
+
+@pytest.fixture
+def motor_enabled(monkeypatch):
+    """Capa de lectura con Motor (el driver se simula: no hace falta tenerlo instalado)"""
+    monkeypatch.setattr('app.main.async_backend_enabled', lambda: True)
+
+
+class TestSettings:
+    """Tests para app.core.config.Settings"""
+
+    def test_reads_and_converts_environment(self, monkeypatch):
+        """Test: Los campos se leen del entorno y se convierten a su tipo"""
+        # Arrange
+        monkeypatch.setenv("MONGO_MAX_POOL_SIZE", "50")
+        monkeypatch.setenv("FAST_START", "true")
+
+        # Act
+        config = Settings.from_env()
+
+        # Assert
+        assert config.MONGO_MAX_POOL_SIZE == 50
+        assert config.FAST_START is True
+        assert config.MONGO_MIN_POOL_SIZE == 2
+
+
+class TestMongoConnectionManager:
+    """Tests para MongoConnectionManager"""
+
+    def test_start_connects_with_settings_and_warms_pool(self, manager, mock_mongodb_connection):
+        """Test: El pool y los tiempos de espera salen de Settings y se abren minPoolSize conexiones"""
+        # Act
+        manager.start()
+
+        # Assert
+        kwargs = mock_mongodb_connection.call_args.kwargs
+        assert (kwargs["maxPoolSize"], kwargs["minPoolSize"]) == (20, 4)
+        assert kwargs["serverSelectionTimeoutMS"] == 1500
+        assert kwargs["host"] == "mongodb://db.local"
+        ping = mock_mongodb_connection.return_value.admin.command
+        assert ping.call_count == 1 + 4
+        assert manager.ready
+
+    def test_start_fails_when_mongo_is_down(self, manager, mock_mongodb_connection):
+        """Test: Si el ping de arranque falla la excepción se propaga y no queda listo"""
+        # Arrange
+        mock_mongodb_connection.return_value.admin.command.side_effect = RuntimeError("No servers found")
+
+        # Act & Assert
+        with pytest.raises(RuntimeError):
+            manager.start()
+        assert manager.state == "starting"
+
+    def test_drain_and_close(self, manager, mock_mongodb_connection):
+        """Test: Al apagar deja de estar listo y cierra la conexión"""
+        # Arrange
+        manager.start()
+
+        # Act
+        manager.begin_drain()
+        draining = manager.ready
+        with patch('app.db.mongodb.disconnect') as mock_disconnect:
+            manager.close()
+
+        # Assert
+        assert draining is False
+        mock_disconnect.assert_called_once()
+        assert manager.state == "stopped" and manager.client is None
+
+
+class TestFastStart:
+    """Tests para el arranque rápido (FAST_START)"""
+
+    def test_returns_before_warm_up_and_becomes_ready(self, manager, mock_mongodb_connection):
+        """Test: start_in_background no espera a Mongo; queda listo al terminar el precalentamiento"""
+        # Arrange
+        release = threading.Event()
+        mock_mongodb_connection.return_value.admin.command.side_effect = lambda *_: release.wait(5)
+
+        # Act
+        manager.start_in_background()
+        state_before = manager.state
+        release.set()
+        manager._warm_up_thread.join(5)
+
+        # Assert
+        assert state_before == "starting"
+        assert manager.ready
+        mock_mongodb_connection.assert_called_once()
+
+    def test_retries_until_mongo_answers(self, manager, mock_mongodb_connection):
+        """Test: Si Mongo no responde al arrancar se reintenta en segundo plano"""
+        # Arrange
+        ping = mock_mongodb_connection.return_value.admin.command
+        ping.side_effect = [RuntimeError("No servers found")] + [{"ok": 1}] * 5
+        manager.WARM_UP_RETRY_SECONDS = 0.01
+
+        # Act
+        manager.start_in_background()
+        manager._warm_up_thread.join(5)
+
+        # Assert
+        assert manager.ready
+        assert ping.call_count == 1 + 1 + 4
+
+    def test_close_stops_retries(self, manager, mock_mongodb_connection):
+        """Test: Apagar durante los reintentos termina el hilo sin marcar la app como lista"""
+        # Arrange
+        mock_mongodb_connection.return_value.admin.command.side_effect = RuntimeError("No servers found")
+        manager.WARM_UP_RETRY_SECONDS = 0.01
+
+        # Act
+        manager.start_in_background()
+        manager.begin_drain()
+        with patch('app.db.mongodb.disconnect'):
+            manager.close()
+        manager._warm_up_thread.join(5)
+
+        # Assert
+        assert not manager._warm_up_thread.is_alive()
+        assert manager.state == "stopped"
+
+
+class TestHealthRoutes:
+    """Tests para /health/live y /health/ready"""
+
+    def test_liveness_does_not_touch_mongo(self, client):
+        """Test: /health/live responde aunque Mongo no esté conectado"""
+        # Act
+        response = client.get("/health/live")
+
+        # Assert
+        assert response.status_code == 200
+
+    @patch('app.main.mongo_manager')
+    def test_ready_pings_mongo(self, mock_manager, client, motor_disabled):
+        """Test: /health/ready hace ping a Mongo"""
+        # Arrange
+        mock_manager.ready = True
+        mock_manager.ping.return_value = 1.5
+
+        # Act
+        response = client.get("/health/ready")
+
+        # Assert
+        assert response.status_code == 200
+        assert response.json() == {"status": "ready", "mongo": "ok", "ping_ms": 1.5}
+
+    @patch('app.main.mongo_manager')
+    def test_not_ready_when_ping_fails(self, mock_manager, client, motor_disabled):
+        """Test: Con Mongo caído /health/ready retorna 503"""
+        # Arrange
+        mock_manager.ready = True
+        mock_manager.ping.side_effect = RuntimeError("No servers found")
+
+        # Act
+        response = client.get("/health/ready")
+
+        # Assert
+        assert response.status_code == 503
+        assert response.json()["mongo"] == "No servers found"
+
+    @patch('app.main.mongo_manager')
+    def test_not_ready_while_draining(self, mock_manager, client):
+        """Test: Durante el apagado /health/ready retorna 503 sin hacer ping"""
+        # Arrange
+        mock_manager.ready = False
+        mock_manager.state = "draining"
+
+        # Act
+        response = client.get("/health/ready")
+
+        # Assert
+        assert response.status_code == 503
+        assert response.json() == {"status": "draining"}
+        mock_manager.ping.assert_not_called()
+
+    @patch('app.main.ping_async_db')
+    @patch('app.main.mongo_manager')
+    def test_ready_pings_motor_client(self, mock_manager, mock_async_ping, client, motor_enabled):
+        """Test: Con la capa de lectura en Motor /health/ready también hace ping con Motor"""
+        # Arrange
+        mock_manager.ready = True
+        mock_manager.ping.return_value = 1.5
+        mock_async_ping.return_value = 0.75
+
+        # Act
+        response = client.get("/health/ready")
+
+        # Assert
+        assert response.status_code == 200
+        assert response.json() == {"status": "ready", "mongo": "ok", "ping_ms": 1.5, "async_ping_ms": 0.75}
+        mock_async_ping.assert_awaited_once()
+
+    @patch('app.main.ping_async_db')
+    @patch('app.main.mongo_manager')
+    def test_not_ready_when_motor_ping_fails(self, mock_manager, mock_async_ping, client, motor_enabled):
+        """Test: Si el ping de Motor falla /health/ready retorna 503 aunque MongoEngine responda"""
+        # Arrange
+        mock_manager.ready = True
+        mock_manager.ping.return_value = 1.5
+        mock_async_ping.side_effect = RuntimeError("Motor: No servers found")
+
+        # Act
+        response = client.get("/health/ready")
+
+        # Assert
+        assert response.status_code == 503
+        assert response.json() == {"status": "unavailable", "mongo": "Motor: No servers found"}
+
+
+class TestLifespan:
+    """Tests para el lifespan de app.main"""
+
+    def test_starts_and_stops_in_order(self, motor_disabled):
+        """Test: Conecta antes de aceptar peticiones y cierra Mongo lo último"""
+        # Arrange
+        from fastapi.testclient import TestClient
+        from app.main import app
+        calls = MagicMock()
+
+        # Act
+        with patch('app.main.mongo_manager', calls.mongo), \
+             patch('app.main.counter_buffer', calls.counter_buffer), \
+             patch('app.main.post_purger', calls.post_purger), \
+             patch('app.main.tenant_purger', calls.tenant_purger), \
+             patch('app.main.close_async_db', calls.close_async_db):
+            with TestClient(app) as client:
+                started = [c[0] for c in calls.mock_calls]
+                client.get("/health/live")
+
+        # Assert
+        assert started == ["mongo.start", "counter_buffer.start", "post_purger.start"]
+        stopped = [c[0] for c in calls.mock_calls][len(started):]
+        assert stopped[0] == "mongo.begin_drain"
+        assert stopped[-2:] == ["close_async_db", "mongo.close"]
+
+    def test_fast_start_does_not_wait_for_mongo(self, motor_disabled):
+        """Test: Con FAST_START el lifespan no precalienta el pool antes de aceptar peticiones"""
+        # Arrange
+        from fastapi.testclient import TestClient
+        from app.main import app
+        calls = MagicMock()
+
+        # Act
+        with patch('app.main.settings.FAST_START', True), \
+             patch('app.main.mongo_manager', calls.mongo), \
+             patch('app.main.counter_buffer', calls.counter_buffer), \
+             patch('app.main.post_purger', calls.post_purger), \
+             patch('app.main.tenant_purger', calls.tenant_purger), \
+             patch('app.main.close_async_db', calls.close_async_db):
+            with TestClient(app) as client:
+                started = [c[0] for c in calls.mock_calls]
+                response = client.get("/health/live")
+
+        # Assert
+        assert started == ["mongo.start_in_background", "counter_buffer.start", "post_purger.start"]
+        assert response.status_code == 200
+
+    def test_warms_motor_after_mongoengine(self, motor_enabled):
+        """Test: Con la capa de lectura en Motor su pool se precalienta en el mismo paso, antes de aceptar peticiones"""
+        # Arrange
+        from fastapi.testclient import TestClient
+        from app.main import app
+        calls = MagicMock()
+        calls.warm_up_async_db = AsyncMock(return_value=5)
+
+        # Act
+        with patch('app.main.mongo_manager', calls.mongo), \
+             patch('app.main.warm_up_async_db', calls.warm_up_async_db), \
+             patch('app.main.counter_buffer', calls.counter_buffer), \
+             patch('app.main.post_purger', calls.post_purger), \
+             patch('app.main.tenant_purger', calls.tenant_purger), \
+             patch('app.main.close_async_db', calls.close_async_db):
+            with TestClient(app):
+                started = [c[0] for c in calls.mock_calls]
+
+        # Assert
+        assert started == ["mongo.start", "warm_up_async_db", "counter_buffer.start", "post_purger.start"]
+
+    def test_motor_warm_up_failure_aborts_startup(self, motor_enabled):
+        """Test: Si Motor no responde al precalentar la app no arranca (como con MongoEngine)"""
+        # Arrange
+        from fastapi.testclient import TestClient
+        from app.main import app
+        calls = MagicMock()
+
+        # Act & Assert
+        with patch('app.main.mongo_manager', calls.mongo), \
+             patch('app.main.warm_up_async_db', AsyncMock(side_effect=RuntimeError("No servers found"))), \
+             patch('app.main.counter_buffer', calls.counter_buffer), \
+             patch('app.main.post_purger', calls.post_purger):
+            with pytest.raises(RuntimeError, match="No servers found"):
+                with TestClient(app):
+                    pass
+        calls.counter_buffer.start.assert_not_called()
+
+    def test_fast_start_warms_motor_in_background(self, motor_enabled):
+        """Test: Con FAST_START un fallo al precalentar Motor no impide aceptar peticiones"""
+        # Arrange
+        from fastapi.testclient import TestClient
+        from app.main import app
+        calls = MagicMock()
+        warm_up = AsyncMock(side_effect=RuntimeError("No servers found"))
+
+        # Act
+        with patch('app.main.settings.FAST_START', True), \
+             patch('app.main.mongo_manager', calls.mongo), \
+             patch('app.main.warm_up_async_db', warm_up), \
+             patch('app.main.counter_buffer', calls.counter_buffer), \
+             patch('app.main.post_purger', calls.post_purger), \
+             patch('app.main.tenant_purger', calls.tenant_purger), \
+             patch('app.main.close_async_db', calls.close_async_db):
+            with TestClient(app) as client:
+                response = client.get("/health/live")
+
+        # Assert
+        assert response.status_code == 200
+        warm_up.assert_awaited_once()
+
+
+class TestAsyncWarmUp:
+    """Tests para el precalentamiento del cliente Motor (app.db.async_mongodb)"""
+
+    @pytest.mark.asyncio
+    async def test_opens_min_pool_size_connections(self):
+        """Test: Un ping de comprobación y tantos pings simultáneos como MONGO_MIN_POOL_SIZE"""
+        # Arrange
+        from app.db import async_mongodb
+        ping = AsyncMock(return_value=1.0)
+
+        # Act
+        with patch.object(async_mongodb, 'ping_async_db', ping), \
+             patch.object(async_mongodb.settings, 'MONGO_MIN_POOL_SIZE', 4):
+            pings = await async_mongodb.warm_up_async_db()
+
+        # Assert
+        assert pings == ping.await_count == 5
+
+    @pytest.mark.asyncio
+    async def test_fails_fast_when_mongo_is_down(self):
+        """Test: Si el primer ping falla no se lanzan los demás"""
+        # Arrange
+        from app.db import async_mongodb
+        ping = AsyncMock(side_effect=RuntimeError("No servers found"))
+
+        # Act & Assert
+        with patch.object(async_mongodb, 'ping_async_db', ping), \
+             patch.object(async_mongodb.settings, 'MONGO_MIN_POOL_SIZE', 4):
+            with pytest.raises(RuntimeError):
+                await async_mongodb.warm_up_async_db()
+        assert ping.await_count == 1
+
+    def test_backend_disabled_with_sync_setting(self):
+        """Test: Con FORUM_DB_BACKEND=sync no hay cliente Motor que precalentar"""
+        # Arrange
+        from app.db import async_mongodb
+
+        # Act & Assert
+        with patch.object(async_mongodb, 'DB_BACKEND', "sync"):
+            assert async_mongodb.async_backend_enabled() is False
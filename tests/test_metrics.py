@@ -0,0 +1,115 @@
+"""
+Tests para las métricas de /metrics
+Los eventos de pymongo se construyen a mano, sin servidor de Mongo
+"""
+from datetime import timedelta
+from pymongo import monitoring
+from app.core.metrics import Registry
+
+
+class TestRegistry:
+    """Tests para el formato de texto de Prometheus"""
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test: Los buckets acumulan, y _sum/_count cuadran con lo observado"""
+        # Arrange
+        registry = Registry()
+        latency = registry.histogram("latency_seconds", "Latencia", ("route",), buckets=(0.1, 1.0))
+
+        # Act
+        for value in (0.05, 0.5, 0.5, 3.0):
+            latency.observe(value, "/a")
+        text = registry.render()
+
+        # Assert
+        assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in text
+        assert 'latency_seconds_bucket{route="/a",le="1"} 3' in text
+        assert 'latency_seconds_bucket{route="/a",le="+Inf"} 4' in text
+        assert 'latency_seconds_sum{route="/a"} 4.05' in text
+        assert 'latency_seconds_count{route="/a"} 4' in text
+        assert "# TYPE latency_seconds histogram" in text
+
+    def test_label_values_are_escaped(self):
+        """Test: Comillas, barras y saltos de línea se escapan en las etiquetas"""
+        # Arrange
+        registry = Registry()
+        errors = registry.counter("errors_total", "Errores", ("reason",))
+
+        # Act
+        errors.inc('dijo "no"\\\n')
+
+        # Assert
+        assert 'errors_total{reason="dijo \\"no\\"\\\\\\n"} 1' in registry.render()
+
+    def test_collected_gauge(self):
+        """Test: Un gauge con collect se calcula al exportar"""
+        # Arrange
+        registry = Registry()
+        registry.gauge("queue_depth", "Cola", collect=lambda: {(): 7})
+
+        # Act & Assert
+        assert "queue_depth 7" in registry.render()
+
+
+class TestMongoListeners:
+    """Tests para los listeners de pymongo registrados en app.db.mongodb"""
+
+    def test_command_latency_by_collection(self):
+        """Test: La latencia se etiqueta con la colección del comando de inicio"""
+        # Arrange
+        from app.core.metrics import mongo_failures, mongo_latency
+        from app.db.monitoring import CommandMetrics
+        listener = CommandMetrics()
+        before = mongo_latency.count("posts", "find")
+        failures = mongo_failures.value("comments", "getMore")
+
+        # Act
+        listener.started(monitoring.CommandStartedEvent({"find": "posts", "filter": {}}, "forum_db", 1, ("h", 1), 1))
+        listener.started(monitoring.CommandStartedEvent(
+            {"getMore": 123, "collection": "comments"}, "forum_db", 2, ("h", 1), 2))
+        listener.succeeded(monitoring.CommandSucceededEvent(timedelta(milliseconds=3), {"ok": 1}, "find", 1, ("h", 1), 1))
+        listener.failed(monitoring.CommandFailedEvent(timedelta(milliseconds=9), {"ok": 0}, "getMore", 2, ("h", 1), 2))
+
+        # Assert
+        assert mongo_latency.count("posts", "find") == before + 1
+        assert mongo_failures.value("comments", "getMore") == failures + 1
+        assert listener._pending == {}
+
+    def test_pool_checkout_wait_and_in_use(self):
+        """Test: Se mide la espera por conexión y cuántas hay prestadas"""
+        # Arrange
+        from app.core.metrics import mongo_checkout_wait, mongo_connections_in_use
+        from app.db.monitoring import PoolMetrics
+        listener = PoolMetrics()
+        address = ("db.local", 27017)
+        waits = mongo_checkout_wait.count("db.local:27017")
+        in_use = mongo_connections_in_use.value("db.local:27017")
+
+        # Act
+        listener.connection_check_out_started(monitoring.ConnectionCheckOutStartedEvent(address))
+        listener.connection_checked_out(monitoring.ConnectionCheckedOutEvent(address, 1))
+        during = mongo_connections_in_use.value("db.local:27017")
+        listener.connection_checked_in(monitoring.ConnectionCheckedInEvent(address, 1))
+
+        # Assert
+        assert mongo_checkout_wait.count("db.local:27017") == waits + 1
+        assert during == in_use + 1
+        assert mongo_connections_in_use.value("db.local:27017") == in_use
+
+
+class TestMetricsEndpoint:
+    """Tests para GET /metrics"""
+
+    def test_requests_labelled_by_route_template(self, client):
+        """Test: Las peticiones se agrupan por plantilla de ruta, no por URL"""
+        # Act
+        client.get("/orgs/org_1/forum/search")
+        client.get("/orgs/org_2/forum/search")
+        response = client.get("/metrics")
+
+        # Assert
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        assert 'route="/orgs/{org_id}/forum/search",status="422"}' in response.text
+        assert "org_1" not in response.text
+        assert "forum_threadpool_queue_depth" in response.text
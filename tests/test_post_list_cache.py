@@ -0,0 +1,181 @@
+"""
+Tests para la caché del listado de posts
+Verifican el backend LRU, la invalidación por organización y las rutas
+"""
+import time
+import pytest
+from unittest.mock import Mock, patch
+
+
+class TestLRUCache:
+    """Tests para el backend en memoria"""
+
+    def test_hits_and_misses(self):
+        """Test: Las lecturas cuentan hits y misses"""
+        # Arrange
+        from app.core.cache import LRUCache
+        cache = LRUCache()
+
+        # Act
+        first = cache.get("posts:org_1", "full")
+        cache.set("posts:org_1", "full", b"[]")
+        second = cache.get("posts:org_1", "full")
+
+        # Assert
+        assert first is None
+        assert second == b"[]"
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_evicts_least_recently_used(self):
+        """Test: Al superar la capacidad se expulsa la clave menos usada"""
+        # Arrange
+        from app.core.cache import LRUCache
+        cache = LRUCache(max_keys=2)
+        cache.set("a", "f", b"1")
+        cache.set("b", "f", b"2")
+        cache.get("a", "f")
+
+        # Act
+        cache.set("c", "f", b"3")
+
+        # Assert
+        assert cache.get("b", "f") is None
+        assert cache.get("a", "f") == b"1"
+        assert cache.stats()["evictions"] == 1
+        assert cache.stats()["size"] == 2
+
+    def test_expired_entries_are_misses(self):
+        """Test: Una clave caducada no se devuelve"""
+        # Arrange
+        from app.core.cache import LRUCache
+        cache = LRUCache()
+        cache.set("a", "f", b"1", ttl=0.01)
+
+        # Act
+        time.sleep(0.02)
+
+        # Assert
+        assert cache.get("a", "f") is None
+
+
+class TestPostListCache:
+    """Tests para la caché de páginas por organización"""
+
+    def test_roundtrip_with_cursor(self, clear_post_list_cache):
+        """Test: Se guarda el cuerpo junto con el cursor de la página siguiente"""
+        # Arrange
+        cache = clear_post_list_cache
+        variant = cache.variant("full", None, 20)
+
+        # Act
+        cache.set_page("org_1", variant, b'[{"id":"1"}]', "cursor-2", cache.generation("org_1"))
+
+        # Assert
+        assert cache.get_page("org_1", variant) == (b'[{"id":"1"}]', "cursor-2")
+
+    def test_counter_invalidation_keeps_other_variants(self, clear_post_list_cache):
+        """Test: Un comentario o reacción solo invalida variantes con contadores"""
+        # Arrange
+        cache = clear_post_list_cache
+        plain = cache.variant("full", None, 20)
+        counters = cache.variant("full", ["title", "likes_count"], 20)
+        viewer = cache.variant("summary", None, 20, counters=True)
+        for variant in (plain, counters, viewer):
+            cache.set_page("org_1", variant, b"[1]", None, cache.generation("org_1"))
+
+        # Act
+        cache.invalidate_counters("org_1")
+
+        # Assert
+        assert cache.get_page("org_1", plain) == (b"[1]", None)
+        assert cache.get_page("org_1", counters) is None
+        assert cache.get_page("org_1", viewer) is None
+
+    def test_org_invalidation(self, clear_post_list_cache):
+        """Test: Escribir un post invalida solo su organización"""
+        # Arrange
+        cache = clear_post_list_cache
+        variant = cache.variant("summary", None, 20)
+        cache.set_page("org_1", variant, b"[1]", None, cache.generation("org_1"))
+        cache.set_page("org_2", variant, b"[2]", None, cache.generation("org_2"))
+
+        # Act
+        cache.invalidate_org("org_1")
+
+        # Assert
+        assert cache.get_page("org_1", variant) is None
+        assert cache.get_page("org_2", variant) == (b"[2]", None)
+        assert cache.stats()["invalidations"] == 1
+
+    def test_stale_page_not_stored_after_invalidation(self, clear_post_list_cache):
+        """Test: Una página calculada antes de una escritura no se guarda"""
+        # Arrange
+        cache = clear_post_list_cache
+        variant = cache.variant("full", None, 20)
+        generation = cache.generation("org_1")
+
+        # Act
+        cache.invalidate_org("org_1")  # escritura mientras se calculaba la página
+        cache.set_page("org_1", variant, b"[viejo]", None, generation)
+
+        # Assert
+        assert cache.get_page("org_1", variant) is None
+
+
+class TestPostListCacheRoutes:
+    """Tests de la caché en las rutas"""
+
+    @patch('app.api.v1.forum_routes.read_service.list_posts')
+    def test_first_page_served_from_cache(self, mock_list_posts, client):
+        """Test: La segunda petición de la primera página no consulta Mongo"""
+        # Arrange
+        mock_list_posts.return_value = ([{"id": "1", "title": "Test"}], "cursor-2")
+
+        # Act
+        first = client.get("/orgs/org_cache/forum/")
+        second = client.get("/orgs/org_cache/forum/")
+
+        # Assert
+        assert mock_list_posts.call_count == 1
+        assert second.json() == first.json()
+        assert second.headers["X-Next-Cursor"] == "cursor-2"
+
+    @patch('app.api.v1.forum_routes.read_service.list_posts')
+    def test_next_pages_not_cached(self, mock_list_posts, client):
+        """Test: Las páginas con cursor siempre se consultan"""
+        # Arrange
+        mock_list_posts.return_value = ([], None)
+
+        # Act
+        client.get("/orgs/org_cache/forum/?after=abc")
+        client.get("/orgs/org_cache/forum/?after=abc")
+
+        # Assert
+        assert mock_list_posts.call_count == 2
+
+    @patch('app.services.post_service.Post')
+    @patch('app.api.v1.forum_routes.read_service.list_posts')
+    def test_create_post_invalidates_listing(self, mock_list_posts, mock_post_class,
+                                             client, mock_post, sample_post_data):
+        """Test: Crear un post invalida la primera página de su organización"""
+        # Arrange
+        mock_post_class.return_value = mock_post
+        mock_list_posts.return_value = ([], None)
+        client.get("/orgs/org_123/forum/")
+
+        # Act
+        client.post("/orgs/org_123/forum/", json=sample_post_data)
+        client.get("/orgs/org_123/forum/")
+
+        # Assert
+        assert mock_list_posts.call_count == 2
+
+    def test_cache_stats_endpoint(self, client):
+        """Test: GET /cache/stats expone las métricas"""
+        # Act
+        response = client.get("/cache/stats")
+
+        # Assert
+        assert response.status_code == 200
+        assert set(response.json()["post_list"]) == {"hits", "misses", "evictions", "invalidations", "size"}
@@ -0,0 +1,141 @@
+"""
+Tests para la purga en segundo plano de posts borrados
+Usan colecciones de mongomock para los delete_many por lotes
+"""
+import pytest
+import mongomock
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import patch
+
+
+@pytest.fixture
+def db():
+    """Colecciones posts, comments y reactions en memoria conectadas al purgador"""
+    database = mongomock.MongoClient().forum_db
+    with patch('app.services.post_purger.Post', SimpleNamespace(_get_collection=lambda: database.posts)), \
+         patch('app.services.post_purger.Comment', SimpleNamespace(_get_collection=lambda: database.comments)), \
+         patch('app.services.post_purger.Reaction', SimpleNamespace(_get_collection=lambda: database.reactions)):
+        yield database
+
+
+def add_post(db, comments=0, likes=0, dislikes=0, deleted=True):
+    post_id = db.posts.insert_one({
+        "organization_id": "org_1", "comments_count": comments, "likes_count": likes,
+        "dislikes_count": dislikes, "deleted_at": datetime.utcnow() if deleted else None,
+    }).inserted_id
+    for _ in range(comments):
+        db.comments.insert_one({"post": post_id, "content": "c"})
+    for i in range(likes + dislikes):
+        db.reactions.insert_one({"post": post_id, "user_id": f"u{i}", "reaction_type": "like" if i < likes else "dislike"})
+    return post_id
+
+
+class TestPostPurger:
+    """Tests para PostPurger"""
+
+    def test_purges_subtree_in_batches(self, db):
+        """Test: Borra comentarios y reacciones por lotes y al final el post"""
+        # Arrange
+        from app.services.post_purger import PostPurger
+        deleted = add_post(db, comments=25, likes=7, dislikes=3)
+        alive = add_post(db, comments=2, deleted=False)
+        purger = PostPurger(batch_size=10, pause=0)
+
+        # Act
+        purged = purger.run_once()
+
+        # Assert
+        assert purged == 1
+        assert db.posts.find_one({"_id": deleted}) is None
+        assert db.comments.count_documents({"post": deleted}) == 0
+        assert db.reactions.count_documents({"post": deleted}) == 0
+        assert db.comments.count_documents({"post": alive}) == 2
+        stats = purger.stats()
+        assert (stats["deleted_comments"], stats["deleted_reactions"]) == (25, 10)
+        assert stats["batches"] == 3 + 1  # 10 + 10 + 5 comentarios, 10 reacciones
+
+    def test_backlog_shrinks_with_each_batch(self, db):
+        """Test: El backlog se calcula con los contadores, que cada lote descuenta"""
+        # Arrange
+        from app.services.post_purger import PostPurger
+        add_post(db, comments=15, likes=4, dislikes=1)
+        add_post(db, comments=0, likes=0)
+        add_post(db, comments=5, deleted=False)
+        purger = PostPurger(batch_size=10, pause=0)
+        before = purger.backlog()
+
+        # Act
+        purger.run_once(max_batches=2)
+        during = purger.backlog()
+        purger.run_once()
+
+        # Assert
+        assert before == {"posts": 2, "comments": 15, "reactions": 5}
+        assert during == {"posts": 2, "comments": 0, "reactions": 5}
+        assert purger.backlog() == {"posts": 0, "comments": 0, "reactions": 0}
+        assert purger.stats()["current_post"] is None
+
+    def test_concurrent_purgers_count_each_document_once(self, db):
+        """Test: Dos purgadores que leen el mismo lote solo descuentan lo que cada uno borró"""
+        # Arrange
+        from app.services.post_purger import PostPurger
+        post_id = add_post(db, comments=3, likes=2, dislikes=1)
+        first, second = PostPurger(pause=0), PostPurger(pause=0)
+        read_batch = first._batch
+
+        def read_then_let_second_purge(model, post, projection=None):
+            rows = read_batch(model, post, projection)
+            if rows:
+                second._purge_batch(post)  # el otro proceso borra el mismo lote antes que este
+            return rows
+
+        first._batch = read_then_let_second_purge
+
+        # Act
+        first._purge_batch(post_id)
+        first._purge_batch(post_id)
+        counters = db.posts.find_one({"_id": post_id})
+        backlog = first.backlog()
+        first._purge_batch(post_id)
+
+        # Assert
+        assert (counters["comments_count"], counters["likes_count"], counters["dislikes_count"]) == (0, 0, 0)
+        assert backlog == {"posts": 1, "comments": 0, "reactions": 0}
+        assert db.posts.find_one({"_id": post_id}) is None
+        assert (first.stats()["deleted_comments"], first.stats()["deleted_reactions"]) == (0, 0)
+        assert (second.stats()["deleted_comments"], second.stats()["deleted_reactions"]) == (3, 3)
+
+    def test_background_thread_purges_on_wakeup(self, db):
+        """Test: El hilo purga al recibir el aviso de delete_post"""
+        # Arrange
+        from app.services.post_purger import PostPurger
+        purger = PostPurger(enabled=True, pause=0, poll_interval=60)
+        purger.start()
+        post_id = add_post(db, comments=3)
+
+        # Act
+        purger.wakeup()
+        for _ in range(200):
+            if db.posts.find_one({"_id": post_id}) is None:
+                break
+            purger._stopping.wait(0.01)
+        purger.stop()
+
+        # Assert
+        assert db.posts.find_one({"_id": post_id}) is None
+        assert purger.stats()["running"] is False
+
+    @patch('app.api.v1.admin_routes.post_purger')
+    def test_deletions_endpoint(self, mock_purger, client):
+        """Test: GET /admin/deletions devuelve backlog y métricas"""
+        # Arrange
+        mock_purger.backlog.return_value = {"posts": 1, "comments": 40, "reactions": 2}
+        mock_purger.stats.return_value = {"batches": 3}
+
+        # Act
+        response = client.get("/admin/deletions")
+
+        # Assert
+        assert response.status_code == 200
+        assert response.json() == {"backlog": {"posts": 1, "comments": 40, "reactions": 2}, "purger": {"batches": 3}}
@@ -3,8 +3,9 @@ Tests para PostService
 Verifican la lógica de negocio del servicio de posts
 """
 import pytest
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import ANY, Mock, patch, MagicMock
 from bson import ObjectId
+from datetime import datetime
 
 class TestPostService:
     """Tests para el servicio de posts"""
@@ -44,6 +45,124 @@ class TestPostService:
         assert len(result) == 1
         assert result[0] == mock_post
     
+    @patch('app.services.post_service.Post')
+    def test_get_posts_page_with_next_cursor(self, mock_post_class, mock_post):
+        """Test: Si hay más posts que el límite se devuelve un cursor"""
+        # Arrange
+        from app.services.post_service import PostService
+        from app.core.pagination import decode_cursor
+        
+        query = mock_post_class.objects.return_value
+        query.order_by.return_value.limit.return_value = [mock_post, Mock()]
+        service = PostService()
+        
+        # Act
+        posts, next_cursor = service.get_posts_page("org_123", limit=1)
+        
+        # Assert
+        mock_post_class.objects.assert_called_once_with(organization_id="org_123")
+        query.order_by.assert_called_once_with('-created_at', '-id')
+        query.order_by.return_value.limit.assert_called_once_with(2)
+        assert posts == [mock_post]
+        assert decode_cursor(next_cursor) == (mock_post.created_at, mock_post.id)
+    
+    @patch('app.services.post_service.Post')
+    def test_get_posts_page_last_page(self, mock_post_class, mock_post):
+        """Test: En la última página no se devuelve cursor"""
+        # Arrange
+        from app.services.post_service import PostService
+        
+        query = mock_post_class.objects.return_value
+        query.order_by.return_value.limit.return_value = [mock_post]
+        service = PostService()
+        
+        # Act
+        posts, next_cursor = service.get_posts_page("org_123", limit=20)
+        
+        # Assert
+        assert posts == [mock_post]
+        assert next_cursor is None
+    
+    @patch('app.services.post_service.Post')
+    def test_get_posts_page_after_cursor(self, mock_post_class, mock_post):
+        """Test: Con cursor se filtra a partir de la posición (created_at, _id)"""
+        # Arrange
+        from app.services.post_service import PostService
+        from app.core.pagination import encode_cursor
+        
+        query = mock_post_class.objects.return_value
+        filtered = query.filter.return_value.filter.return_value
+        filtered.order_by.return_value.limit.return_value = []
+        service = PostService()
+        cursor = encode_cursor(mock_post.created_at, mock_post.id)
+        
+        # Act
+        posts, next_cursor = service.get_posts_page("org_123", limit=20, after=cursor)
+        
+        # Assert
+        query.filter.assert_called_once_with(created_at__lte=mock_post.created_at)
+        assert posts == []
+        assert next_cursor is None
+    
+    def test_get_posts_page_invalid_cursor(self):
+        """Test: Un cursor inválido lanza ValueError"""
+        # Arrange
+        from app.services.post_service import PostService
+        service = PostService()
+        
+        # Act & Assert
+        with pytest.raises(ValueError, match="Invalid cursor"):
+            service.get_posts_page("org_123", after="no-es-un-cursor")
+    
+    @patch('app.services.post_service.Post')
+    def test_get_posts_projection_page(self, mock_post_class):
+        """Test: La proyección trae solo los campos pedidos como diccionarios"""
+        # Arrange
+        from app.services.post_service import PostService
+        
+        page_query = mock_post_class.objects.return_value.order_by.return_value.limit.return_value
+        row = {'_id': ObjectId(), 'title': 'Test', 'created_at': Mock()}
+        page_query.only.return_value.as_pymongo.return_value = [row]
+        service = PostService()
+        
+        # Act
+        rows, next_cursor = service.get_posts_projection_page("org_123", ["title"])
+        
+        # Assert
+        page_query.only.assert_called_once()
+        assert set(page_query.only.call_args.args) == {"title", "created_at"}
+        assert rows == [row]
+        assert next_cursor is None
+    
+    def test_get_posts_projection_page_invalid_field(self):
+        """Test: Pedir un campo no proyectable lanza ValueError"""
+        # Arrange
+        from app.services.post_service import PostService
+        service = PostService()
+        
+        # Act & Assert
+        with pytest.raises(ValueError, match="Invalid fields: password"):
+            service.get_posts_projection_page("org_123", ["title", "password"])
+    
+    @patch('app.services.post_service.Post')
+    def test_get_posts_summary_page(self, mock_post_class):
+        """Test: El resumen recorta el contenido en Mongo con $substrCP"""
+        # Arrange
+        from app.services.post_service import PostService, SUMMARY_EXCERPT_LENGTH
+        
+        page_query = mock_post_class.objects.return_value.order_by.return_value.limit.return_value
+        page_query.aggregate.return_value = iter([])
+        service = PostService()
+        
+        # Act
+        rows, next_cursor = service.get_posts_summary_page("org_123")
+        
+        # Assert
+        projection = page_query.aggregate.call_args.args[0][0]["$project"]
+        assert "content" not in projection
+        assert projection["excerpt"] == {"$substrCP": ["$content", 0, SUMMARY_EXCERPT_LENGTH]}
+        assert rows == []
+    
     @patch('app.services.post_service.Post')
     @patch('app.services.post_service.ObjectId')
     def test_get_post_by_id_success(self, mock_objectid, mock_post_class, mock_post):
@@ -99,7 +218,7 @@ class TestPostService:
         
         post_id = ObjectId()
         mock_objectid.return_value = post_id
-        mock_post_class.objects.return_value.first.return_value = mock_post
+        mock_post_class.objects.return_value.modify.return_value = mock_post
         service = PostService()
         update_data = PostUpdate(title="New Title")
         
@@ -107,8 +226,11 @@ class TestPostService:
         result = service.update_post("org_123", str(post_id), update_data)
         
         # Assert
-        mock_post.update.assert_called_with(set__title="New Title")
-        mock_post.reload.assert_called_once()
+        mock_post_class.objects.return_value.modify.assert_called_once_with(
+            new=True, set__title="New Title", set__updated_at=ANY
+        )
+        mock_post.update.assert_not_called()
+        mock_post.reload.assert_not_called()
         assert result == mock_post
     
     @patch('app.services.post_service.Post')
@@ -121,7 +243,7 @@ class TestPostService:
         
         post_id = ObjectId()
         mock_objectid.return_value = post_id
-        mock_post_class.objects.return_value.first.return_value = mock_post
+        mock_post_class.objects.return_value.modify.return_value = mock_post
         service = PostService()
         update_data = PostUpdate(content="New content")
         
@@ -129,7 +251,30 @@ class TestPostService:
         result = service.update_post("org_123", str(post_id), update_data)
         
         # Assert
-        mock_post.update.assert_called_with(set__content="New content")
+        mock_post_class.objects.return_value.modify.assert_called_once_with(
+            new=True, set__content="New content", set__updated_at=ANY
+        )
+    
+    @patch('app.services.post_service.Post')
+    @patch('app.services.post_service.ObjectId')
+    def test_update_post_precondition_failed(self, mock_objectid, mock_post_class, mock_post):
+        """Test: Si el post cambió desde la versión esperada se lanza PreconditionFailed"""
+        # Arrange
+        from app.services.post_service import PostService, PreconditionFailed
+        from app.schemas.post_schema import PostUpdate
+        
+        post_id = ObjectId()
+        mock_objectid.return_value = post_id
+        query = mock_post_class.objects.return_value
+        query.filter.return_value.modify.return_value = None
+        query.only.return_value.first.return_value = mock_post
+        service = PostService()
+        expected = [{"updated_at": datetime(2024, 1, 1)}]
+        
+        # Act & Assert
+        with pytest.raises(PreconditionFailed):
+            service.update_post("org_123", str(post_id), PostUpdate(title="New"), expected=expected)
+        query.filter.assert_called_once()
     
     @patch('app.services.post_service.Post')
     @patch('app.services.post_service.ObjectId')
@@ -140,13 +285,29 @@ class TestPostService:
         
         post_id = ObjectId()
         mock_objectid.return_value = post_id
-        mock_post_class.objects.return_value.first.return_value = mock_post
+        mock_post_class.objects.return_value.modify.return_value = mock_post
         service = PostService()
         
         # Act
-        result = service.delete_post("org_123", str(post_id))
+        with patch('app.services.post_service.post_purger') as mock_purger:
+            result = service.delete_post("org_123", str(post_id))
         
         # Assert
-        mock_post.delete.assert_called_once()
+        mock_post_class.objects.assert_called_once_with(id=post_id, organization_id="org_123")
+        modify_kwargs = mock_post_class.objects.return_value.modify.call_args.kwargs
+        assert isinstance(modify_kwargs["set__deleted_at"], datetime)
+        mock_post.delete.assert_not_called()  # los dependientes se purgan en segundo plano
+        mock_purger.wakeup.assert_called_once()
         assert result == {"message": "Post deleted successfully"}
+
+    @patch('app.services.post_service.Post')
+    def test_delete_post_not_found(self, mock_post_class):
+        """Test: Borrar un post inexistente o ya borrado lanza 'Post not found'"""
+        # Arrange
+        from app.services.post_service import PostService
+        mock_post_class.objects.return_value.modify.return_value = None
+        
+        # Act & Assert
+        with pytest.raises(Exception, match="Post not found"):
+            PostService().delete_post("org_123", str(ObjectId()))
     
\ No newline at end of file
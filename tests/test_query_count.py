@@ -0,0 +1,87 @@
+"""
+Tests de regresión del número de consultas
+Listar y serializar N comentarios o reacciones debe enviar siempre los mismos
+comandos a la base de datos (sin N+1 al serializar la referencia al post)
+"""
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from datetime import datetime
+from bson import ObjectId
+
+
+POST_ID = ObjectId()
+
+PROBE = Path(__file__).parent / "query_count_probe.py"
+
+
+def comment_rows(n):
+    """Comentarios crudos tal como los devuelve Mongo: post es un ObjectId"""
+    return [
+        {
+            "_id": ObjectId(),
+            "post": POST_ID,
+            "user_name": f"user_{i}",
+            "content": f"Comentario {i}",
+            "created_at": datetime(2024, 1, 1, 12, 0, i % 60),
+        }
+        for i in range(n)
+    ]
+
+
+@pytest.fixture(scope="module")
+def commands():
+    """
+    Comandos enviados por escenario con 1 y 100 documentos, medidos por
+    query_count_probe.py con MongoEngine real sobre mongomock
+    """
+    result = subprocess.run([sys.executable, str(PROBE), "1", "100"], capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+class TestCommentListQueryCount:
+    """El número de comandos no depende del número de comentarios"""
+
+    def test_probe_detects_lazy_dereference(self, commands):
+        """Test: Acceder a comment.post carga un Post por comentario (la medida detecta el N+1)"""
+        # Assert
+        assert commands["1"]["dereference_control"] == 1 + 1
+        assert commands["100"]["dereference_control"] == 1 + 100
+
+    def test_sync_list_constant_commands(self, commands):
+        """Test: GET de 1 o 100 comentarios envía versión del post (ETag) + página"""
+        # Assert
+        assert commands["1"]["list_comments"] == commands["100"]["list_comments"] == 2
+
+    def test_to_dict_does_not_dereference_post(self, commands):
+        """Test: Comment.to_dict y Reaction.to_dict usan el id guardado sin cargar el Post"""
+        # Assert
+        for scenario in ("comment_to_dict", "reaction_to_dict"):
+            assert commands["1"][scenario] == commands["100"][scenario] == 1
+
+    @pytest.mark.asyncio
+    async def test_async_list_constant_commands(self):
+        """Test: Con Motor cada listado son dos comandos (versión y find), sea cual sea N"""
+        # Arrange
+        from app.services.async_read_service import AsyncForumReadService
+
+        async def commands_for(n):
+            db = MagicMock()
+            db.posts.find_one = AsyncMock(return_value={"comments_count": n, "comments_version": n})
+            to_list = AsyncMock(return_value=comment_rows(n))
+            db.comments.find.return_value.sort.return_value.limit.return_value.to_list = to_list
+            service = AsyncForumReadService(db)
+
+            await service.comments_version(str(POST_ID))
+            items, _ = await service.list_comments(str(POST_ID), ensure_post=False, limit=1000)
+
+            assert all(item["post_id"] == POST_ID for item in items)
+            return db.posts.find_one.await_count + to_list.await_count
+
+        # Act & Assert
+        assert await commands_for(1) == await commands_for(500) == 2
@@ -107,7 +107,8 @@ class TestReactionRoutes:
         data = response.json()
         assert data["message"] == "Reaction updated"
     
-    @patch('app.api.v1.reaction_routes.reaction_service.get_reaction_stats')
+    @patch('app.api.v1.reaction_routes.read_service.reaction_stats_version', Mock(return_value=(5, 2, 7)))
+    @patch('app.api.v1.reaction_routes.read_service.get_reaction_stats')
     def test_get_reaction_stats(self, mock_get_stats, client):
         """Test: GET /orgs/{org_id}/forum/posts/{post_id}/reactions/stats"""
         # Arrange
@@ -130,7 +131,8 @@ class TestReactionRoutes:
         assert data["dislikes_count"] == 2
         assert data["user_reaction"] == "like"
     
-    @patch('app.api.v1.reaction_routes.reaction_service.get_reaction_stats')
+    @patch('app.api.v1.reaction_routes.read_service.reaction_stats_version', Mock(return_value=(5, 2, 7)))
+    @patch('app.api.v1.reaction_routes.read_service.get_reaction_stats')
     def test_get_reaction_stats_no_user(self, mock_get_stats, client):
         """Test: Obtener stats sin especificar usuario"""
         # Arrange
@@ -202,4 +204,51 @@ class TestReactionRoutes:
         )
         
         # Assert
-        assert response.status_code == 422  # Validation error
\ No newline at end of file
+        assert response.status_code == 422  # Validation error
+
+
+class TestReactionStatsBatchRoute:
+    """Tests para GET /orgs/{org_id}/forum/reactions/stats"""
+
+    @patch('app.api.v1.reaction_routes.read_service.get_reaction_stats_batch')
+    def test_batch_stats(self, mock_batch, client):
+        """Test: Devuelve las estadísticas de todos los posts pedidos"""
+        # Arrange
+        mock_batch.return_value = {
+            "507f1f77bcf86cd799439011": {"likes_count": 2, "dislikes_count": 0, "user_reaction": "like"}
+        }
+
+        # Act
+        response = client.get(
+            "/orgs/org_123/forum/reactions/stats"
+            "?post_ids=507f1f77bcf86cd799439011,507f1f77bcf86cd799439012&user_id=user_123"
+        )
+
+        # Assert
+        assert response.status_code == 200
+        assert response.json()["507f1f77bcf86cd799439011"]["user_reaction"] == "like"
+        mock_batch.assert_called_once_with(
+            "org_123", ["507f1f77bcf86cd799439011", "507f1f77bcf86cd799439012"], user_id="user_123"
+        )
+
+    @patch('app.api.v1.reaction_routes.read_service.get_reaction_stats_batch')
+    def test_batch_stats_too_many_ids(self, mock_batch, client):
+        """Test: Más post_ids que el máximo permitido retorna 400"""
+        # Arrange
+        from app.services.read_service import MAX_STATS_BATCH
+        post_ids = ",".join("507f1f77bcf86cd7994390%02d" % (i % 100) for i in range(MAX_STATS_BATCH + 1))
+
+        # Act
+        response = client.get(f"/orgs/org_123/forum/reactions/stats?post_ids={post_ids}")
+
+        # Assert
+        assert response.status_code == 400
+        mock_batch.assert_not_called()
+
+    def test_batch_stats_requires_post_ids(self, client):
+        """Test: post_ids vacío retorna 400"""
+        # Act
+        response = client.get("/orgs/org_123/forum/reactions/stats?post_ids=,")
+
+        # Assert
+        assert response.status_code == 400
@@ -0,0 +1,272 @@
+"""
+Tests para ReactionService
+Usan un almacén en memoria que imita las operaciones atómicas de Mongo
+(modify con upsert/remove, delete condicionado e índice único) para
+comprobar que los contadores son exactos incluso con peticiones concurrentes
+"""
+import random
+import threading
+import time
+import pytest
+from types import SimpleNamespace
+from unittest.mock import patch
+from bson import ObjectId
+from fastapi import HTTPException
+
+
+class FakeNotUniqueError(Exception):
+    """Sustituto de mongoengine.NotUniqueError"""
+
+
+class FakeCollection:
+    """Colección en memoria; Model.objects(**filtros) devuelve un FakeQuerySet"""
+
+    def __init__(self, unique=None):
+        self.docs = []
+        self.unique = unique
+        self.lock = threading.Lock()
+
+    def __call__(self, **filters):
+        return FakeQuerySet(self, filters)
+
+    def bulk_write(self, operations, ordered=True):
+        """Aplica los UpdateOne con $inc del flush de contadores"""
+        with self.lock:
+            for op in operations:
+                doc = next(d for d in self.docs if d["_id"] == op._filter["_id"])
+                for field, delta in op._doc["$inc"].items():
+                    doc[field] = doc.get(field, 0) + delta
+
+
+class FakeQuerySet:
+    def __init__(self, collection, filters):
+        self.collection = collection
+        self.filters = filters
+
+    def _match(self):
+        for doc in self.collection.docs:
+            if all(doc.get(k) == v for k, v in self.filters.items()):
+                return doc
+        return None
+
+    def only(self, *fields):
+        return self
+
+    def first(self):
+        with self.collection.lock:
+            doc = self._match()
+            return SimpleNamespace(**doc) if doc else None
+
+    def delete(self):
+        with self.collection.lock:
+            before = len(self.collection.docs)
+            self.collection.docs = [
+                d for d in self.collection.docs
+                if not all(d.get(k) == v for k, v in self.filters.items())
+            ]
+            return before - len(self.collection.docs)
+
+    def modify(self, upsert=False, new=False, remove=False, **update):
+        with self.collection.lock:
+            doc = self._match()
+            if doc and remove:
+                self.collection.docs.remove(doc)
+                return SimpleNamespace(**doc)
+            if doc:
+                old = dict(doc)
+                for key, value in update.items():
+                    op, field = key.split("__", 1)
+                    if op == "set":
+                        doc[field] = value
+                    elif op == "inc":
+                        doc[field] = doc.get(field, 0) + value
+                return SimpleNamespace(**(doc if new else old))
+            if not upsert:
+                return None
+
+        # Como en Mongo, la búsqueda y la inserción de un upsert no son atómicas
+        # entre sí: dos upserts simultáneos chocan con el índice único
+        time.sleep(0)
+        with self.collection.lock:
+            doc = dict(self.filters, _id=ObjectId(), id=None)
+            doc["id"] = doc["_id"]
+            for key, value in update.items():
+                op, field = key.split("__", 1)
+                if op in ("set", "set_on_insert"):
+                    doc[field] = value
+            if self.collection.unique:
+                key = tuple(doc[f] for f in self.collection.unique)
+                if any(tuple(d[f] for f in self.collection.unique) == key for d in self.collection.docs):
+                    raise FakeNotUniqueError("E11000 duplicate key")
+            self.collection.docs.append(doc)
+            return SimpleNamespace(**doc) if new else None
+
+
+@pytest.fixture
+def store():
+    """Posts y reacciones en memoria conectados a reaction_service"""
+    posts = FakeCollection()
+    reactions = FakeCollection(unique=("post", "user_id"))
+    post_id = ObjectId()
+    posts.docs.append({
+        "_id": post_id, "id": post_id, "organization_id": "org_123",
+        "likes_count": 0, "dislikes_count": 0, "reactions_version": 0,
+    })
+    with patch('app.services.reaction_service.Post', SimpleNamespace(objects=posts)), \
+         patch('app.services.reaction_service.Reaction', SimpleNamespace(objects=reactions)), \
+         patch('app.services.reaction_service.NotUniqueError', FakeNotUniqueError):
+        yield SimpleNamespace(posts=posts, reactions=reactions, post_id=post_id)
+
+
+class TestReactionService:
+    """Tests del toggle atómico de reacciones"""
+
+    def test_toggle_sequence(self, store):
+        """Test: Agregar, cambiar y quitar una reacción ajusta los contadores"""
+        # Arrange
+        from app.services.reaction_service import ReactionService
+        service = ReactionService()
+        post_id = str(store.post_id)
+
+        # Act
+        added = service.add_or_update_reaction(post_id, "user_1", "like")
+        updated = service.add_or_update_reaction(post_id, "user_1", "dislike")
+        removed = service.add_or_update_reaction(post_id, "user_1", "dislike")
+
+        # Assert
+        assert (added["message"], added["likes_count"], added["user_reaction"]) == ("Reaction added", 1, "like")
+        assert (updated["likes_count"], updated["dislikes_count"]) == (0, 1)
+        assert updated["user_reaction"] == "dislike"
+        assert (removed["message"], removed["dislikes_count"], removed["user_reaction"]) == ("Reaction removed", 0, None)
+        assert store.reactions.docs == []
+        assert store.posts.docs[0]["reactions_version"] == 3
+
+    def test_post_not_found_undoes_reaction(self, store):
+        """Test: Reaccionar a un post inexistente retorna 404 y no deja la reacción"""
+        # Arrange
+        from app.services.reaction_service import ReactionService
+        service = ReactionService()
+
+        # Act & Assert
+        with pytest.raises(HTTPException) as exc:
+            service.add_or_update_reaction(str(ObjectId()), "user_1", "like")
+        assert exc.value.status_code == 404
+        assert store.reactions.docs == []
+
+    def test_remove_reaction(self, store):
+        """Test: Quitar una reacción la borra y decrementa su contador"""
+        # Arrange
+        from app.services.reaction_service import ReactionService
+        service = ReactionService()
+        post_id = str(store.post_id)
+        service.add_or_update_reaction(post_id, "user_1", "like")
+
+        # Act
+        result = service.remove_reaction(post_id, "user_1")
+
+        # Assert
+        assert result["likes_count"] == 0
+        with pytest.raises(HTTPException) as exc:
+            service.remove_reaction(post_id, "user_1")
+        assert exc.value.detail == "Reaction not found"
+
+    def test_concurrent_toggles_keep_exact_counters(self, store):
+        """Test: Muchos hilos reaccionando a la vez dejan contadores exactos y sin duplicados"""
+        # Arrange
+        from app.services.reaction_service import ReactionService
+        service = ReactionService()
+        post_id = str(store.post_id)
+        users = [f"user_{i}" for i in range(5)]
+        errors = []
+
+        def hammer(seed):
+            rnd = random.Random(seed)
+            for _ in range(200):
+                try:
+                    service.add_or_update_reaction(post_id, rnd.choice(users), rnd.choice(["like", "dislike"]))
+                except HTTPException as e:
+                    # 409 es aceptable si la contención agota los reintentos
+                    if e.status_code != 409:
+                        errors.append(e)
+
+        threads = [threading.Thread(target=hammer, args=(seed,)) for seed in range(16)]
+
+        # Act
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Assert
+        assert errors == []
+        reactions = store.reactions.docs
+        assert len({r["user_id"] for r in reactions}) == len(reactions)
+        post = store.posts.docs[0]
+        assert post["likes_count"] == sum(r["reaction_type"] == "like" for r in reactions)
+        assert post["dislikes_count"] == sum(r["reaction_type"] == "dislike" for r in reactions)
+
+    def test_write_behind_buffers_counters(self, store):
+        """Test: En modo write-behind los contadores esperan al flush y la versión sube ya"""
+        # Arrange
+        from app.services.counter_buffer import CounterBuffer
+        from app.services.reaction_service import ReactionService
+        buffer = CounterBuffer(enabled=True)
+        service = ReactionService()
+        post_id = str(store.post_id)
+
+        with patch('app.services.reaction_service.counter_buffer', buffer), \
+             patch('app.services.counter_buffer.Post', SimpleNamespace(_get_collection=lambda: store.posts)):
+            # Act
+            service.add_or_update_reaction(post_id, "user_1", "like")
+            second = service.add_or_update_reaction(post_id, "user_2", "like")
+            before_flush = dict(store.posts.docs[0])
+            buffer.flush()
+
+        # Assert
+        assert second["likes_count"] == 2  # incluye los deltas pendientes
+        assert before_flush["likes_count"] == 0
+        # La versión cambia al reaccionar: el ETag de /stats no devuelve la reacción anterior
+        assert before_flush["reactions_version"] == 2
+        assert store.posts.docs[0]["likes_count"] == 2
+        assert store.posts.docs[0]["reactions_version"] == 2
+
+    def test_write_behind_concurrent_counters_exact_after_flush(self, store):
+        """Test: Con write-behind y muchos hilos los contadores son exactos tras el flush"""
+        # Arrange
+        from app.services.counter_buffer import CounterBuffer
+        from app.services.reaction_service import ReactionService
+        buffer = CounterBuffer(enabled=True, flush_interval=0.01)
+        service = ReactionService()
+        post_id = str(store.post_id)
+        users = [f"user_{i}" for i in range(5)]
+        errors = []
+
+        def hammer(seed):
+            rnd = random.Random(seed)
+            for _ in range(100):
+                try:
+                    service.add_or_update_reaction(post_id, rnd.choice(users), rnd.choice(["like", "dislike"]))
+                except HTTPException as e:
+                    if e.status_code != 409:
+                        errors.append(e)
+
+        with patch('app.services.reaction_service.counter_buffer', buffer), \
+             patch('app.services.counter_buffer.Post', SimpleNamespace(_get_collection=lambda: store.posts)):
+            buffer.start()
+            threads = [threading.Thread(target=hammer, args=(seed,)) for seed in range(8)]
+
+            # Act
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            buffer.stop()
+
+        # Assert
+        assert errors == []
+        reactions = store.reactions.docs
+        post = store.posts.docs[0]
+        assert post["likes_count"] == sum(r["reaction_type"] == "like" for r in reactions)
+        assert post["dislikes_count"] == sum(r["reaction_type"] == "dislike" for r in reactions)
+        assert buffer.stats()["flushes"] >= 1
+
@@ -0,0 +1,252 @@
+"""
+Tests para ForumReadService
+Verifican la capa de lectura basada en diccionarios planos (as_pymongo)
+"""
+import json
+import pytest
+from unittest.mock import Mock, patch
+from datetime import datetime
+from bson import ObjectId
+from fastapi import HTTPException
+
+
+class TestForumReadService:
+    """Tests para la capa de lectura rápida"""
+
+    def test_list_posts_full_view(self):
+        """Test: El listado completo proyecta los campos de PostOut y renombra _id"""
+        # Arrange
+        from app.services.read_service import ForumReadService, POST_OUT_FIELDS
+
+        post_service = Mock()
+        post_id = ObjectId()
+        post_service.get_posts_projection_page.return_value = (
+            [{'_id': post_id, 'title': 'Test', 'created_at': datetime(2024, 1, 1)}], "cursor"
+        )
+        service = ForumReadService(post_service)
+
+        # Act
+        items, next_cursor = service.list_posts("org_123", limit=10)
+
+        # Assert
+        post_service.get_posts_projection_page.assert_called_once_with(
+            "org_123", list(POST_OUT_FIELDS), limit=10, after=None
+        )
+        assert items == [{'id': post_id, 'title': 'Test', 'created_at': datetime(2024, 1, 1)}]
+        assert next_cursor == "cursor"
+
+    def test_list_posts_summary_view(self):
+        """Test: view=summary delega en la página resumida"""
+        # Arrange
+        from app.services.read_service import ForumReadService
+
+        post_service = Mock()
+        post_service.get_posts_summary_page.return_value = ([], None)
+        service = ForumReadService(post_service)
+
+        # Act
+        items, next_cursor = service.list_posts("org_123", view="summary")
+
+        # Assert
+        post_service.get_posts_summary_page.assert_called_once()
+        post_service.get_posts_projection_page.assert_not_called()
+        assert items == []
+
+    @patch('app.services.read_service.Post')
+    def test_get_post_not_found(self, mock_post_class):
+        """Test: Post inexistente lanza excepción"""
+        # Arrange
+        from app.services.read_service import ForumReadService
+
+        mock_post_class.objects.return_value.only.return_value.as_pymongo.return_value.first.return_value = None
+        service = ForumReadService(Mock())
+
+        # Act & Assert
+        with pytest.raises(Exception, match="Post not found"):
+            service.get_post("org_123", str(ObjectId()))
+
+    @patch('app.services.comment_service.Comment')
+    @patch('app.services.read_service.Post')
+    def test_list_comments_uses_stored_reference(self, mock_post_class, mock_comment_class):
+        """Test: Los comentarios usan el ObjectId guardado en la referencia"""
+        # Arrange
+        from app.services.read_service import ForumReadService
+
+        post_id = ObjectId()
+        mock_post_class.objects.return_value.only.return_value.as_pymongo.return_value.first.return_value = {'_id': post_id}
+        page = mock_comment_class.objects.return_value.order_by.return_value.limit
+        page.return_value.only.return_value.as_pymongo.return_value = [{
+            '_id': ObjectId(),
+            'post': post_id,
+            'user_name': 'John',
+            'content': 'Hola',
+            'created_at': datetime(2024, 1, 1),
+        }]
+        service = ForumReadService(Mock())
+
+        # Act
+        comments, next_cursor = service.list_comments(str(post_id))
+
+        # Assert
+        mock_comment_class.objects.assert_called_once_with(post=post_id)
+        mock_comment_class.objects.return_value.order_by.assert_called_once_with('created_at', 'id')
+        page.assert_called_once_with(21)
+        assert comments[0]["post_id"] == post_id
+        assert comments[0]["user_name"] == "John"
+        assert next_cursor is None
+
+    @patch('app.services.comment_service.Comment')
+    def test_list_comments_newest_first_next_cursor(self, mock_comment_class):
+        """Test: order=desc recorre el índice al revés y genera cursor si hay más"""
+        # Arrange
+        from app.services.read_service import ForumReadService
+        from app.core.pagination import decode_cursor, encode_cursor
+
+        post_id = ObjectId()
+        query = mock_comment_class.objects.return_value
+        filtered = query.filter.return_value.filter.return_value
+        rows = [
+            {'_id': ObjectId(), 'post': post_id, 'user_name': 'u', 'content': str(i),
+             'created_at': datetime(2024, 1, 1, 12, 10 - i)}
+            for i in range(3)
+        ]
+        filtered.order_by.return_value.limit.return_value.only.return_value.as_pymongo.return_value = rows
+        service = ForumReadService(Mock())
+        after = encode_cursor(datetime(2024, 1, 1, 12, 11), ObjectId())
+
+        # Act
+        comments, next_cursor = service.list_comments(
+            str(post_id), ensure_post=False, limit=2, after=after, order="desc"
+        )
+
+        # Assert
+        query.filter.assert_called_once_with(created_at__lte=datetime(2024, 1, 1, 12, 11))
+        filtered.order_by.assert_called_once_with('-created_at', '-id')
+        filtered.order_by.return_value.limit.assert_called_once_with(3)
+        assert [c["content"] for c in comments] == ["0", "1"]
+        assert decode_cursor(next_cursor) == (datetime(2024, 1, 1, 12, 9), rows[1]['_id'])
+
+    @patch('app.services.comment_service.Comment')
+    def test_list_comments_invalid_cursor(self, mock_comment_class):
+        """Test: Un cursor inválido lanza ValueError sin consultar los comentarios"""
+        # Arrange
+        from app.services.read_service import ForumReadService
+        service = ForumReadService(Mock())
+
+        # Act & Assert
+        with pytest.raises(ValueError):
+            service.list_comments(str(ObjectId()), ensure_post=False, after="not-a-cursor")
+        mock_comment_class.objects.assert_not_called()
+
+    def test_list_comments_invalid_post_id(self):
+        """Test: Un post_id inválido retorna 400"""
+        # Arrange
+        from app.services.read_service import ForumReadService
+        service = ForumReadService(Mock())
+
+        # Act & Assert
+        with pytest.raises(HTTPException) as exc:
+            service.list_comments("invalid")
+        assert exc.value.status_code == 400
+
+    @patch('app.services.read_service.Reaction')
+    @patch('app.services.read_service.Post')
+    def test_get_reaction_stats(self, mock_post_class, mock_reaction_class):
+        """Test: Stats con la reacción del usuario y contadores por defecto"""
+        # Arrange
+        from app.services.read_service import ForumReadService
+
+        mock_post_class.objects.return_value.only.return_value.as_pymongo.return_value.first.return_value = {
+            '_id': ObjectId(), 'likes_count': 3
+        }
+        mock_reaction_class.objects.return_value.only.return_value.as_pymongo.return_value.first.return_value = {
+            'reaction_type': 'like'
+        }
+        service = ForumReadService(Mock())
+
+        # Act
+        stats = service.get_reaction_stats(str(ObjectId()), user_id="user_123")
+
+        # Assert
+        assert stats == {"likes_count": 3, "dislikes_count": 0, "user_reaction": "like"}
+
+    def test_list_posts_with_counters(self):
+        """Test: counters=True proyecta los contadores y completa los ausentes con 0"""
+        # Arrange
+        from app.services.read_service import ForumReadService, POST_OUT_FIELDS
+
+        post_service = Mock()
+        post_service.get_posts_projection_page.return_value = (
+            [{'_id': ObjectId(), 'title': 'A', 'likes_count': 2}], None
+        )
+        service = ForumReadService(post_service)
+
+        # Act
+        items, _ = service.list_posts("org_123", counters=True)
+
+        # Assert
+        fields = post_service.get_posts_projection_page.call_args.args[1]
+        assert set(fields) == set(POST_OUT_FIELDS) | {'likes_count', 'dislikes_count', 'comments_count'}
+        assert (items[0]['likes_count'], items[0]['dislikes_count'], items[0]['comments_count']) == (2, 0, 0)
+
+    @patch('app.services.read_service.Reaction')
+    @patch('app.services.read_service.Post')
+    def test_get_reaction_stats_batch(self, mock_post_class, mock_reaction_class):
+        """Test: Estadísticas de varios posts con una consulta $in por colección"""
+        # Arrange
+        from app.services.read_service import ForumReadService
+
+        liked, plain, missing = ObjectId(), ObjectId(), ObjectId()
+        mock_post_class.objects.return_value.only.return_value.as_pymongo.return_value = [
+            {'_id': liked, 'likes_count': 4, 'dislikes_count': 1},
+            {'_id': plain},
+        ]
+        mock_reaction_class.objects.return_value.only.return_value.as_pymongo.return_value = [
+            {'post': liked, 'reaction_type': 'like'},
+        ]
+        service = ForumReadService(Mock())
+
+        # Act
+        stats = service.get_reaction_stats_batch(
+            "org_123", [str(liked), str(plain), str(missing), str(liked)], user_id="user_123"
+        )
+
+        # Assert
+        mock_post_class.objects.assert_called_once_with(id__in=[liked, plain, missing], organization_id="org_123")
+        mock_reaction_class.objects.assert_called_once_with(post__in=[liked, plain], user_id="user_123")
+        assert stats == {
+            str(liked): {"likes_count": 4, "dislikes_count": 1, "user_reaction": "like"},
+            str(plain): {"likes_count": 0, "dislikes_count": 0, "user_reaction": None},
+        }
+
+    @patch('app.services.read_service.Reaction')
+    @patch('app.services.read_service.Post')
+    def test_get_reaction_stats_batch_without_user(self, mock_post_class, mock_reaction_class):
+        """Test: Sin user_id no se consulta la colección de reacciones"""
+        # Arrange
+        from app.services.read_service import ForumReadService
+        mock_post_class.objects.return_value.only.return_value.as_pymongo.return_value = [{'_id': ObjectId()}]
+        service = ForumReadService(Mock())
+
+        # Act
+        service.get_reaction_stats_batch("org_123", [str(ObjectId())])
+
+        # Assert
+        mock_reaction_class.objects.assert_not_called()
+
+    def test_dumps_mongo_types(self):
+        """Test: dumps serializa ObjectId y datetime directamente a bytes"""
+        # Arrange
+        from app.core.serialization import dumps
+        object_id = ObjectId()
+
+        # Act
+        result = dumps({"id": object_id, "created_at": datetime(2024, 1, 1, 12, 0), "title": "ñ"})
+
+        # Assert
+        assert isinstance(result, bytes)
+        assert json.loads(result) == {
+            "id": str(object_id),
+            "created_at": "2024-01-01T12:00:00",
+            "title": "ñ",
+        }
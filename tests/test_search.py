@@ -0,0 +1,269 @@
+"""
+Tests para la búsqueda de texto de posts y comentarios
+El índice invertido se prueba en memoria y la carga de organizaciones con mongomock
+"""
+import pytest
+import mongomock
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+from bson import ObjectId
+from app.core.search import InvertedIndex, tokenize
+
+
+@pytest.fixture
+def index():
+    """Índice en memoria con la organización org_1 ya cargada (vacía)"""
+    index = InvertedIndex(loader=lambda org_id: [])
+    index.search("org_1", "warmup", 10)
+    return index
+
+
+class TestTokenize:
+    """Tests para app.core.search.tokenize"""
+
+    def test_normalizes_and_drops_stopwords(self):
+        """Test: Minúsculas, sin tildes y sin palabras vacías"""
+        # Act
+        terms = tokenize("La Canción del año, ¡Además de café!")
+
+        # Assert
+        assert terms == ["cancion", "ano", "ademas", "cafe"]
+
+
+class TestInvertedIndex:
+    """Tests para el backend en memoria"""
+
+    def test_ranks_title_over_content_over_comments(self, index):
+        """Test: Un término en el título pesa más que en el contenido o los comentarios"""
+        # Arrange
+        in_title, in_content, in_comment = ObjectId(), ObjectId(), ObjectId()
+        index.index_post("org_1", in_title, "Horario de matrícula", "Dudas generales")
+        index.index_post("org_1", in_content, "Pregunta", "¿Cuándo abre la matrícula?")
+        index.index_post("org_1", in_comment, "Otra pregunta", "Nada que ver")
+        index.index_comment("org_1", in_comment, ObjectId(), "Revisa la matrícula en la web")
+
+        # Act
+        hits = index.search("org_1", "Matrícula", 10)
+
+        # Assert
+        assert [h["post_id"] for h in hits] == [in_title, in_content, in_comment]
+        assert [h["matched"] for h in hits] == [["title"], ["content"], ["comments"]]
+        assert hits[0]["score"] > hits[1]["score"] > hits[2]["score"] > 0
+
+    def test_incremental_updates(self, index):
+        """Test: Editar, comentar y borrar actualizan el índice sin recargarlo"""
+        # Arrange
+        post_id, comment_id = ObjectId(), ObjectId()
+        index.index_post("org_1", post_id, "Examen parcial", "Fecha del examen")
+
+        # Act
+        index.index_post("org_1", post_id, "Examen final", "Fecha del examen")
+        parcial = index.search("org_1", "parcial", 10)
+        index.index_comment("org_1", post_id, comment_id, "Aula 204")
+        with_comment = index.search("org_1", "aula", 10)
+        index.remove_comment("org_1", post_id, comment_id)
+        without_comment = index.search("org_1", "aula", 10)
+        index.remove_post("org_1", post_id)
+
+        # Assert
+        assert parcial == []
+        assert [h["post_id"] for h in with_comment] == [post_id]
+        assert without_comment == []
+        assert index.search("org_1", "examen", 10) == []
+        assert index.stats()["terms"] == 0
+
+    def test_scoped_by_org(self, index):
+        """Test: Solo se devuelven posts de la organización buscada"""
+        # Arrange
+        index.search("org_2", "warmup", 10)
+        mine, other = ObjectId(), ObjectId()
+        index.index_post("org_1", mine, "Biblioteca", "")
+        index.index_post("org_2", other, "Biblioteca", "")
+
+        # Act
+        hits = index.search("org_1", "biblioteca", 10)
+
+        # Assert
+        assert [h["post_id"] for h in hits] == [mine]
+
+    def test_lazy_load_and_eviction(self):
+        """Test: Cada organización se carga una vez al buscar; las escrituras previas se ignoran"""
+        # Arrange
+        post_id = ObjectId()
+        loader = Mock(side_effect=lambda org_id: [("post", (post_id, "Cafetería", "menú"))])
+        index = InvertedIndex(loader=loader, max_orgs=1)
+        index.index_post("org_1", ObjectId(), "Ignorado", "aún no cargada")
+
+        # Act
+        first = index.search("org_1", "cafeteria", 10)
+        index.search("org_1", "menu", 10)
+        index.search("org_2", "menu", 10)  # expulsa org_1
+        index.search("org_1", "menu", 10)
+
+        # Assert
+        assert [h["post_id"] for h in first] == [post_id]
+        assert index.search("org_1", "ignorado", 10) == []
+        assert loader.call_count == 3
+        assert index.stats()["evictions"] == 2
+
+
+class TestSearchService:
+    """Tests para SearchService y los avisos de escritura"""
+
+    def test_search_returns_summary_rows_in_rank_order(self):
+        """Test: Los posts se leen con una consulta y se devuelven en orden de relevancia"""
+        # Arrange
+        from app.services.search_index import SearchIndex
+        from app.services.search_service import SearchService
+        first, second, deleted = ObjectId(), ObjectId(), ObjectId()
+        documents = [
+            ("post", (first, "Wifi del campus", "No funciona")),
+            ("post", (second, "Dudas", "La wifi va lenta")),
+            ("post", (deleted, "Wifi", "wifi wifi")),
+        ]
+        posts = Mock()
+        posts.aggregate.return_value = [
+            {"_id": second, "title": "Dudas", "excerpt": "La wifi va lenta", "truncated": False},
+            {"_id": first, "title": "Wifi del campus", "excerpt": "No funciona", "truncated": False, "likes_count": 2},
+        ]
+        service = SearchService(SearchIndex(InvertedIndex(loader=lambda org_id: documents)))
+
+        # Act
+        with patch('app.services.search_service.Post', SimpleNamespace(_get_collection=lambda: posts)):
+            results = service.search("org_1", "wifi")
+
+        # Assert
+        assert [r["id"] for r in results] == [first, second]
+        assert results[0]["matched"] == ["title"] and results[0]["likes_count"] == 2
+        assert results[1]["comments_count"] == 0
+        match = posts.aggregate.call_args.args[0][0]["$match"]
+        assert match["organization_id"] == "org_1"
+        assert set(match["_id"]["$in"]) == {first, second, deleted}
+
+    def test_load_org_documents(self):
+        """Test: La carga de una organización trae sus posts y sus comentarios"""
+        # Arrange
+        from app.services.search_index import load_org_documents
+        db = mongomock.MongoClient().forum_db
+        post_id = db.posts.insert_one({"organization_id": "org_1", "title": "T", "content": "C"}).inserted_id
+        db.posts.insert_one({"organization_id": "org_2", "title": "X", "content": "Y"})
+        comment_id = db.comments.insert_one({"post": post_id, "content": "hola"}).inserted_id
+
+        # Act
+        with patch('app.services.search_index.Post', SimpleNamespace(_get_collection=lambda: db.posts)), \
+             patch('app.services.search_index.Comment', SimpleNamespace(_get_collection=lambda: db.comments)):
+            documents = list(load_org_documents("org_1"))
+
+        # Assert
+        assert documents == [("post", (post_id, "T", "C")), ("comment", (post_id, comment_id, "hola"))]
+
+    def test_index_failure_does_not_break_writes(self):
+        """Test: Un error del backend solo se registra"""
+        # Arrange
+        from app.services.search_index import SearchIndex
+        backend = Mock()
+        backend.index_post.side_effect = RuntimeError("boom")
+        post = SimpleNamespace(organization_id="org_1", id=ObjectId(), title="t", content="c")
+
+        # Act & Assert
+        SearchIndex(backend).post_saved(post)
+        backend.index_post.assert_called_once_with("org_1", post.id, "t", "c")
+
+    @patch('app.services.post_service.search_index')
+    @patch('app.services.post_service.Post')
+    def test_post_service_notifies_writes(self, mock_post_class, mock_index, sample_post_data):
+        """Test: Crear y borrar un post avisan al índice"""
+        # Arrange
+        from app.services.post_service import PostService
+        from app.schemas.post_schema import PostCreate
+        post = mock_post_class.return_value
+        mock_post_class.objects.return_value.modify.return_value = post
+
+        # Act
+        PostService().create_post("org_1", PostCreate(**sample_post_data))
+        PostService().delete_post("org_1", str(ObjectId()))
+
+        # Assert
+        mock_index.post_saved.assert_called_once_with(post)
+        mock_index.post_deleted.assert_called_once_with("org_1", post.id)
+
+    def test_mongo_backend_combines_post_and_comment_scores(self):
+        """Test: El backend de Mongo suma los comentarios de posts de la organización"""
+        # Arrange
+        from app.services.search_index import MongoTextSearch
+        post_a, post_b, foreign = ObjectId(), ObjectId(), ObjectId()
+        posts, comments = Mock(), Mock()
+        posts.find.side_effect = [
+            Mock(sort=Mock(return_value=Mock(limit=Mock(return_value=[{"_id": post_a, "score": 1.0}])))),
+            [{"_id": post_b}],
+        ]
+        comments.aggregate.return_value = [{"_id": foreign, "score": 9.0}, {"_id": post_b, "score": 4.0}]
+
+        # Act
+        with patch('app.services.search_index.Post', SimpleNamespace(_get_collection=lambda: posts)), \
+             patch('app.services.search_index.Comment', SimpleNamespace(_get_collection=lambda: comments)):
+            hits = MongoTextSearch().search("org_1", "wifi", 10)
+
+        # Assert
+        assert [(h["post_id"], h["score"], h["matched"]) for h in hits] == [
+            (post_b, 2.0, ["comments"]), (post_a, 1.0, ["post"]),
+        ]
+        assert posts.find.call_args_list[0].args[0] == {
+            "organization_id": "org_1", "$text": {"$search": "wifi"}, "deleted_at": None,
+        }
+        # El índice de texto de comments se acota a la organización antes del corte de candidatos
+        assert comments.aggregate.call_args.args[0][0] == {
+            "$match": {"organization_id": "org_1", "$text": {"$search": "wifi"}},
+        }
+
+
+class TestCommentOrgBackfill:
+    """Tests para backfill_comment_orgs"""
+
+    def test_copies_post_org_to_comments(self):
+        """Test: Los comentarios sin organización reciben la de su post, por lotes"""
+        # Arrange
+        from app.services.comment_org_backfill import backfill_comment_orgs
+        db = mongomock.MongoClient().forum_db
+        post_ids = [db.posts.insert_one({"organization_id": f"org_{i % 2}"}).inserted_id for i in range(3)]
+        for post_id in post_ids:
+            db.comments.insert_one({"post": post_id, "content": "c"})
+        db.comments.insert_one({"post": post_ids[0], "content": "c", "organization_id": "org_0"})
+
+        # Act
+        with patch('app.services.comment_org_backfill.Post', SimpleNamespace(_get_collection=lambda: db.posts)), \
+             patch('app.services.comment_org_backfill.Comment', SimpleNamespace(_get_collection=lambda: db.comments)):
+            report = backfill_comment_orgs(batch_size=2)
+            again = backfill_comment_orgs()
+
+        # Assert
+        assert report["scanned_posts"] == 3 and report["updated_comments"] == 3
+        assert again["updated_comments"] == 0
+        assert db.comments.count_documents({"organization_id": "org_0"}) == 3
+        assert db.comments.count_documents({"organization_id": "org_1"}) == 1
+
+
+class TestSearchRoute:
+    """Tests para GET /orgs/{org_id}/forum/search"""
+
+    @patch('app.api.v1.forum_routes.search_service.search')
+    def test_search_endpoint(self, mock_search, client):
+        """Test: /search no se confunde con /{post_id} y devuelve los resultados"""
+        # Arrange
+        mock_search.return_value = [{"id": "p1", "title": "Wifi", "score": 1.5, "matched": ["title"]}]
+
+        # Act
+        response = client.get("/orgs/org_1/forum/search?q=wifi&limit=5")
+
+        # Assert
+        assert response.status_code == 200
+        assert response.json()[0]["score"] == 1.5
+        mock_search.assert_called_once_with("org_1", "wifi", 5)
+
+    def test_search_requires_query(self, client):
+        """Test: Sin q retorna 422"""
+        # Act
+        response = client.get("/orgs/org_1/forum/search")
+
+        # Assert
+        assert response.status_code == 422
@@ -0,0 +1,138 @@
+"""
+Tests para el registro de comandos lentos de Mongo
+Los eventos de pymongo se construyen a mano y explain se sustituye por una función
+"""
+import json
+import logging
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest.mock import patch
+from pymongo import monitoring
+from app.core.metrics import current_scope
+from app.db.monitoring import SlowCommandLog, explain_command, plan_stages, winning_plan
+
+FIND = {"find": "posts", "filter": {"organization_id": "org_1", "_id": {"$in": [1, 2, 3]}},
+        "lsid": {"id": "x"}, "$db": "forum_db"}
+
+COLLSCAN_EXPLAIN = {"queryPlanner": {"winningPlan": {"stage": "LIMIT", "inputStage": {"stage": "COLLSCAN"}}}}
+
+
+def run_command(listener, command, millis, request_id=1):
+    """Emite los eventos de inicio y fin de un comando que tarda `millis`"""
+    name = next(iter(command))
+    listener.started(monitoring.CommandStartedEvent(command, "forum_db", request_id, ("h", 1), request_id))
+    listener.succeeded(monitoring.CommandSucceededEvent(
+        timedelta(milliseconds=millis), {"ok": 1}, name, request_id, ("h", 1), request_id))
+
+
+def logged(caplog):
+    return [(r.levelname, json.loads(r.getMessage())) for r in caplog.records if r.name == "app.db.slow_commands"]
+
+
+class TestSlowCommandLog:
+    """Tests para SlowCommandLog"""
+
+    def test_only_slow_commands_are_logged(self, caplog):
+        """Test: Un comando por debajo del umbral no se registra; uno lento sí, sin valores"""
+        # Arrange
+        listener = SlowCommandLog(threshold_ms=100)
+        caplog.set_level(logging.WARNING, logger="app.db.slow_commands")
+
+        # Act
+        run_command(listener, FIND, 20, request_id=1)
+        run_command(listener, FIND, 250, request_id=2)
+
+        # Assert
+        [(level, record)] = logged(caplog)
+        assert level == "WARNING"
+        assert record["collection"] == "posts" and record["command"] == "find"
+        assert record["duration_ms"] == 250
+        assert record["shape"] == {"organization_id": "?", "_id": {"$in": ["?"]}}
+        assert listener._pending == {}
+
+    def test_records_route_and_service(self, caplog):
+        """Test: El registro incluye la ruta en curso y el método de servicio que lanzó el comando"""
+        # Arrange
+        listener = SlowCommandLog(threshold_ms=1)
+        caplog.set_level(logging.WARNING, logger="app.db.slow_commands")
+        service_globals = {"__name__": "app.services.post_service", "run_command": run_command}
+        exec("class PostService:\n    def get_posts(self, listener, command):\n"
+             "        run_command(listener, command, 50)\n", service_globals)
+        route = SimpleNamespace(path="/orgs/{org_id}/forum/")
+
+        # Act
+        token = current_scope.set({"method": "GET", "path": "/orgs/org_1/forum/", "route": route})
+        try:
+            service_globals["PostService"]().get_posts(listener, FIND)
+        finally:
+            current_scope.reset(token)
+
+        # Assert
+        [(_, record)] = logged(caplog)
+        assert record["route"] == "GET /orgs/{org_id}/forum/"
+        assert record["service"] == "app.services.post_service.PostService.get_posts"
+
+    def test_collscan_is_flagged_as_error(self, caplog):
+        """Test: Con explain, un plan ganador con COLLSCAN se registra como error y se cuenta"""
+        # Arrange
+        from app.core.metrics import mongo_collscans
+        explained = []
+        listener = SlowCommandLog(threshold_ms=1, explain=True,
+                                  run_explain=lambda cmd: explained.append(cmd) or COLLSCAN_EXPLAIN)
+        caplog.set_level(logging.WARNING, logger="app.db.slow_commands")
+        before = mongo_collscans.value("posts")
+        queued = []
+
+        # Act
+        with patch.object(listener, "_enqueue", side_effect=lambda *args: queued.append(args)):
+            run_command(listener, FIND, 50, request_id=1)
+            run_command(listener, FIND, 50, request_id=2)  # misma forma: no se vuelve a explicar
+        for record, command in queued:
+            listener.explain_now(record, command)
+
+        # Assert
+        assert len(queued) == 1
+        assert explained == [{"explain": {"find": "posts", "filter": FIND["filter"]}, "verbosity": "queryPlanner"}]
+        levels = [level for level, _ in logged(caplog)]
+        assert levels == ["WARNING", "ERROR"]
+        record = logged(caplog)[1][1]
+        assert record["collscan"] is True and record["stages"] == ["LIMIT", "COLLSCAN"]
+        assert mongo_collscans.value("posts") == before + 1
+
+    def test_explain_failure_is_logged(self, caplog):
+        """Test: Si explain falla se registra el comando lento con el error"""
+        # Arrange
+        def broken(command):
+            raise RuntimeError("not authorized")
+        listener = SlowCommandLog(threshold_ms=1, explain=True, run_explain=broken)
+        caplog.set_level(logging.WARNING, logger="app.db.slow_commands")
+
+        # Act
+        listener.explain_now({"collection": "posts"}, FIND)
+
+        # Assert
+        assert logged(caplog) == [("WARNING", {"collection": "posts", "explain_error": "not authorized"})]
+
+
+class TestExplainHelpers:
+    """Tests para la lectura de la salida de explain"""
+
+    def test_winning_plan_inside_aggregate_stages(self):
+        """Test: En un aggregate el plan está dentro de $cursor"""
+        # Arrange
+        explain = {"stages": [{"$cursor": {"queryPlanner": {"winningPlan": {
+            "stage": "FETCH", "inputStage": {"stage": "IXSCAN", "indexName": "organization_id_1"}}}}}]}
+
+        # Act
+        plan = winning_plan(explain)
+
+        # Assert
+        assert plan_stages(plan) == ["FETCH", "IXSCAN"]
+
+    def test_explain_command_drops_session_fields(self):
+        """Test: lsid y $db no pueden ir dentro del explain"""
+        # Act
+        command = explain_command(FIND)
+
+        # Assert
+        assert set(command["explain"]) == {"find", "filter"}
@@ -0,0 +1,246 @@
+"""
+Tests para la purga completa de una organización dada de baja
+Usan colecciones de mongomock para los delete_many por rangos de _id
+"""
+import pytest
+import mongomock
+from types import SimpleNamespace
+from unittest.mock import patch
+
+
+@pytest.fixture
+def db():
+    """Colecciones posts, comments y reactions en memoria conectadas al purgador"""
+    database = mongomock.MongoClient().forum_db
+    with patch('app.services.tenant_purge.Post', SimpleNamespace(_get_collection=lambda: database.posts)), \
+         patch('app.services.tenant_purge.Comment', SimpleNamespace(_get_collection=lambda: database.comments)), \
+         patch('app.services.tenant_purge.Reaction', SimpleNamespace(_get_collection=lambda: database.reactions)), \
+         patch('app.services.tenant_purge.post_list_cache') as cache, \
+         patch('app.services.tenant_purge.search_index'):
+        database.cache = cache
+        yield database
+
+
+def add_posts(db, org_id, posts, comments=0, reactions=0):
+    for _ in range(posts):
+        post_id = db.posts.insert_one({"organization_id": org_id, "deleted_at": None}).inserted_id
+        for _ in range(comments):
+            db.comments.insert_one({"post": post_id, "content": "c"})
+        for i in range(reactions):
+            db.reactions.insert_one({"post": post_id, "user_id": f"u{i}", "reaction_type": "like"})
+
+
+class TestTenantPurger:
+    """Tests para TenantPurger"""
+
+    def test_dry_run_only_counts(self, db):
+        """Test: dry_run informa de lo que se borraría sin tocar nada"""
+        # Arrange
+        from app.services.tenant_purge import TenantPurger
+        add_posts(db, "org_1", 5, comments=3, reactions=2)
+        add_posts(db, "org_2", 1, comments=1)
+
+        # Act
+        report = TenantPurger(batch_size=2, pause=0).purge("org_1", dry_run=True)
+
+        # Assert
+        assert (report["posts"], report["comments"], report["reactions"]) == (5, 15, 10)
+        assert report["status"] == "done" and report["dry_run"] is True
+        assert db.posts.count_documents({}) == 6
+        db.cache.invalidate_org.assert_not_called()
+
+    def test_purges_only_the_organization_in_batches(self, db):
+        """Test: Borra posts, comentarios y reacciones de la organización por tramos"""
+        # Arrange
+        from app.services.tenant_purge import TenantPurger
+        add_posts(db, "org_1", 5, comments=3, reactions=2)
+        add_posts(db, "org_2", 2, comments=1, reactions=1)
+
+        # Act
+        report = TenantPurger(batch_size=4, pause=0).purge("org_1")
+
+        # Assert
+        assert (report["posts"], report["comments"], report["reactions"]) == (5, 15, 10)
+        # Lote 1 (4 posts): 12 comentarios en 3 tramos, 8 reacciones en 2, posts en 1
+        # Lote 2 (1 post): 3 comentarios, 2 reacciones y el post
+        assert report["batches"] == 6 + 3
+        assert db.posts.count_documents({"organization_id": "org_1"}) == 0
+        assert db.posts.count_documents({"organization_id": "org_2"}) == 2
+        assert db.comments.count_documents({}) == 2
+        assert db.reactions.count_documents({}) == 2
+        db.cache.invalidate_org.assert_called_once_with("org_1")
+
+    def test_pacing_waits_between_ranges(self, db):
+        """Test: Se espera `pause` o lo que marque el tope de documentos por segundo"""
+        # Arrange
+        from app.services.tenant_purge import TenantPurger
+        add_posts(db, "org_1", 1, comments=10)
+        purger = TenantPurger(batch_size=10, pause=0.01, max_docs_per_second=100)
+
+        # Act
+        with patch.object(purger._stopping, "wait") as wait:
+            purger.purge("org_1")
+
+        # Assert
+        assert [c.args[0] for c in wait.call_args_list] == [0.1, 0.01]
+
+    def test_stop_mid_batch_keeps_the_posts(self, db):
+        """Test: Parar a mitad de un lote no borra sus posts ni deja huérfanos"""
+        # Arrange
+        from app.services.tenant_purge import TenantPurger
+        add_posts(db, "org_1", 3, comments=10, reactions=10)
+        purger = TenantPurger(batch_size=5, pause=0)
+        # Parar tras el primer tramo de comentarios
+        with patch.object(purger, "_paced", side_effect=lambda *_: purger.stop()):
+            # Act
+            report = purger.purge("org_1")
+
+        # Assert
+        assert report["status"] == "stopped"
+        assert (report["posts"], report["comments"], report["reactions"]) == (0, 5, 0)
+        assert db.posts.count_documents({}) == 3
+        assert db.comments.count_documents({}) == 25
+        assert db.reactions.count_documents({}) == 30
+
+    def test_post_written_inside_the_range_is_not_orphaned(self, db):
+        """Test: Un post que aparece dentro del rango del lote tras leerlo no se borra sin sus hijos"""
+        # Arrange
+        from bson import ObjectId
+        from app.services.tenant_purge import TenantPurger
+        first, middle, last = sorted(ObjectId() for _ in range(3))
+        db.posts.insert_many([{"_id": first, "organization_id": "org_1"}, {"_id": last, "organization_id": "org_1"}])
+        purger = TenantPurger(batch_size=10, pause=0)
+        drain_children = purger._delete_children
+
+        def import_during_batch(*args):
+            # Importación concurrente con un _id histórico entre los del lote
+            if db.posts.find_one({"_id": middle}) is None:
+                db.posts.insert_one({"_id": middle, "organization_id": "org_1"})
+                db.comments.insert_one({"post": middle, "content": "c"})
+            return drain_children(*args)
+
+        # Act
+        with patch.object(purger, "_delete_children", side_effect=import_during_batch):
+            report = purger.purge("org_1")
+
+        # Assert
+        assert report["status"] == "done" and report["posts"] == 3
+        assert db.posts.count_documents({}) == 0
+        assert db.comments.count_documents({}) == 0
+
+    def test_children_are_read_in_index_order(self, db):
+        """Test: Los comentarios se borran en el orden del índice (post, created_at, _id), no por _id"""
+        # Arrange
+        from datetime import datetime, timedelta
+        from app.services.tenant_purge import TenantPurger
+        post_id = db.posts.insert_one({"organization_id": "org_1", "deleted_at": None}).inserted_id
+        base = datetime(2024, 1, 1)
+        # Los _id crecen y created_at decrece: el orden por _id sería el contrario
+        for i in range(6):
+            db.comments.insert_one({"post": post_id, "created_at": base - timedelta(minutes=i)})
+        purger = TenantPurger(batch_size=3, pause=0)
+        with patch.object(purger, "_paced", side_effect=lambda *_: purger.stop()):
+            # Act
+            purger.purge("org_1")
+
+        # Assert
+        remaining = sorted(c["created_at"] for c in db.comments.find())
+        assert remaining == [base - timedelta(minutes=i) for i in (2, 1, 0)]
+
+    def test_background_job_reports_progress(self, db):
+        """Test: start() purga en un hilo y status() devuelve el informe final"""
+        # Arrange
+        from app.services.tenant_purge import TenantPurger
+        add_posts(db, "org_1", 3, comments=1)
+        purger = TenantPurger(batch_size=10, pause=0)
+
+        # Act
+        purger.start("org_1")
+        for _ in range(200):
+            if purger.status("org_1")["status"] != "running":
+                break
+            purger._stopping.wait(0.01)
+
+        # Assert
+        status = purger.status("org_1")
+        assert status["status"] == "done"
+        assert (status["posts"], status["comments"]) == (3, 3)
+        assert purger.status("org_2") is None
+
+    def test_purges_again_after_stop(self, db):
+        """Test: Tras stop() (apagado de un lifespan) la siguiente purga del proceso no queda parada"""
+        # Arrange
+        from app.services.tenant_purge import TenantPurger
+        add_posts(db, "org_1", 2, comments=1)
+        add_posts(db, "org_2", 2, comments=1)
+        purger = TenantPurger(batch_size=10, pause=0)
+        purger.stop()
+
+        # Act
+        report = purger.purge("org_1")
+        purger.stop()
+        purger.start("org_2")
+        for _ in range(200):
+            if purger.status("org_2")["status"] != "running":
+                break
+            purger._stopping.wait(0.01)
+
+        # Assert
+        assert report["status"] == "done" and report["posts"] == 2
+        assert purger.status("org_2")["status"] == "done"
+        assert db.posts.count_documents({}) == 0
+
+
+class TestPurgeRoutes:
+    """Tests para /admin/orgs/{org_id}/purge"""
+
+    @patch('app.api.v1.admin_routes.tenant_purger')
+    def test_dry_run_by_default(self, mock_purger, client):
+        """Test: Sin parámetros solo cuenta"""
+        # Arrange
+        mock_purger.purge.return_value = {"posts": 4, "comments": 9, "reactions": 1}
+
+        # Act
+        response = client.post("/admin/orgs/org_1/purge")
+
+        # Assert
+        assert response.status_code == 200
+        assert response.json()["comments"] == 9
+        mock_purger.purge.assert_called_once_with("org_1", dry_run=True)
+        mock_purger.start.assert_not_called()
+
+    @patch('app.api.v1.admin_routes.tenant_purger')
+    def test_purge_requires_confirmation(self, mock_purger, client):
+        """Test: Sin confirm igual a org_id retorna 400 y no borra nada"""
+        # Act
+        response = client.post("/admin/orgs/org_1/purge?dry_run=false&confirm=org_2")
+
+        # Assert
+        assert response.status_code == 400
+        mock_purger.start.assert_not_called()
+
+    @patch('app.api.v1.admin_routes.tenant_purger')
+    def test_purge_starts_background_job(self, mock_purger, client):
+        """Test: Con confirmación lanza la purga y responde 202"""
+        # Arrange
+        mock_purger.start.return_value = {"org_id": "org_1", "status": "running"}
+
+        # Act
+        response = client.post("/admin/orgs/org_1/purge?dry_run=false&confirm=org_1")
+
+        # Assert
+        assert response.status_code == 202
+        assert response.json()["status"] == "running"
+        mock_purger.start.assert_called_once_with("org_1")
+
+    @patch('app.api.v1.admin_routes.tenant_purger')
+    def test_status_not_found(self, mock_purger, client):
+        """Test: Sin purga lanzada retorna 404"""
+        # Arrange
+        mock_purger.status.return_value = None
+
+        # Act
+        response = client.get("/admin/orgs/org_1/purge")
+
+        # Assert
+        assert response.status_code == 404